@@ -1,9 +1,10 @@
 from django.contrib.auth.password_validation import validate_password
+from django.db.models import Q
 from phonenumber_field.serializerfields import PhoneNumberField
 from rest_framework import serializers, status
-from rest_framework_simplejwt.tokens import RefreshToken
 
 from apps.user.models import User
+from core.jwt import rotate_tokens, verify_token
 
 __all__ = [
     "TokenObtainPairSerializer",
@@ -11,7 +12,9 @@ __all__ = [
     "TokenSerializer",
     "InvalidTokenSerializer",
     "InvalidCredentialsSerializer",
+    "TokenRefreshSerializer",
     "TokenRefreshResponseSerializer",
+    "TokenVerifySerializer",
     "UserRegisterSerializer",
     "RequestPasswordResetSerializer",
     "ResetPasswordSerializer",
@@ -36,8 +39,26 @@ class TokenSerializer(serializers.Serializer):
     token = serializers.CharField(max_length=6, required=True)
 
 
+class TokenRefreshSerializer(serializers.Serializer):
+    """Rotate a refresh token, without loading its user."""
+
+    refresh = serializers.CharField()
+
+    def validate(self, attrs: dict):
+        return rotate_tokens(attrs["refresh"])
+
+
 class TokenRefreshResponseSerializer(serializers.Serializer):
     access = serializers.CharField()
+    refresh = serializers.CharField()
+
+
+class TokenVerifySerializer(serializers.Serializer):
+    token = serializers.CharField(write_only=True)
+
+    def validate(self, attrs: dict):
+        verify_token(attrs["token"])
+        return {}
 
 
 class InvalidTokenSerializer(serializers.Serializer):
@@ -66,6 +87,8 @@ class UserRegisterSerializer(serializers.ModelSerializer):
         extra_kwargs = {
             "password": {"write_only": True},
             "confirm_password": {"write_only": True},
+            # Validated along with the phone number, see check_unique()
+            "email": {"validators": []},
         }
 
     def validate(self, attrs: dict):
@@ -80,9 +103,34 @@ class UserRegisterSerializer(serializers.ModelSerializer):
         email = attrs.get("email")
         if not email:
             raise serializers.ValidationError({"email": ["Email must be provided."]})
+        self.check_unique(email, attrs["phone_number"])
 
         return attrs
 
+    def check_unique(self, email: str, phone_number) -> None:
+        """
+        Validate that no user has the email, as email or username, or the
+        phone number, in a single query.
+
+        The user is registered with its email as username, and deleted users
+        keep theirs taken until they are purged.
+        """
+        errors = {}
+        taken = User.all_objects.filter(
+            Q(email=email) | Q(username=email) | Q(phone_number=phone_number)
+        ).values_list("email", "username", "phone_number")
+        for taken_email, taken_username, taken_phone_number in taken:
+            if email in (taken_email, taken_username):
+                errors["email"] = [
+                    User._meta.get_field("email").error_messages["unique"]
+                ]
+            if phone_number == taken_phone_number:
+                errors["phone_number"] = [
+                    User._meta.get_field("phone_number").error_messages["unique"]
+                ]
+        if errors:
+            raise serializers.ValidationError(errors, code="unique")
+
     def validate_password(self, value: str):
         if value:
             validate_password(value)
@@ -1,6 +1,8 @@
+from django.conf import settings
 from django.urls import path
 
 from apps.api.v1.auth.views import (
+    AsyncTokenPairObtainView,
     RequestPasswordResetView,
     ResetPasswordView,
     TokenPairObtainView,
@@ -17,7 +19,11 @@ urlpatterns = [
     ),
     path(
         "tokens",
-        TokenPairObtainView.as_view(),
+        (
+            AsyncTokenPairObtainView
+            if settings.ASYNC_API_VIEWS
+            else TokenPairObtainView
+        ).as_view(),
         name="get-tokens",
     ),
     path(
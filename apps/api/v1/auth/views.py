@@ -1,7 +1,7 @@
+from asgiref.sync import sync_to_async
 from django.conf import settings
-from django.contrib.auth import authenticate, login
+from django.contrib.auth import authenticate
 from django.contrib.auth.tokens import PasswordResetTokenGenerator
-from django.core.mail import send_mail
 from django.shortcuts import get_object_or_404
 from django.utils.encoding import force_bytes
 from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
@@ -21,14 +21,20 @@ from apps.api.v1.auth.schema import (
     InvalidTokenExample,
 )
 from apps.api.v1.user.schema import UserNotFoundExample
+from apps.user.last_login import arecord_login, record_login
 from apps.user.models import User
-from core.jwt import get_tokens
+from apps.user.tasks import send_password_reset_email
+from core.auth_backends import aauthenticate
+from core.jwt import get_tokens, revoke_user_tokens
+from core.views import AsyncAPIView
 
 from apps.api.v1.auth.serializers import (
     RequestPasswordResetSerializer,
     ResetPasswordSerializer,
     TokenObtainPairSerializer,
     TokenRefreshResponseSerializer,
+    TokenRefreshSerializer,
+    TokenVerifySerializer,
     UserRegisterSerializer,
     TokenPairSerializer,
     InvalidCredentialsSerializer,
@@ -36,6 +42,7 @@ from apps.api.v1.auth.serializers import (
 )
 
 __all__ = [
+    "AsyncTokenPairObtainView",
     "TokenPairObtainView",
     "TokenRefreshObtainView",
     "VerifyTokenView",
@@ -49,7 +56,10 @@ from core.serializers import NotFoundSerializer
 
 @extend_schema(
     summary="Get JWT auth tokens",
-    description="Takes a set of user credentials and returns access and refresh JSON web token pair.",
+    description=(
+        "Takes a set of user credentials and returns access and refresh JSON web "
+        "token pair. The login is the email, phone number or username of the user."
+    ),
     tags=["auth"],
     request=TokenObtainPairSerializer,
     responses={
@@ -62,32 +72,59 @@ from core.serializers import NotFoundSerializer
 )
 class TokenPairObtainView(APIView):
     permission_classes = [AllowAny]
+    throttle_scope = "login"
 
     def post(self, request, *args, **kwargs):
         serializer = TokenObtainPairSerializer(data=self.request.data)
         serializer.is_valid(raise_exception=True)
         login_term: str = serializer.data.get("login")
         password: str = serializer.data.get("password")
-        # TODO: implement an authentication backend that user email, username or phone number
-        user: User | None = authenticate(request, email=login_term, password=password)
+        user: User | None = authenticate(request, login=login_term, password=password)
         if user:
-            login(request, user)
-            tokens: dict[str, str] = get_tokens(user)
-            tokens_serializer = TokenPairSerializer(instance=tokens)
-            return Response(data=tokens_serializer.data, status=status.HTTP_200_OK)
+            record_login(user)
+            return self.get_tokens_response(user)
         else:
-            serializer = InvalidCredentialsSerializer(
-                instance={"detail": "Invalid credentials"}
-            )
-            return Response(
-                data=serializer.data,
-                status=status.HTTP_401_UNAUTHORIZED,
-            )
+            return self.get_invalid_credentials_response()
+
+    def get_tokens_response(self, user: User) -> Response:
+        tokens: dict[str, str] = get_tokens(user)
+        tokens_serializer = TokenPairSerializer(instance=tokens)
+        return Response(data=tokens_serializer.data, status=status.HTTP_200_OK)
+
+    def get_invalid_credentials_response(self) -> Response:
+        serializer = InvalidCredentialsSerializer(
+            instance={"detail": "Invalid credentials"}
+        )
+        return Response(
+            data=serializer.data,
+            status=status.HTTP_401_UNAUTHORIZED,
+        )
+
+
+class AsyncTokenPairObtainView(AsyncAPIView, TokenPairObtainView):
+    async def post(self, request, *args, **kwargs):
+        serializer = TokenObtainPairSerializer(data=self.request.data)
+        serializer.is_valid(raise_exception=True)
+        user: User | None = await aauthenticate(
+            request,
+            login=serializer.data.get("login"),
+            password=serializer.data.get("password"),
+        )
+        if user:
+            await arecord_login(user)
+            # Issuing the tokens registers them in the cache
+            return await sync_to_async(self.get_tokens_response)(user)
+        else:
+            return self.get_invalid_credentials_response()
 
 
 @extend_schema(
     summary="Refresh a JWT auth token",
-    description="Takes a refresh JWT token and obtain a new refreshed access JWT token",
+    description=(
+        "Takes a refresh JWT token and returns a new access and refresh JWT token "
+        "pair. A refresh token can only be used once, reusing it revokes every "
+        "token of its user."
+    ),
     tags=["auth"],
     responses={
         status.HTTP_200_OK: TokenRefreshResponseSerializer,
@@ -96,11 +133,15 @@ class TokenPairObtainView(APIView):
     examples=[InvalidTokenExample],
 )
 class TokenRefreshObtainView(TokenRefreshView):
+    serializer_class = TokenRefreshSerializer
+
     def post(self, request: Request, *args, **kwargs) -> Response:
         return super().post(request, *args, **kwargs)
 
 
 class VerifyTokenView(TokenVerifyView):
+    serializer_class = TokenVerifySerializer
+
     @extend_schema(
         summary="Verify a JWT auth token",
         description="Verify a JWT auth token and",
@@ -128,12 +169,13 @@ class VerifyTokenView(TokenVerifyView):
 )
 class RegisterUserView(APIView):
     permission_classes = [AllowAny]
+    throttle_scope = "register"
 
     def post(self, request, *args, **kwargs):
         serializer = UserRegisterSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         user = serializer.save()
-        token_pair_serializer = TokenPairSerializer(instance=user)
+        token_pair_serializer = TokenPairSerializer(instance=get_tokens(user))
         return Response(data=token_pair_serializer.data, status=status.HTTP_201_CREATED)
 
 
@@ -144,6 +186,7 @@ class RegisterUserView(APIView):
 )
 class RequestPasswordResetView(GenericAPIView):
     permission_classes = [AllowAny]
+    throttle_scope = "password_reset"
     serializer_class = RequestPasswordResetSerializer
 
     def post(self, request, *args, **kwargs):
@@ -156,15 +199,8 @@ class RequestPasswordResetView(GenericAPIView):
             token_generator = PasswordResetTokenGenerator()
             token = token_generator.make_token(user)
             uid = urlsafe_base64_encode(force_bytes(user.pk))
-
-            # TODO: Use celery task
-            send_mail(
-                "Password Reset Request",
-                f"Use this link to reset your password: {settings.FRONTEND_URL}/auth/reset-password/{uid}/{token}/",
-                "from@example.com",
-                [user.email],
-                fail_silently=False,
-            )
+            reset_url = f"{settings.FRONTEND_URL}/auth/reset-password/{uid}/{token}/"
+            send_password_reset_email.delay(user.email, reset_url)
 
             return Response(
                 data={
@@ -196,6 +232,7 @@ class RequestPasswordResetView(GenericAPIView):
 )
 class ResetPasswordView(GenericAPIView):
     permission_classes = [AllowAny]
+    throttle_scope = "password_reset"
     serializer_class = ResetPasswordSerializer
 
     def post(self, request, uidb64, token, *args, **kwargs):
@@ -212,6 +249,7 @@ class ResetPasswordView(GenericAPIView):
         serializer.is_valid(raise_exception=True)
         user.set_password(serializer.validated_data["password"])
         user.save()
+        revoke_user_tokens(user.pk)
 
         return Response(
             {"detail": "Password has been reset."}, status=status.HTTP_200_OK
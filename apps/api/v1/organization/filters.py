@@ -1,5 +1,7 @@
+from django.db.models import Q
 from django_filters import rest_framework as drf
 
+from apps.api.v1.user.filters import full_name
 from apps.organization.models import Invitation, Member, Organization
 
 __all__ = [
@@ -23,14 +25,30 @@ class OrganizationFilter(drf.FilterSet):
 
 
 class MemberFilter(drf.FilterSet):
+    search = drf.CharFilter(method="filter_search", label="search")
+    name = drf.CharFilter(method="filter_name", label="name")
+    email = drf.CharFilter(field_name="user__email", lookup_expr="icontains")
+
     class Meta:
         model = Member
-        # TODO: add name filter
         fields = (
             "role",
             "is_active",
         )
 
+    def filter_name(self, queryset, name, value):
+        return queryset.annotate(user_full_name=full_name("user__")).filter(
+            user_full_name__icontains=value
+        )
+
+    def filter_search(self, queryset, name, value):
+        """Search the name, email and username of the members."""
+        return queryset.annotate(user_full_name=full_name("user__")).filter(
+            Q(user_full_name__icontains=value)
+            | Q(user__email__icontains=value)
+            | Q(user__username__icontains=value)
+        )
+
 
 class InvitationFilter(drf.FilterSet):
     class Meta:
@@ -0,0 +1,66 @@
+from django.http import Http404
+from rest_framework.permissions import SAFE_METHODS, BasePermission
+
+from apps.organization.memberships import get_organization_role
+from apps.organization.models import Member
+
+__all__ = [
+    "IsOrganizationMember",
+    "IsOrganizationAdmin",
+    "IsOrganizationAdminOrReadOnly",
+    "CanManageOrganization",
+]
+
+Role = Member.MemberRole
+
+ALL_ROLES = frozenset(Role.values)
+ADMIN_ROLES = frozenset((Role.OWNER, Role.ADMIN))
+
+
+class OrganizationRolePermission(BasePermission):
+    """
+    Allow the requests of the members of the organization of the ``slug`` URL
+    keyword whose role is allowed for the request method.
+
+    Users who aren't members get a 404 so the organizations they can't see
+    aren't disclosed. The role is looked up in the cached memberships of the
+    user, see ``apps.organization.memberships``.
+    """
+
+    safe_roles: frozenset[str] = ALL_ROLES
+    unsafe_roles: frozenset[str] = ALL_ROLES
+
+    def get_allowed_roles(self, request) -> frozenset[str]:
+        if request.method in SAFE_METHODS:
+            return self.safe_roles
+        return self.unsafe_roles
+
+    def has_permission(self, request, view) -> bool:
+        if not request.user.is_authenticated:
+            return False
+        _, role = get_organization_role(request.user.pk, view.kwargs["slug"])
+        if role is None:
+            raise Http404
+        return role in self.get_allowed_roles(request)
+
+
+class IsOrganizationMember(OrganizationRolePermission):
+    pass
+
+
+class IsOrganizationAdmin(OrganizationRolePermission):
+    safe_roles = ADMIN_ROLES
+    unsafe_roles = ADMIN_ROLES
+
+
+class IsOrganizationAdminOrReadOnly(OrganizationRolePermission):
+    unsafe_roles = ADMIN_ROLES
+
+
+class CanManageOrganization(IsOrganizationAdminOrReadOnly):
+    """Only the owner deletes the organization, its admins update it."""
+
+    def get_allowed_roles(self, request) -> frozenset[str]:
+        if request.method == "DELETE":
+            return frozenset((Role.OWNER,))
+        return super().get_allowed_roles(request)
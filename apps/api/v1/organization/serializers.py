@@ -1,7 +1,12 @@
+import csv
+import io
+
+from django.conf import settings
 from django_countries.serializer_fields import CountryField
 from rest_framework import serializers
 
 from apps.api.v1.user.serializers import UserSerializer
+from apps.organization.managers import BulkInviteStatus
 from apps.organization.models import Invitation, Member, Organization
 
 __all__ = [
@@ -10,10 +15,19 @@ __all__ = [
     "MinimalMemberSerializer",
     "MemberSerializer",
     "CreateInvitationSerializer",
+    "BulkInvitationSerializer",
+    "BulkInvitationResultSerializer",
     "MinimalInvitationSerializer",
     "InvitationSerializer",
 ]
 
+# The owner role is never granted by an invitation, see ``Organization.owner``
+INVITATION_ROLE_CHOICES = [
+    (value, label)
+    for value, label in Member.MemberRole.choices
+    if value != Member.MemberRole.OWNER
+]
+
 
 class MinimalOrganizationSerializer(serializers.ModelSerializer):
     class Meta:
@@ -27,6 +41,9 @@ class MinimalOrganizationSerializer(serializers.ModelSerializer):
             "status",
             "country",
         ]
+        # The owner deletes the organization, its admins updating it can't
+        # take it over
+        read_only_fields = ("owner",)
 
 
 class OrganizationSerializer(serializers.ModelSerializer):
@@ -57,6 +74,15 @@ class MinimalMemberSerializer(serializers.ModelSerializer):
             "role",
             "is_active",
         ]
+        read_only_fields = ("organization", "user")
+
+    def validate_role(self, role: str) -> str:
+        # The owner of an organization is its Organization.owner, the owner
+        # role of its members can't be granted or taken away
+        current = self.instance.role if self.instance is not None else None
+        if role != current and Member.MemberRole.OWNER in (role, current):
+            raise serializers.ValidationError("The owner role can't be changed.")
+        return role
 
 
 class MemberSerializer(serializers.ModelSerializer):
@@ -75,6 +101,10 @@ class MemberSerializer(serializers.ModelSerializer):
 
 
 class CreateInvitationSerializer(serializers.ModelSerializer):
+    role = serializers.ChoiceField(
+        choices=INVITATION_ROLE_CHOICES, default=Member.MemberRole.MEMBER
+    )
+
     class Meta:
         model = Invitation
         fields = (
@@ -83,6 +113,65 @@ class CreateInvitationSerializer(serializers.ModelSerializer):
         )
 
 
+class BulkInvitationRowSerializer(serializers.Serializer):
+    email = serializers.CharField(allow_blank=True)
+    role = serializers.CharField(required=False, allow_blank=True)
+
+
+class BulkInvitationSerializer(serializers.Serializer):
+    """
+    Bulk invitations either as a JSON list or as a CSV file upload.
+
+    The CSV file must have a header row with an ``email`` column and an
+    optional ``role`` column. Rows are not validated here so that a single
+    invalid email does not reject the whole request.
+    """
+
+    invitations = BulkInvitationRowSerializer(many=True, required=False)
+    file = serializers.FileField(required=False)
+    role = serializers.ChoiceField(
+        choices=INVITATION_ROLE_CHOICES,
+        default=Member.MemberRole.MEMBER,
+        help_text="The role of the rows that don't specify one.",
+    )
+
+    def validate_file(self, value):
+        try:
+            reader = csv.DictReader(io.TextIOWrapper(value, encoding="utf-8-sig"))
+            if not reader.fieldnames or "email" not in reader.fieldnames:
+                raise serializers.ValidationError("The file must have an email column.")
+            return [
+                {"email": row.get("email") or "", "role": row.get("role") or ""}
+                for row in reader
+            ]
+        except (UnicodeDecodeError, csv.Error):
+            raise serializers.ValidationError("Invalid CSV file.")
+
+    def validate(self, attrs: dict):
+        invitations = attrs.get("invitations")
+        rows = attrs.get("file")
+        if (invitations is None) == (rows is None):
+            raise serializers.ValidationError(
+                {"invitations": ["Provide either invitations or a file."]}
+            )
+        rows = invitations if rows is None else rows
+        max_size = settings.INVITATION_BULK_MAX_SIZE
+        if len(rows) > max_size:
+            raise serializers.ValidationError(
+                {"invitations": [f"Ensure there are no more than {max_size} rows."]}
+            )
+        attrs["rows"] = rows
+        return attrs
+
+
+class BulkInvitationResultSerializer(serializers.Serializer):
+    id = serializers.IntegerField(allow_null=True)
+    email = serializers.CharField()
+    role = serializers.CharField()
+    status = serializers.ChoiceField(choices=BulkInviteStatus.choices)
+    detail = serializers.CharField(allow_null=True)
+
+
 class MinimalInvitationSerializer(serializers.ModelSerializer):
     class Meta:
         model = Invitation
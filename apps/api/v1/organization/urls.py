@@ -1,7 +1,10 @@
+from django.conf import settings
 from django.urls import path
 
 from apps.api.v1.organization.views import (
     AcceptInvitationView,
+    AsyncListCreateOrganizationView,
+    BulkInviteMemberView,
     InviteMemberView,
     ListCreateOrganizationView,
     ListInvitationView,
@@ -18,7 +21,11 @@ urlpatterns = [
     ),
     path(
         "",
-        ListCreateOrganizationView.as_view(),
+        (
+            AsyncListCreateOrganizationView
+            if settings.ASYNC_API_VIEWS
+            else ListCreateOrganizationView
+        ).as_view(),
         name="list-create-organization",
     ),
     path(
@@ -41,6 +48,11 @@ urlpatterns = [
         InviteMemberView.as_view(),
         name="invite-member",
     ),
+    path(
+        "<str:slug>/invitations/bulk",
+        BulkInviteMemberView.as_view(),
+        name="bulk-invite-members",
+    ),
     path(
         "<str:slug>/invitations/<str:token>/accept",
         AcceptInvitationView.as_view(),
@@ -1,6 +1,12 @@
+from functools import partial
+
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 from drf_spectacular.utils import extend_schema
 from rest_framework import status
+from rest_framework.exceptions import ValidationError
 from rest_framework.generics import (
     ListAPIView,
     ListCreateAPIView,
@@ -16,7 +22,15 @@ from apps.api.v1.organization.filters import (
     MemberFilter,
     OrganizationFilter,
 )
+from apps.api.v1.organization.permissions import (
+    CanManageOrganization,
+    IsOrganizationAdmin,
+    IsOrganizationAdminOrReadOnly,
+    IsOrganizationMember,
+)
 from apps.api.v1.organization.serializers import (
+    BulkInvitationResultSerializer,
+    BulkInvitationSerializer,
     CreateInvitationSerializer,
     InvitationSerializer,
     MemberSerializer,
@@ -25,16 +39,25 @@ from apps.api.v1.organization.serializers import (
     MinimalOrganizationSerializer,
     OrganizationSerializer,
 )
+from apps.organization.managers import BulkInviteStatus
+from apps.organization.memberships import get_organization_id
 from apps.organization.models import Invitation, Member, Organization
+from apps.organization.tasks import enqueue_invitation_emails
+from core.cache import CachedResponseMixin
 from core.pagination import PagePaginator
+from core.prefetch import PrefetchPlanMixin
+from core.routers import ReplicaReadMixin
+from core.views import AsyncAPIView, AsyncListModelMixin
 
 __all__ = [
+    "AsyncListCreateOrganizationView",
     "ListCreateOrganizationView",
     "RetrieveUpdateDestroyOrganizationView",
     "ListMemberView",
     "RetrieveUpdateDestroyMemberView",
     "ListInvitationView",
     "InviteMemberView",
+    "BulkInviteMemberView",
     "AcceptInvitationView",
 ]
 
@@ -44,26 +67,36 @@ __all__ = [
     description="List and create organizations",
     tags=["organizations"],
 )
-class ListCreateOrganizationView(ListCreateAPIView):
+class ListCreateOrganizationView(
+    ReplicaReadMixin, PrefetchPlanMixin, ListCreateAPIView
+):
+    queryset = Organization.objects.all()
     serializer_class = OrganizationSerializer
     permission_classes = [IsAuthenticated]
     pagination_class = PagePaginator
     filterset_class = OrganizationFilter
 
-    def get_queryset(self):
-        qs = Organization.objects.select_related(
-            "owner",
-        )
-        return qs
 
+class AsyncListCreateOrganizationView(
+    AsyncListModelMixin, AsyncAPIView, ListCreateOrganizationView
+):
+    async def get(self, request, *args, **kwargs):
+        return await self.alist(request, *args, **kwargs)
 
-class RetrieveUpdateDestroyOrganizationView(RetrieveUpdateDestroyAPIView):
+    async def post(self, request, *args, **kwargs):
+        return await sync_to_async(self.create)(request, *args, **kwargs)
+
+
+class RetrieveUpdateDestroyOrganizationView(
+    CachedResponseMixin, RetrieveUpdateDestroyAPIView
+):
     queryset = Organization.objects.all()
     serializer_class = MinimalOrganizationSerializer
-    permission_classes = [IsAuthenticated]
+    permission_classes = [IsAuthenticated, CanManageOrganization]
     lookup_url_kwarg = "slug"
     lookup_field = "slug"
     http_method_names = ["get", "patch", "delete"]
+    response_cache_namespace = "organizations"
 
     @extend_schema(
         summary="Get an organization",
@@ -74,7 +107,9 @@ class RetrieveUpdateDestroyOrganizationView(RetrieveUpdateDestroyAPIView):
         },
     )
     def get(self, request, *args, **kwargs):
-        return super().get(request, *args, **kwargs)
+        return self.cached_response(
+            request, partial(super().get, request, *args, **kwargs)
+        )
 
     @extend_schema(
         summary="Update an organization",
@@ -99,20 +134,45 @@ class RetrieveUpdateDestroyOrganizationView(RetrieveUpdateDestroyAPIView):
     def delete(self, request, *args, **kwargs):
         return super().delete(request, *args, **kwargs)
 
+    def perform_destroy(self, instance: Organization):
+        # Members and invitations are purged in the background
+        instance.soft_delete(deleted_by_id=self.request.user.pk)
+
+
+class OrganizationScopedMixin:
+    """
+    Scope the queryset of a list view to the organization of the ``slug`` URL
+    keyword.
+
+    The slug is resolved to an id through the cache so that the listing only
+    filters on the indexed ``organization_id`` column.
+    """
+
+    def get_organization_id(self) -> int:
+        if not hasattr(self, "_organization_id"):
+            organization_id = get_organization_id(self.kwargs["slug"])
+            if organization_id is None:
+                raise Http404
+            self._organization_id = organization_id
+        return self._organization_id
+
+    def get_queryset(self):
+        return super().get_queryset().filter(organization_id=self.get_organization_id())
+
 
 @extend_schema(
     summary="List organization members",
     description="List organization members",
     tags=["organization members"],
 )
-class ListMemberView(ListAPIView):
-    queryset = Member.objects.select_related("organization").all()
+class ListMemberView(
+    ReplicaReadMixin, PrefetchPlanMixin, OrganizationScopedMixin, ListAPIView
+):
+    queryset = Member.objects.all()
     serializer_class = MemberSerializer
-    permission_classes = [IsAuthenticated]
+    permission_classes = [IsAuthenticated, IsOrganizationMember]
     pagination_class = PagePaginator
     filterset_class = MemberFilter
-    lookup_url_kwarg = "slug"
-    lookup_field = "organization__slug"
 
 
 @extend_schema(
@@ -122,14 +182,14 @@ class ListMemberView(ListAPIView):
 )
 class RetrieveUpdateDestroyMemberView(RetrieveUpdateDestroyAPIView):
     serializer_class = MinimalMemberSerializer
-    permission_classes = [IsAuthenticated]
+    permission_classes = [IsAuthenticated, IsOrganizationAdminOrReadOnly]
     http_method_names = ["get", "patch", "delete"]
 
     def get_object(self):
         organization_slug = self.kwargs["slug"]
         member_id = self.kwargs["id"]
         obj = get_object_or_404(
-            Member, organization__slug=organization_slug, id=member_id
+            Member, organization_id=get_organization_id(organization_slug), id=member_id
         )
         return obj
 
@@ -139,21 +199,18 @@ class RetrieveUpdateDestroyMemberView(RetrieveUpdateDestroyAPIView):
     description="List organization invitations",
     tags=["organization members"],
 )
-class ListInvitationView(ListAPIView):
-    queryset = Invitation.objects.select_related(
-        "organization",
-        "invited_by",
-    ).all()
+class ListInvitationView(
+    ReplicaReadMixin, PrefetchPlanMixin, OrganizationScopedMixin, ListAPIView
+):
+    queryset = Invitation.objects.all()
     serializer_class = InvitationSerializer
-    permission_classes = [IsAuthenticated]
+    permission_classes = [IsAuthenticated, IsOrganizationAdmin]
     pagination_class = PagePaginator
     filterset_class = InvitationFilter
-    lookup_url_kwarg = "slug"
-    lookup_field = "organization__slug"
 
 
 class InviteMemberView(APIView):
-    permission_classes = [IsAuthenticated]
+    permission_classes = [IsAuthenticated, IsOrganizationAdmin]
     serializer_class = MinimalInvitationSerializer
 
     @extend_schema(
@@ -164,45 +221,101 @@ class InviteMemberView(APIView):
         responses={201: MinimalInvitationSerializer},
     )
     def post(self, request: Request, slug: str) -> Response:
-        invited_by = self.request.user
-        organization = get_object_or_404(Organization, slug=slug)
-        data = request.data.copy()
-        data["organization"] = organization.id
-        serializer = CreateInvitationSerializer(data=data)
+        organization_id = get_organization_id(slug)
+        if organization_id is None:
+            raise Http404
+        serializer = CreateInvitationSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        # TODO: send an invitation via email
-        # TODO: email url, frontend, ?organization_slug=slug&token=token
-        serializer.save(
-            invited_by=invited_by,
-            organization=organization,
+        # Checked against the members and pending invitations like the bulk
+        # invitations
+        [result] = Invitation.objects.bulk_invite(
+            organization_id=organization_id,
+            invited_by=request.user,
+            rows=[serializer.validated_data],
+            default_role=serializer.validated_data["role"],
+        )
+        if result["id"] is None:
+            raise ValidationError({"email": [BulkInviteStatus(result["status"]).label]})
+        transaction.on_commit(lambda: enqueue_invitation_emails([result["id"]]))
+        return Response(
+            CreateInvitationSerializer(result).data, status=status.HTTP_201_CREATED
         )
-        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
+class BulkInviteMemberView(APIView):
+    permission_classes = [IsAuthenticated, IsOrganizationAdmin]
+
+    @extend_schema(
+        summary="Invite new members to the organization in bulk",
+        description=(
+            "Invite up to thousands of members at once from a JSON list or a CSV "
+            "file upload. Invalid, duplicated, already invited and existing "
+            "members' emails are reported per row, and the invitation emails "
+            "are sent in the background."
+        ),
+        tags=["organization invitations"],
+        request=BulkInvitationSerializer,
+        responses={
+            status.HTTP_201_CREATED: BulkInvitationResultSerializer(many=True),
+        },
+    )
+    def post(self, request: Request, slug: str) -> Response:
+        organization_id = get_organization_id(slug)
+        if organization_id is None:
+            raise Http404
+        serializer = BulkInvitationSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        results = Invitation.objects.bulk_invite(
+            organization_id=organization_id,
+            invited_by=request.user,
+            rows=serializer.validated_data["rows"],
+            default_role=serializer.validated_data["role"],
+        )
+        invitation_ids = [result["id"] for result in results if result["id"]]
+        transaction.on_commit(lambda: enqueue_invitation_emails(invitation_ids))
+        result_serializer = BulkInvitationResultSerializer(results, many=True)
+        return Response(result_serializer.data, status=status.HTTP_201_CREATED)
+
 
 # TODO: Add verify token
 
+
 class AcceptInvitationView(APIView):
     permission_classes = [IsAuthenticated]
 
     @extend_schema(
         summary="Accept an invitation to join the organization",
-        description="Accept an invitation to join the organization",
+        description=(
+            "Accept an invitation to join the organization, sent to the email "
+            "of the user. Accepting an invitation again returns the same "
+            "membership."
+        ),
         tags=["organization invitations"],
         request=None,
         responses={
-            status.HTTP_200_OK: MemberSerializer,
+            status.HTTP_200_OK: MinimalMemberSerializer,
         },
     )
-    def post(self, request: Request, *args, **kwargs) -> Response:
-        token = self.kwargs["token"]
-        invitation = get_object_or_404(Invitation, token=token)
-        # TODO: insert a new member
-        if invitation.valid:
-            invitation.status = Invitation.InvitationStatus.ACCEPTED
-            invitation.save()
-            return Response(
-                status=status.HTTP_200_OK,
+    def post(self, request: Request, slug: str, token: str) -> Response:
+        organization_id = get_organization_id(slug)
+        if organization_id is None:
+            raise Http404
+        email = request.user.email
+        member = Invitation.objects.accept(
+            token, organization_id, request.user.pk, email
+        )
+        if member is None:
+            # Invitations of other organizations or emails aren't disclosed
+            get_object_or_404(
+                Invitation,
+                token=token,
+                organization_id=organization_id,
+                email__iexact=email,
             )
-        else:
             return Response(
                 status=status.HTTP_406_NOT_ACCEPTABLE,
             )
+        return Response(
+            MinimalMemberSerializer(member).data,
+            status=status.HTTP_200_OK,
+        )
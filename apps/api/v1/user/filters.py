@@ -1,16 +1,25 @@
-from django.db.models import Value
-from django.db.models.functions import Concat
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db import connections
+from django.db.models import Q, Value
+from django.db.models.functions import Concat, Greatest
 from django_filters import rest_framework as drf
 
 from apps.user.models import User
 
 __all__ = [
     "UserFilter",
+    "full_name",
 ]
 
 
+def full_name(prefix: str = ""):
+    # Must match the expression of the ``users_name_trgm_idx`` index
+    return Concat(f"{prefix}first_name", Value(" "), f"{prefix}last_name")
+
+
 class UserFilter(drf.FilterSet):
     o = drf.OrderingFilter(fields=(("id", "id"),))
+    search = drf.CharFilter(method="filter_search", label="search")
     name = drf.CharFilter(method="filter_name", label="name")
     email = drf.CharFilter(field_name="email", lookup_expr="icontains")
     username = drf.CharFilter(field_name="username", lookup_expr="icontains")
@@ -26,6 +35,27 @@ class UserFilter(drf.FilterSet):
         )
 
     def filter_name(self, queryset, name, value):
+        return queryset.annotate(name=full_name()).filter(name__icontains=value)
+
+    def filter_search(self, queryset, name, value):
+        """
+        Search the name, email, username and phone number at once.
+
+        Each lookup is backed by a trigram index on PostgreSQL, where the
+        results are ranked by their best trigram word similarity.
+        """
+        queryset = queryset.annotate(full_name=full_name()).filter(
+            Q(full_name__icontains=value)
+            | Q(email__icontains=value)
+            | Q(username__icontains=value)
+            | Q(phone_number__icontains=value)
+        )
+        if connections[queryset.db].vendor != "postgresql":
+            return queryset
         return queryset.annotate(
-            name=Concat("first_name", Value(" "), "last_name")
-        ).filter(name__icontains=value)
+            rank=Greatest(
+                TrigramWordSimilarity(value, "full_name"),
+                TrigramWordSimilarity(value, "email"),
+                TrigramWordSimilarity(value, "username"),
+            )
+        ).order_by("-rank", "-id")
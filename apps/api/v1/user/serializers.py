@@ -1,9 +1,22 @@
 from django.contrib.auth.password_validation import validate_password
+from django.contrib.auth.validators import UnicodeUsernameValidator
 from rest_framework import serializers, status
+from rest_framework.validators import UniqueValidator
 
 from apps.user.models import User
 
 
+def unique_user_validator(field: str) -> UniqueValidator:
+    """
+    Validate that no user has the value of ``field``, deleted users included:
+    their rows keep the value taken until they are purged.
+    """
+    return UniqueValidator(
+        queryset=User.all_objects.all(),
+        message=User._meta.get_field(field).error_messages["unique"],
+    )
+
+
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
@@ -23,6 +36,14 @@ class UserSerializer(serializers.ModelSerializer):
             "date_joined": {"read_only": True},
             "updated_at": {"read_only": True},
             "last_login": {"read_only": True},
+            "email": {"validators": [unique_user_validator("email")]},
+            "username": {
+                "validators": [
+                    UnicodeUsernameValidator(),
+                    unique_user_validator("username"),
+                ]
+            },
+            "phone_number": {"validators": [unique_user_validator("phone_number")]},
         }
 
 
@@ -1,6 +1,9 @@
+from django.conf import settings
 from django.urls import path
 
 from apps.api.v1.user.views import (
+    AsyncGetCurrentUserView,
+    AsyncUserListView,
     GetCurrentUserView,
     PasswordChangeView,
     RetrieveUpdateDestroyUserView,
@@ -10,9 +13,16 @@ from apps.api.v1.user.views import (
 urlpatterns = [
     path(
         "me",
-        GetCurrentUserView.as_view(),
+        (
+            AsyncGetCurrentUserView if settings.ASYNC_API_VIEWS else GetCurrentUserView
+        ).as_view(),
         name="get-auth-user",
     ),
+    path(
+        "change-password",
+        PasswordChangeView.as_view(),
+        name="change-password",
+    ),
     path(
         "<str:email>",
         RetrieveUpdateDestroyUserView.as_view(),
@@ -20,12 +30,7 @@ urlpatterns = [
     ),
     path(
         "",
-        UserListView.as_view(),
+        (AsyncUserListView if settings.ASYNC_API_VIEWS else UserListView).as_view(),
         name="list-users",
     ),
-    path(
-        "change-password",
-        PasswordChangeView.as_view(),
-        name="change-password",
-    ),
 ]
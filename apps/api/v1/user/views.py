@@ -1,4 +1,3 @@
-from django.shortcuts import get_object_or_404
 from drf_spectacular.utils import OpenApiExample, extend_schema, inline_serializer
 from rest_framework import serializers, status
 from rest_framework.generics import (
@@ -21,10 +20,17 @@ from apps.api.v1.user.serializers import (
     UserSerializer,
 )
 from apps.user.models import User
+from core.auth_backends import aget_request_user, get_request_user
+from core.cache import CachedResponseMixin
 from core.pagination import PagePaginator
+from core.prefetch import PrefetchPlanMixin
+from core.routers import ReplicaReadMixin
 from core.serializers import NotFoundSerializer
+from core.views import AsyncAPIView, AsyncListModelMixin
 
 __all__ = [
+    "AsyncGetCurrentUserView",
+    "AsyncUserListView",
     "GetCurrentUserView",
     "RetrieveUpdateDestroyUserView",
     "UserListView",
@@ -44,12 +50,30 @@ __all__ = [
         UserNotFoundExample,
     ],
 )
-class GetCurrentUserView(GenericAPIView):
+class GetCurrentUserView(CachedResponseMixin, GenericAPIView):
+    serializer_class = UserSerializer
     permission_classes = [IsAuthenticated]
+    response_cache_namespace = "users"
+
+    def get_response_cache_identifier(self):
+        return self.request.user.pk
 
     def get(self, request, *args, **kwargs):
-        user = get_object_or_404(User, pk=request.user.pk)
-        serializer = UserSerializer(user)
+        return self.cached_response(request, self.retrieve_current_user)
+
+    def retrieve_current_user(self) -> Response:
+        user = get_request_user(self.request)
+        serializer = self.get_serializer(user)
+        return Response(serializer.data)
+
+
+class AsyncGetCurrentUserView(AsyncAPIView, GetCurrentUserView):
+    async def get(self, request, *args, **kwargs):
+        return await self.acached_response(request, self.aretrieve_current_user)
+
+    async def aretrieve_current_user(self) -> Response:
+        user = await aget_request_user(self.request)
+        serializer = self.get_serializer(user)
         return Response(serializer.data)
 
 
@@ -107,13 +131,17 @@ class RetrieveUpdateDestroyUserView(RetrieveUpdateDestroyAPIView):
     def delete(self, request, *args, **kwargs):
         return super().delete(request, *args, **kwargs)
 
+    def perform_destroy(self, instance: User):
+        # The memberships and invitations are purged in the background
+        instance.soft_delete(deleted_by_id=self.request.user.pk)
+
 
 @extend_schema(
     summary="List users",
     description="A paginated and filtered list of users",
     tags=["users"],
 )
-class UserListView(ListAPIView):
+class UserListView(ReplicaReadMixin, PrefetchPlanMixin, ListAPIView):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     pagination_class = PagePaginator
@@ -121,6 +149,11 @@ class UserListView(ListAPIView):
     filterset_class = UserFilter
 
 
+class AsyncUserListView(AsyncListModelMixin, AsyncAPIView, UserListView):
+    async def get(self, request, *args, **kwargs):
+        return await self.alist(request, *args, **kwargs)
+
+
 @extend_schema(
     summary="Change user password",
     description="Takes the old password, new password and confirm new password to change the user password.",
@@ -136,7 +169,7 @@ class PasswordChangeView(APIView):
     permission_classes = [IsAuthenticated]
 
     def patch(self, request, *args, **kwargs):
-        user = get_object_or_404(User, pk=self.request.user.pk)
+        user = get_request_user(request)
         password = self.request.data.get("password")
         new_password = self.request.data.get("new_password")
         if not user.check_password(password):
@@ -0,0 +1,63 @@
+"""
+This module contains the password hashers benchmark.
+
+It measures how many password verifications, i.e. logins, a single worker
+thread sustains with each hasher, and how many the asynchronous checks
+sustain when they spread the verifications over the password hashing
+thread pool.
+"""
+
+import asyncio
+import time
+from typing import Any
+
+from django.contrib.auth.hashers import get_hasher, get_hashers_by_algorithm
+
+from core.hashers import acheck_password
+
+__all__ = [
+    "benchmark_hashers",
+]
+
+PASSWORD = "benchmark-password"
+
+
+def _logins_per_second(encoded: str, logins: int) -> float:
+    hasher = get_hasher(encoded.partition("$")[0])
+    start = time.perf_counter()
+    for _ in range(logins):
+        hasher.verify(PASSWORD, encoded)
+    return logins / (time.perf_counter() - start)
+
+
+async def _async_logins_per_second(encoded: str, logins: int) -> float:
+    start = time.perf_counter()
+    await asyncio.gather(*(acheck_password(PASSWORD, encoded) for _ in range(logins)))
+    return logins / (time.perf_counter() - start)
+
+
+def benchmark_hashers(logins: int = 20) -> dict[str, dict[str, Any]]:
+    """
+    Benchmark every installed hasher whose library is available, the
+    preferred hasher first.
+    """
+    results = {}
+    for algorithm, hasher in get_hashers_by_algorithm().items():
+        try:
+            encoded = hasher.encode(PASSWORD, hasher.salt())
+        except ValueError:
+            # e.g. argon2 without argon2-cffi installed
+            continue
+        results[algorithm] = {
+            "hasher": f"{type(hasher).__module__}.{type(hasher).__qualname__}",
+            "summary": {
+                str(key): value
+                for key, value in hasher.safe_summary(encoded).items()
+                if str(key) not in ("salt", "hash")
+            },
+            "logins_per_second": round(_logins_per_second(encoded, logins), 2),
+            "async_logins_per_second": round(
+                asyncio.run(_async_logins_per_second(encoded, logins)), 2
+            ),
+        }
+    return results
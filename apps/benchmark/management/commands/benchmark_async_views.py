@@ -0,0 +1,75 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+# The scenarios hitting the endpoints which have an async view
+DEFAULT_SCENARIOS = [
+    "token_obtain",
+    "current_user:4",
+    "user_list:2",
+    "organization_list:2",
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Replay the same request mix against the sync and then the async API "
+        "views, in a process each with the same concurrency, and compare their "
+        "latency and throughput."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=1000)
+        parser.add_argument("--concurrency", type=int, default=10)
+        parser.add_argument("--warmup", type=int, default=50)
+        parser.add_argument(
+            "--scenario",
+            action="append",
+            dest="scenarios",
+            metavar="NAME[:WEIGHT]",
+            help="A scenario of the request mix, see run_benchmark.",
+        )
+        parser.add_argument(
+            "--output-dir",
+            type=Path,
+            default=Path("."),
+            help="The directory of the sync and async JSON results files.",
+        )
+
+    def handle(self, *args, **options):
+        timestamp = f"{timezone.now():%Y%m%d-%H%M%S}"
+        outputs = {
+            mode: options["output_dir"] / f"benchmark-{mode}-{timestamp}.json"
+            for mode in ("sync", "async")
+        }
+        arguments = [
+            f"--requests={options['requests']}",
+            f"--concurrency={options['concurrency']}",
+            f"--warmup={options['warmup']}",
+            *(
+                f"--scenario={scenario}"
+                for scenario in options["scenarios"] or DEFAULT_SCENARIOS
+            ),
+        ]
+
+        for mode, output in outputs.items():
+            self.stdout.write(self.style.MIGRATE_HEADING(f"{mode.capitalize()} views"))
+            command = [
+                sys.executable,
+                str(settings.BASE_DIR / "manage.py"),
+                "run_benchmark",
+                *arguments,
+                f"--output={output}",
+            ]
+            if mode == "async":
+                command.append(f"--compare={outputs['sync']}")
+            # The URLs route to the sync or async views when they are loaded
+            env = {**os.environ, "ASYNC_API_VIEWS": str(int(mode == "async"))}
+            self.stdout.flush()
+            if subprocess.run(command, env=env).returncode:
+                raise CommandError(f"The {mode} views benchmark failed.")
@@ -0,0 +1,31 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+from apps.benchmark.hashers import benchmark_hashers
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure the logins per second a worker sustains with each password "
+        "hasher, synchronously and through the password hashing thread pool."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--logins", type=int, default=20)
+        parser.add_argument("--output", type=Path, help="A JSON results file.")
+
+    def handle(self, *args, **options):
+        results = benchmark_hashers(options["logins"])
+        self.stdout.write(f"{'algorithm':<16}{'logins/s':>12}{'async logins/s':>18}")
+        for algorithm, result in results.items():
+            self.stdout.write(
+                f"{algorithm:<16}{result['logins_per_second']:>12}"
+                f"{result['async_logins_per_second']:>18}"
+            )
+        if options["output"]:
+            options["output"].write_text(json.dumps(results, indent=2))
+            self.stdout.write(
+                self.style.SUCCESS(f"Saved the results to {options['output']}")
+            )
@@ -0,0 +1,103 @@
+import json
+from pathlib import Path
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.benchmark.runner import run_benchmark
+from apps.benchmark.scenarios import DEFAULT_MIX, SCENARIOS
+
+
+class Command(BaseCommand):
+    help = (
+        "Replay a weighted mix of API requests against the ASGI application and "
+        "report the latency percentiles, queries per request and throughput."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=1000)
+        parser.add_argument("--concurrency", type=int, default=10)
+        parser.add_argument("--warmup", type=int, default=50)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--scenario",
+            action="append",
+            dest="scenarios",
+            metavar="NAME[:WEIGHT]",
+            help=f"A scenario of the request mix, one of {', '.join(SCENARIOS)}.",
+        )
+        parser.add_argument(
+            "--output",
+            type=Path,
+            help="The JSON results file, defaults to benchmark-<timestamp>.json.",
+        )
+        parser.add_argument(
+            "--compare",
+            type=Path,
+            help="A previous JSON results file to compare the results with.",
+        )
+
+    def get_scenarios(self, specs: list[str] | None):
+        if not specs:
+            return [SCENARIOS[name](weight) for name, weight in DEFAULT_MIX.items()]
+
+        scenarios = []
+        for spec in specs:
+            name, _, weight = spec.partition(":")
+            if name not in SCENARIOS:
+                raise CommandError(f"Unknown scenario {name!r}.")
+            scenarios.append(SCENARIOS[name](float(weight) if weight else None))
+        return scenarios
+
+    def handle(self, *args, **options):
+        scenarios = self.get_scenarios(options["scenarios"])
+        try:
+            result = run_benchmark(
+                scenarios,
+                requests=options["requests"],
+                concurrency=options["concurrency"],
+                warmup=options["warmup"],
+                seed=options["seed"],
+            ).as_dict()
+        except ImproperlyConfigured as exc:
+            raise CommandError(exc) from exc
+
+        previous = None
+        if options["compare"]:
+            previous = json.loads(options["compare"].read_text())
+        self.write_summary(result, previous)
+
+        output = options["output"] or Path(
+            f"benchmark-{timezone.now():%Y%m%d-%H%M%S}.json"
+        )
+        output.write_text(json.dumps(result, indent=2))
+        self.stdout.write(self.style.SUCCESS(f"Saved the results to {output}"))
+
+    def write_summary(self, result: dict, previous: dict | None) -> None:
+        header = (
+            f"{'scenario':<20}{'requests':>10}{'errors':>8}{'req/s':>10}"
+            f"{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'queries':>9}"
+        )
+        self.stdout.write(header)
+        rows = {**result["scenarios"], "total": result["total"]}
+        for name, stats in rows.items():
+            latency = stats["latency_ms"]
+            self.stdout.write(
+                f"{name:<20}{stats['requests']:>10}{stats['errors']:>8}"
+                f"{stats['throughput']:>10}{latency['p50']:>10}{latency['p95']:>10}"
+                f"{latency['p99']:>10}{stats['queries']['mean']:>9}"
+            )
+            if previous is None:
+                continue
+            before = {**previous["scenarios"], "total": previous["total"]}.get(name)
+            if before is None:
+                continue
+            self.stdout.write(
+                f"{'  vs previous':<20}{'':>18}"
+                f"{stats['throughput'] - before['throughput']:>+10.2f}"
+                f"{latency['p50'] - before['latency_ms']['p50']:>+10.3f}"
+                f"{latency['p95'] - before['latency_ms']['p95']:>+10.3f}"
+                f"{latency['p99'] - before['latency_ms']['p99']:>+10.3f}"
+                f"{stats['queries']['mean'] - before['queries']['mean']:>+9.2f}"
+            )
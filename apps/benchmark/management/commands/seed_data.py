@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand
+
+from apps.benchmark.seed import (
+    seed_invitations,
+    seed_members,
+    seed_organizations,
+    seed_users,
+)
+
+
+class Command(BaseCommand):
+    help = "Seed a benchmark dataset of users, organizations, members and invitations."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=10_000)
+        parser.add_argument("--organizations", type=int, default=500)
+        parser.add_argument("--members", type=int, default=50_000)
+        parser.add_argument("--invitations", type=int, default=20_000)
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=5_000,
+            help="The number of rows inserted per query and transaction.",
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options["chunk_size"]
+        for name, seed in (
+            ("users", seed_users),
+            ("organizations", seed_organizations),
+            ("members", seed_members),
+            ("invitations", seed_invitations),
+        ):
+            count = options[name]
+            if not count:
+                continue
+
+            def progress(created, name=name, count=count):
+                self.stdout.write(f"\r{name}: {created}/{count}", ending="")
+                self.stdout.flush()
+
+            seed(count, chunk_size, progress)
+            self.stdout.write("")
+        self.stdout.write(self.style.SUCCESS("Seeded the benchmark dataset."))
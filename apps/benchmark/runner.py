@@ -0,0 +1,252 @@
+"""
+This module contains the benchmark runner replaying request mixes in process.
+
+Requests are sent straight to the ASGI application, without a server or a
+network in between, by up to ``concurrency`` concurrent clients. The queries
+of each request are counted by a database execute wrapper attached to every
+connection, which attributes them to the request through a context variable
+that ``asgiref`` carries into the threads running the synchronous views.
+"""
+
+import asyncio
+import json
+import math
+import platform
+import statistics
+import time
+from collections.abc import Iterable
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from random import Random
+from typing import Any
+
+import django
+from django.core.asgi import get_asgi_application
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.utils import timezone
+
+from .scenarios import Request, Scenario
+
+__all__ = [
+    "ASGIClient",
+    "BenchmarkResult",
+    "run_benchmark",
+]
+
+_request_queries: ContextVar[list[int] | None] = ContextVar(
+    "benchmark_request_queries", default=None
+)
+
+
+def _count_query(execute, sql, params, many, context):
+    counter = _request_queries.get()
+    if counter is not None:
+        counter[0] += 1
+    return execute(sql, params, many, context)
+
+
+def _install_query_counter(connection, **kwargs) -> None:
+    if _count_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_count_query)
+
+
+class ASGIClient:
+    """A minimal HTTP client calling an ASGI application in process."""
+
+    def __init__(self, application=None):
+        self.application = application or get_asgi_application()
+
+    async def request(self, request: Request) -> tuple[int, int]:
+        """Send ``request`` and return its status code and query count."""
+        path, _, query_string = request.path.partition("?")
+        body = json.dumps(request.data).encode() if request.data is not None else b""
+        headers = [
+            (b"host", b"testserver"),
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            *((k.lower().encode(), v.encode()) for k, v in request.headers.items()),
+        ]
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": request.method,
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": query_string.encode(),
+            "root_path": "",
+            "headers": headers,
+            "client": (request.client, 0),
+            "server": ("testserver", 80),
+        }
+        received = False
+        status_code = 0
+
+        async def receive():
+            nonlocal received
+            if received:
+                # Block like a client keeping the connection open
+                await asyncio.Event().wait()
+            received = True
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        async def send(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+
+        counter = [0]
+        token = _request_queries.set(counter)
+        try:
+            await self.application(scope, receive, send)
+        finally:
+            _request_queries.reset(token)
+        return status_code, counter[0]
+
+
+def _percentile(values: list[float], percent: float) -> float:
+    """The nearest-rank percentile of sorted ``values``."""
+    if not values:
+        return 0.0
+    rank = max(math.ceil(percent / 100 * len(values)), 1)
+    return values[rank - 1]
+
+
+@dataclass
+class ScenarioStats:
+    latencies: list[float] = field(default_factory=list)
+    queries: list[int] = field(default_factory=list)
+    errors: int = 0
+
+    def record(self, latency: float, status_code: int, queries: int) -> None:
+        self.latencies.append(latency)
+        self.queries.append(queries)
+        if not 200 <= status_code < 400:
+            self.errors += 1
+
+    def merge(self, other: "ScenarioStats") -> None:
+        self.latencies += other.latencies
+        self.queries += other.queries
+        self.errors += other.errors
+
+    def summary(self, duration: float) -> dict[str, Any]:
+        latencies = sorted(latency * 1000 for latency in self.latencies)
+        return {
+            "requests": len(latencies),
+            "errors": self.errors,
+            "throughput": round(len(latencies) / duration, 2) if duration else 0,
+            "latency_ms": {
+                "mean": round(statistics.fmean(latencies), 3) if latencies else 0,
+                "p50": round(_percentile(latencies, 50), 3),
+                "p95": round(_percentile(latencies, 95), 3),
+                "p99": round(_percentile(latencies, 99), 3),
+                "max": round(latencies[-1], 3) if latencies else 0,
+            },
+            "queries": {
+                "mean": round(statistics.fmean(self.queries), 2) if self.queries else 0,
+                "max": max(self.queries, default=0),
+            },
+        }
+
+
+@dataclass
+class BenchmarkResult:
+    started_at: str
+    duration: float
+    concurrency: int
+    scenarios: dict[str, dict[str, Any]]
+    total: dict[str, Any]
+    environment: dict[str, Any]
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "started_at": self.started_at,
+            "duration": round(self.duration, 3),
+            "concurrency": self.concurrency,
+            "environment": self.environment,
+            "total": self.total,
+            "scenarios": self.scenarios,
+        }
+
+
+async def _run(
+    client: ASGIClient,
+    scenarios: list[Scenario],
+    requests: int,
+    concurrency: int,
+    seed: int,
+) -> dict[str, ScenarioStats]:
+    rng = Random(seed)
+    weights = [scenario.weight for scenario in scenarios]
+    picks = rng.choices(scenarios, weights=weights, k=requests)
+    stats = {scenario.name: ScenarioStats() for scenario in scenarios}
+    queue = asyncio.Queue()
+    for scenario in picks:
+        queue.put_nowait(scenario)
+
+    async def worker():
+        while not queue.empty():
+            scenario = queue.get_nowait()
+            request = scenario.build(rng)
+            start = time.perf_counter()
+            status_code, queries = await client.request(request)
+            latency = time.perf_counter() - start
+            stats[scenario.name].record(latency, status_code, queries)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return stats
+
+
+def run_benchmark(
+    scenarios: Iterable[Scenario],
+    requests: int = 1000,
+    concurrency: int = 10,
+    warmup: int = 50,
+    seed: int = 0,
+    application=None,
+) -> BenchmarkResult:
+    """
+    Replay ``requests`` requests picked from the weighted ``scenarios``.
+
+    ``warmup`` requests are sent first and left out of the results, so that
+    connections, caches and lazily imported modules are ready.
+    """
+    scenarios = list(scenarios)
+    for scenario in scenarios:
+        scenario.prepare()
+
+    connection_created.connect(_install_query_counter)
+    for connection in connections.all(initialized_only=True):
+        _install_query_counter(connection)
+
+    client = ASGIClient(application)
+    try:
+        if warmup:
+            asyncio.run(_run(client, scenarios, warmup, concurrency, seed))
+        started_at = timezone.now()
+        start = time.perf_counter()
+        stats = asyncio.run(_run(client, scenarios, requests, concurrency, seed))
+        duration = time.perf_counter() - start
+    finally:
+        connection_created.disconnect(_install_query_counter)
+
+    total = ScenarioStats()
+    for scenario_stats in stats.values():
+        total.merge(scenario_stats)
+    return BenchmarkResult(
+        started_at=started_at.isoformat(),
+        duration=duration,
+        concurrency=concurrency,
+        scenarios={
+            name: scenario_stats.summary(duration)
+            for name, scenario_stats in stats.items()
+        },
+        total=total.summary(duration),
+        environment={
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "database": connections["default"].vendor,
+        },
+    )
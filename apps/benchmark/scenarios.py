@@ -0,0 +1,199 @@
+"""
+This module contains the request scenarios replayed by the benchmark runner.
+
+A scenario prepares the data it needs from the seeded dataset once, then
+builds a request per call, e.g. a user logging in or listing the members of
+an organization. Scenarios are registered in ``SCENARIOS`` by name along
+with the weight they get in the default request mix.
+"""
+
+from dataclasses import dataclass, field
+from math import ceil
+from random import Random
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import Count
+
+from apps.organization.models import Member, Organization
+from apps.user.models import User
+from core.jwt import get_tokens
+from core.pagination import PagePaginator
+
+from .seed import SEED_EMAIL_DOMAIN, SEED_PASSWORD
+
+__all__ = [
+    "DEFAULT_MIX",
+    "SCENARIOS",
+    "Request",
+    "Scenario",
+]
+
+SAMPLE_SIZE = 200
+
+
+@dataclass
+class Request:
+    method: str
+    path: str
+    data: dict | None = None
+    headers: dict[str, str] = field(default_factory=dict)
+    client: str = "127.0.0.1"
+
+
+class Scenario:
+    name: str
+    weight: float = 1
+
+    def __init__(self, weight: float | None = None):
+        if weight is not None:
+            self.weight = weight
+
+    def prepare(self) -> None:
+        """Load the data the requests are built from."""
+
+    def build(self, rng: Random) -> Request:
+        raise NotImplementedError
+
+
+class UserScenario(Scenario):
+    """A scenario sending requests as a sample of the seeded users."""
+
+    def prepare(self) -> None:
+        self.users = list(
+            User.objects.filter(email__endswith=f"@{SEED_EMAIL_DOMAIN}").order_by("id")[
+                :SAMPLE_SIZE
+            ]
+        )
+        if not self.users:
+            raise ImproperlyConfigured(
+                "No seeded users found, run the seed_data command first."
+            )
+        self.headers = [
+            {"authorization": f"Bearer {get_tokens(user)['access']}"}
+            for user in self.users
+        ]
+
+
+class OrganizationScenario(UserScenario):
+    """
+    A scenario sending requests about a sample of the organizations, as one
+    of their members.
+    """
+
+    def prepare(self) -> None:
+        super().prepare()
+        headers = {user.pk: header for user, header in zip(self.users, self.headers)}
+        self.memberships = [
+            (headers[user_id], slug)
+            for user_id, slug in Member.objects.filter(
+                user_id__in=headers, is_active=True
+            )
+            .order_by("id")
+            .values_list("user_id", "organization__slug")[:SAMPLE_SIZE]
+        ]
+        if not self.memberships:
+            raise ImproperlyConfigured(
+                "No members found, run the seed_data command first."
+            )
+
+
+class TokenObtainScenario(UserScenario):
+    name = "token_obtain"
+    login_field = "email"
+
+    def build(self, rng: Random) -> Request:
+        user = rng.choice(self.users)
+        login = str(getattr(user, self.login_field))
+        # Logins come from many clients, so the per IP throttle isn't hit
+        return Request(
+            "POST",
+            "/api/v1/auth/tokens",
+            data={"login": login, "password": SEED_PASSWORD},
+            client=f"10.0.{rng.randrange(256)}.{rng.randrange(1, 255)}",
+        )
+
+
+class TokenObtainPhoneScenario(TokenObtainScenario):
+    name = "token_obtain_phone"
+    login_field = "phone_number"
+
+
+class CurrentUserScenario(UserScenario):
+    name = "current_user"
+
+    def build(self, rng: Random) -> Request:
+        return Request("GET", "/api/v1/users/me", headers=rng.choice(self.headers))
+
+
+class UserListScenario(UserScenario):
+    name = "user_list"
+
+    def build(self, rng: Random) -> Request:
+        query = rng.choice(("", "?o=id", "?paginate=cursor"))
+        return Request(
+            "GET", f"/api/v1/users/{query}", headers=rng.choice(self.headers)
+        )
+
+
+class OrganizationListScenario(UserScenario):
+    name = "organization_list"
+    countries = ("EG", "US", "GB", "DE", "FR")
+
+    def prepare(self) -> None:
+        super().prepare()
+        counts = dict(
+            Organization.objects.filter(
+                country__in=self.countries,
+                status=Organization.OrganizationStatus.ACTIVE,
+            )
+            .values_list("country")
+            .annotate(count=Count("id"))
+            .order_by()
+        )
+        # Any page of the listings may be requested, deep ones included
+        self.pages = {
+            country: max(1, ceil(counts.get(country, 0) / PagePaginator.page_size))
+            for country in self.countries
+        }
+
+    def build(self, rng: Random) -> Request:
+        country = rng.choice(self.countries)
+        page = rng.randint(1, self.pages[country])
+        return Request(
+            "GET",
+            f"/api/v1/organizations/?country={country}&status=ACTIVE"
+            f"&{PagePaginator.page_query_param}={page}",
+            headers=rng.choice(self.headers),
+        )
+
+
+class MemberListScenario(OrganizationScenario):
+    name = "member_list"
+
+    def build(self, rng: Random) -> Request:
+        headers, slug = rng.choice(self.memberships)
+        query = rng.choice(("", "?role=MEMBER&is_active=true", "?paginate=cursor"))
+        return Request(
+            "GET", f"/api/v1/organizations/{slug}/members{query}", headers=headers
+        )
+
+
+SCENARIOS: dict[str, type[Scenario]] = {
+    scenario.name: scenario
+    for scenario in (
+        TokenObtainScenario,
+        TokenObtainPhoneScenario,
+        CurrentUserScenario,
+        UserListScenario,
+        OrganizationListScenario,
+        MemberListScenario,
+    )
+}
+
+# The weights of the default request mix
+DEFAULT_MIX = {
+    "token_obtain": 1,
+    "current_user": 4,
+    "organization_list": 2,
+    "member_list": 3,
+}
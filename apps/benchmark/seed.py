@@ -0,0 +1,159 @@
+"""
+This module contains the seeding of large benchmark datasets.
+
+Rows are generated lazily and inserted with ``bulk_create`` in chunks of
+``chunk_size`` rows, each chunk in its own transaction, so seeding millions
+of rows uses bounded memory. Every seeded row is derived from its index,
+which keeps runs reproducible and lets a dataset be grown by seeding again.
+"""
+
+import random
+from collections.abc import Callable, Iterable, Iterator
+from datetime import timedelta
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.db.models import Max, Model
+from django.utils import timezone
+
+from apps.organization.models import Invitation, Member, Organization
+from apps.user.models import User
+from core.counts import invalidate_counts
+
+__all__ = [
+    "SEED_EMAIL_DOMAIN",
+    "SEED_PASSWORD",
+    "seed_invitations",
+    "seed_members",
+    "seed_organizations",
+    "seed_users",
+]
+
+SEED_EMAIL_DOMAIN = "seed.example.com"
+SEED_PASSWORD = "seed-password"
+COUNTRIES = ("EG", "US", "GB", "DE", "FR", "IN", "BR", "JP", "NG", "CA")
+
+Progress = Callable[[int], None]
+
+
+def _chunked(objs: Iterable[Model], size: int) -> Iterator[list[Model]]:
+    objs = iter(objs)
+    while chunk := list(islice(objs, size)):
+        yield chunk
+
+
+def _bulk_create(
+    model: type[Model],
+    objs: Iterable[Model],
+    chunk_size: int,
+    progress: Progress | None = None,
+    **kwargs,
+) -> int:
+    created = 0
+    for chunk in _chunked(objs, chunk_size):
+        with transaction.atomic():
+            model.objects.bulk_create(chunk, batch_size=chunk_size, **kwargs)
+        created += len(chunk)
+        if progress:
+            progress(created)
+    invalidate_counts(model)
+    return created
+
+
+def _next_index(model: type[Model]) -> int:
+    return (model.objects.aggregate(last=Max("id"))["last"] or 0) + 1
+
+
+def seed_users(count: int, chunk_size: int, progress: Progress | None = None) -> int:
+    """Seed users sharing the ``SEED_PASSWORD`` password."""
+    # Hashing once keeps seeding fast, every user can still log in
+    password = make_password(SEED_PASSWORD)
+    start = _next_index(User)
+
+    def users():
+        for i in range(start, start + count):
+            email = f"user{i}@{SEED_EMAIL_DOMAIN}"
+            yield User(
+                first_name=f"First{i}",
+                last_name=f"Last{i}",
+                email=email,
+                username=email,
+                phone_number=f"+2010{i:08d}",
+                password=password,
+            )
+
+    return _bulk_create(User, users(), chunk_size, progress)
+
+
+def seed_organizations(
+    count: int, chunk_size: int, progress: Progress | None = None
+) -> int:
+    """Seed organizations owned by random users."""
+    owner_ids = list(User.objects.values_list("id", flat=True))
+    start = _next_index(Organization)
+    rng = random.Random(start)
+
+    def organizations():
+        for i in range(start, start + count):
+            yield Organization(
+                name=f"Organization {i}",
+                owner_id=rng.choice(owner_ids),
+                avatar="organization/seed.png",
+                country=rng.choice(COUNTRIES),
+            )
+
+    return _bulk_create(Organization, organizations(), chunk_size, progress)
+
+
+def seed_members(count: int, chunk_size: int, progress: Progress | None = None) -> int:
+    """
+    Seed members spread evenly over the organizations.
+
+    The members of an organization are consecutive users, so an organization
+    never gets the same user twice as long as it has fewer members than there
+    are users.
+    """
+    user_ids = list(User.objects.order_by("id").values_list("id", flat=True))
+    organization_ids = list(
+        Organization.objects.order_by("id").values_list("id", flat=True)
+    )
+    start = Member.objects.count()
+    rng = random.Random(start)
+    roles = Member.MemberRole.values
+
+    def members():
+        for k in range(start, start + count):
+            i = k % len(organization_ids)
+            yield Member(
+                organization_id=organization_ids[i],
+                user_id=user_ids[(k // len(organization_ids) + i) % len(user_ids)],
+                role=rng.choices(roles, weights=(1, 4, 95))[0],
+                is_active=rng.random() < 0.95,
+            )
+
+    return _bulk_create(Member, members(), chunk_size, progress, ignore_conflicts=True)
+
+
+def seed_invitations(
+    count: int, chunk_size: int, progress: Progress | None = None
+) -> int:
+    """Seed invitations, a fifth of them past their expiry date."""
+    user_ids = list(User.objects.values_list("id", flat=True))
+    organization_ids = list(Organization.objects.values_list("id", flat=True))
+    start = _next_index(Invitation)
+    rng = random.Random(start)
+    now = timezone.now()
+    expiry = Invitation.get_expiry_date() - now
+
+    def invitations():
+        for i in range(start, start + count):
+            expired = rng.random() < 0.2
+            yield Invitation(
+                email=f"invitee{i}@{SEED_EMAIL_DOMAIN}",
+                organization_id=organization_ids[i % len(organization_ids)],
+                invited_by_id=rng.choice(user_ids),
+                expired_at=now - timedelta(days=1) if expired else now + expiry,
+            )
+
+    return _bulk_create(Invitation, invitations(), chunk_size, progress)
@@ -5,3 +5,6 @@ class OrganizationConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.organization"
     label = "organization"
+
+    def ready(self):
+        from apps.organization import signals  # noqa: F401
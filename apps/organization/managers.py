@@ -0,0 +1,352 @@
+from typing import TYPE_CHECKING, Iterable
+
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import IntegrityError, connections, models, router, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Lower
+from django.db.models.sql import UpdateQuery
+from django.utils import timezone
+
+from core.counts import invalidate_counts
+from core.db import is_constraint_violation
+from core.models import SoftDeleteManager, SoftDeleteQuerySet
+
+from .slugs import MAX_SLUG_ATTEMPTS, build_slug, is_slug_conflict
+
+if TYPE_CHECKING:  # NOQA
+    from .models import Member, Organization
+
+
+class OrganizationQuerySet(SoftDeleteQuerySet):
+    def _allocate_slugs(self, objs: list["Organization"]) -> None:
+        """
+        Assign unique slugs to ``objs`` with a single query.
+
+        Organizations whose plain slug is already taken, or used by an earlier
+        organization of the same batch, get a suffixed slug.
+        """
+        slugs = [build_slug(obj.name) for obj in objs]
+        taken = set(
+            self.model._base_manager.using(self.db)
+            .filter(slug__in=slugs)
+            .values_list("slug", flat=True)
+        )
+        for obj, slug in zip(objs, slugs):
+            while slug in taken:
+                slug = build_slug(obj.name, suffixed=True)
+            taken.add(slug)
+            obj.slug = slug
+
+    def bulk_create(self, objs: Iterable["Organization"], *args, **kwargs):
+        """
+        Create organizations in bulk, allocating their slugs beforehand.
+
+        The allocation is retried if a concurrent writer took one of the
+        slugs between the allocation and the insert.
+        """
+        objs = list(objs)
+        pending = [obj for obj in objs if not obj.slug]
+        for attempt in range(1, MAX_SLUG_ATTEMPTS + 1):
+            self._allocate_slugs(pending)
+            try:
+                with transaction.atomic(using=self.db):
+                    created = super().bulk_create(objs, *args, **kwargs)
+            except IntegrityError as exc:
+                if attempt == MAX_SLUG_ATTEMPTS or not is_slug_conflict(exc):
+                    raise
+            else:
+                for obj in created:
+                    obj._loaded_name = obj.name
+                invalidate_counts(self.model)
+                return created
+
+
+class OrganizationManager(SoftDeleteManager.from_queryset(OrganizationQuerySet)):
+    pass
+
+
+# The unique constraint on the pending invitations of an email, and the number
+# of times an invite is checked again after a concurrent invite violated it
+PENDING_INVITATION_CONSTRAINT = "invitations_pending_email_uniq"
+MAX_INVITE_ATTEMPTS = 3
+
+
+class BulkInviteStatus(models.TextChoices):
+    INVITED = "INVITED", "Invited"
+    INVALID = "INVALID", "Invalid"
+    DUPLICATE = "DUPLICATE", "Duplicate"
+    MEMBER = "MEMBER", "Already a member"
+    PENDING = "PENDING", "Already invited"
+
+
+class InvitationQuerySet(models.QuerySet):
+    def _get_taken_emails(
+        self, organization_id, emails: Iterable[str], using: str
+    ) -> tuple[set[str], set[str], set[str]]:
+        """
+        Return the emails of the members of the organization, of its pending
+        invitations and of its pending invitations past their expiry date,
+        with a single query.
+        """
+        from .models import Member
+
+        members = (
+            Member.objects.using(using)
+            .filter(organization_id=organization_id)
+            .annotate(
+                lower_email=Lower("user__email"),
+                kind=Value(BulkInviteStatus.MEMBER, output_field=models.CharField()),
+                expiry=Value(None, output_field=models.DateTimeField()),
+            )
+            .filter(lower_email__in=emails)
+            .order_by()
+            .values_list("lower_email", "kind", "expiry")
+        )
+        invitations = (
+            self.using(using)
+            .filter(
+                organization_id=organization_id,
+                status=self.model.InvitationStatus.PENDING,
+            )
+            .annotate(
+                lower_email=Lower("email"),
+                kind=Value(BulkInviteStatus.PENDING, output_field=models.CharField()),
+                # Annotated so the columns of both sides are in the same order
+                expiry=F("expired_at"),
+            )
+            .filter(lower_email__in=emails)
+            .order_by()
+            .values_list("lower_email", "kind", "expiry")
+        )
+        now = timezone.now()
+        taken = {BulkInviteStatus.MEMBER: set(), BulkInviteStatus.PENDING: set()}
+        stale = set()
+        for email, kind, expired_at in members.union(invitations, all=True):
+            if expired_at is not None and expired_at < now:
+                stale.add(email)
+            else:
+                taken[kind].add(email)
+        return taken[BulkInviteStatus.MEMBER], taken[BulkInviteStatus.PENDING], stale
+
+    def _insert_invitations(
+        self, organization_id, invited_by, candidates: dict[str, dict], using: str
+    ) -> list:
+        members, pending, stale = self._get_taken_emails(
+            organization_id, candidates, using
+        )
+        invitations = []
+        expired_at = self.model.get_expiry_date()
+        for email, result in candidates.items():
+            if email in members:
+                result["status"] = BulkInviteStatus.MEMBER
+            elif email in pending:
+                result["status"] = BulkInviteStatus.PENDING
+            else:
+                result["status"] = BulkInviteStatus.INVITED
+                invitations.append(
+                    self.model(
+                        email=email,
+                        role=result["role"],
+                        organization_id=organization_id,
+                        invited_by_id=invited_by.pk,
+                        expired_at=expired_at,
+                    )
+                )
+
+        # Wrapped in a savepoint only when running inside a transaction or
+        # along with the expiry, so an invite in autocommit mode is a single
+        # INSERT, see ``save_with_unique_slug``
+        if not stale and not connections[using].in_atomic_block:
+            return self.using(using).bulk_create(invitations, batch_size=1000)
+        with transaction.atomic(using=using):
+            # Expire the stale invitations before the invitations replacing
+            # them, rather than waiting for ``expire_invitations``
+            if stale:
+                self.using(using).filter(
+                    organization_id=organization_id,
+                    status=self.model.InvitationStatus.PENDING,
+                    expired_at__lt=timezone.now(),
+                ).annotate(lower_email=Lower("email")).filter(
+                    lower_email__in=stale
+                ).update(status=self.model.InvitationStatus.EXPIRED)
+            return self.using(using).bulk_create(invitations, batch_size=1000)
+
+    def bulk_invite(
+        self,
+        organization_id,
+        invited_by,
+        rows: Iterable[dict],
+        default_role: str,
+    ) -> list[dict]:
+        """
+        Invite the emails of ``rows`` to the organization.
+
+        Rows are validated and de-duplicated in memory, checked against the
+        existing members and pending invitations with a single query, and the
+        remaining invitations are inserted with ``bulk_create``. The unique
+        constraint on the pending invitations rejects the invitations a
+        concurrent request inserted meanwhile, the check is then run again.
+        A result is returned for every row, in order.
+        """
+        from .models import Member
+
+        results = []
+        candidates: dict[str, dict] = {}
+        for row in rows:
+            email = (row.get("email") or "").strip().lower()
+            role = (row.get("role") or default_role).strip().upper()
+            result = {
+                "email": email,
+                "role": role,
+                "status": BulkInviteStatus.INVITED,
+                "detail": None,
+                "id": None,
+            }
+            results.append(result)
+            try:
+                validate_email(email)
+            except ValidationError:
+                result["status"] = BulkInviteStatus.INVALID
+                result["detail"] = "Enter a valid email address."
+                continue
+            if role not in Member.MemberRole.values or role == Member.MemberRole.OWNER:
+                result["status"] = BulkInviteStatus.INVALID
+                result["detail"] = "Invalid role."
+                continue
+            if email in candidates:
+                result["status"] = BulkInviteStatus.DUPLICATE
+                continue
+            candidates[email] = result
+
+        if not candidates:
+            return results
+
+        using = router.db_for_write(self.model)
+        for attempt in range(1, MAX_INVITE_ATTEMPTS + 1):
+            try:
+                created = self._insert_invitations(
+                    organization_id, invited_by, candidates, using
+                )
+            except IntegrityError as exc:
+                if attempt == MAX_INVITE_ATTEMPTS or not is_constraint_violation(
+                    exc, PENDING_INVITATION_CONSTRAINT
+                ):
+                    raise
+            else:
+                break
+        invalidate_counts(self.model)
+        for invitation in created:
+            candidates[invitation.email]["id"] = invitation.id
+        return results
+
+    def expire_stale(self, chunk_size: int) -> int:
+        """
+        Mark the pending invitations past their expiry date as expired, and
+        return how many were.
+
+        Invitations are expired in chunks of ``chunk_size`` oldest first, each
+        chunk being a short ``UPDATE`` of its own scanning the partial index of
+        the pending invitations' expiry dates.
+        """
+        Status = self.model.InvitationStatus
+        now = timezone.now()
+        expired = 0
+        while True:
+            chunk = (
+                self.filter(status=Status.PENDING, expired_at__lt=now)
+                .order_by("expired_at")
+                .values("pk")[:chunk_size]
+            )
+            updated = self.filter(pk__in=chunk, status=Status.PENDING).update(
+                status=Status.EXPIRED
+            )
+            expired += updated
+            if updated < chunk_size:
+                break
+        if expired:
+            invalidate_counts(self.model)
+        return expired
+
+    def _claim(
+        self, token, organization_id, user_id, email: str, using: str
+    ) -> str | None:
+        """
+        Mark the pending, unexpired invitation of ``token`` to the organization
+        sent to ``email`` as accepted by the user and return its role, None if
+        there is no such invitation.
+
+        The ``UPDATE`` returns the claimed row, so concurrent claims of the
+        same token can't both succeed: the later ones wait for the row lock
+        and no longer match the pending status.
+        """
+        queryset = self.using(using).filter(
+            token=token,
+            organization_id=organization_id,
+            email__iexact=email,
+            status=self.model.InvitationStatus.PENDING,
+            expired_at__gte=timezone.now(),
+        )
+        query = queryset.query.chain(UpdateQuery)
+        query.add_update_values(
+            {"status": self.model.InvitationStatus.ACCEPTED, "accepted_by": user_id}
+        )
+        sql, params = query.get_compiler(using).as_sql()
+        connection = connections[using]
+        returning = connection.ops.quote_name(self.model._meta.get_field("role").column)
+        with connection.cursor() as cursor:
+            cursor.execute(f"{sql} RETURNING {returning}", params)
+            row = cursor.fetchone()
+        return row[0] if row is not None else None
+
+    def accept(self, token, organization_id, user_id, email: str) -> "Member | None":
+        """
+        Accept the invitation of ``token`` to the organization on behalf of
+        the user with ``email`` and return its membership, None if there is no
+        such invitation or it is expired.
+
+        The invitation is claimed and the member upserted on its unique
+        organization and user in one transaction. A former member is
+        reactivated, and the role of an existing member is only ever raised
+        to the invited role, never lowered. The owner role is never granted
+        by an invitation, see ``Organization.owner``. Accepting an invitation
+        the same user already accepted returns the membership again, so
+        retries are idempotent.
+        """
+        from .memberships import invalidate_memberships
+        from .models import Member
+
+        Role = Member.MemberRole
+        ranks = {Role.MEMBER: 0, Role.ADMIN: 1, Role.OWNER: 2}
+        members = Member.objects.using(router.db_for_write(Member))
+        using = router.db_for_write(self.model)
+        with transaction.atomic(using=using):
+            role = self._claim(token, organization_id, user_id, email, using)
+            if role is None:
+                return members.filter(
+                    organization_id=organization_id,
+                    user_id=user_id,
+                    organization__invitations__token=token,
+                    organization__invitations__accepted_by=user_id,
+                ).first()
+            role = min(role, Role.ADMIN, key=ranks.get)
+            members.bulk_create(
+                [Member(organization_id=organization_id, user_id=user_id, role=role)],
+                update_conflicts=True,
+                unique_fields=["organization", "user"],
+                update_fields=["is_active", "updated_at"],
+            )
+            member = members.get(organization_id=organization_id, user_id=user_id)
+            if ranks[role] > ranks[member.role]:
+                member.role = role
+                member.save(update_fields=["role", "updated_at"])
+
+        # Bulk writes send no signals
+        invalidate_counts(self.model)
+        invalidate_counts(Member)
+        invalidate_memberships(user_id)
+        return member
+
+
+class InvitationManager(models.Manager.from_queryset(InvitationQuerySet)):
+    pass
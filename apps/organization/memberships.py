@@ -0,0 +1,119 @@
+"""
+This module contains the cached organization memberships of the users.
+
+The organization views authorize a request from the role its user has in the
+organization of the ``slug`` URL keyword. The ``{organization id: role}`` map
+of a user is loaded in bulk with a single query, which also caches the slug to
+id map of the user's organizations, so requests from members are authorized
+without any query on a warm cache.
+
+The cached maps are invalidated when organizations and members are saved or
+deleted, see the signals of the app. Bulk writes send no signals and are
+picked up after ``MEMBERSHIP_CACHE_TIMEOUT`` seconds unless they call
+``invalidate_memberships``.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import models
+from django.db.models import Value
+
+from .models import Member, Organization
+
+__all__ = [
+    "get_memberships",
+    "get_organization_id",
+    "get_organization_role",
+    "invalidate_memberships",
+    "invalidate_organization_slugs",
+]
+
+CACHE_KEY_PREFIX = "membership"
+
+
+def _memberships_key(user_id) -> str:
+    return f"{CACHE_KEY_PREFIX}:user:{user_id}"
+
+
+def _slug_key(slug: str) -> str:
+    return f"{CACHE_KEY_PREFIX}:slug:{slug}"
+
+
+def get_memberships(user_id) -> dict[int, str]:
+    """
+    Return the roles of the user in its organizations by organization id.
+
+    Only active memberships of organizations that aren't deleted count. The
+    owner role only comes from ``Organization.owner``: the owner of an
+    organization has it whether or not it is a member, and members with the
+    owner role, which admins can edit, only get the admin role.
+    """
+    key = _memberships_key(user_id)
+    memberships = cache.get(key)
+    if memberships is not None:
+        return memberships
+
+    rows = (
+        Member.objects.filter(
+            user_id=user_id, is_active=True, organization__is_deleted=False
+        )
+        .order_by()
+        .annotate(is_owner=Value(False, output_field=models.BooleanField()))
+        .values_list("organization_id", "organization__slug", "role", "is_owner")
+        .union(
+            Organization.objects.filter(owner_id=user_id)
+            .order_by()
+            .annotate(
+                role=Value(Member.MemberRole.OWNER, output_field=models.CharField()),
+                is_owner=Value(True, output_field=models.BooleanField()),
+            )
+            .values_list("id", "slug", "role", "is_owner"),
+            all=True,
+        )
+    )
+    memberships = {}
+    slugs = {}
+    for organization_id, slug, role, is_owner in rows:
+        if is_owner:
+            memberships[organization_id] = Member.MemberRole.OWNER
+        elif memberships.get(organization_id) != Member.MemberRole.OWNER:
+            if role == Member.MemberRole.OWNER:
+                role = Member.MemberRole.ADMIN
+            memberships[organization_id] = role
+        slugs[_slug_key(slug)] = organization_id
+
+    timeout = settings.MEMBERSHIP_CACHE_TIMEOUT
+    cache.set_many({**slugs, key: memberships}, timeout=timeout)
+    return memberships
+
+
+def get_organization_id(slug: str) -> int | None:
+    """Return the id of the organization with the slug, None if there is none."""
+    key = _slug_key(slug)
+    organization_id = cache.get(key)
+    if organization_id is None:
+        organization_id = (
+            Organization.objects.filter(slug=slug).values_list("id", flat=True).first()
+        )
+        if organization_id is not None:
+            cache.set(key, organization_id, timeout=settings.MEMBERSHIP_CACHE_TIMEOUT)
+    return organization_id
+
+
+def get_organization_role(user_id, slug: str) -> tuple[int | None, str | None]:
+    """
+    Return the id of the organization with the slug and the role of the user
+    in it, None when there is no such organization or the user isn't a member.
+    """
+    # Loading the memberships first caches the slugs of the user's organizations
+    memberships = get_memberships(user_id)
+    organization_id = get_organization_id(slug)
+    return organization_id, memberships.get(organization_id)
+
+
+def invalidate_memberships(*user_ids) -> None:
+    cache.delete_many([_memberships_key(user_id) for user_id in user_ids])
+
+
+def invalidate_organization_slugs(*slugs: str) -> None:
+    cache.delete_many([_slug_key(slug) for slug in slugs])
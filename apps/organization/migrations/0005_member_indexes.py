@@ -0,0 +1,35 @@
+# Generated by Django 5.1.15 on 2026-10-18 12:25
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("organization", "0004_alter_invitation_options_alter_member_options_and_more"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="member",
+            options={
+                "ordering": ["-id"],
+                "verbose_name": "member",
+                "verbose_name_plural": "members",
+            },
+        ),
+        migrations.AddIndex(
+            model_name="member",
+            index=models.Index(
+                fields=["organization", "-id"], name="members_org_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="member",
+            index=models.Index(
+                fields=["organization", "is_active", "role", "-id"],
+                name="members_org_active_role_idx",
+            ),
+        ),
+    ]
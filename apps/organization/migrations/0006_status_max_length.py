@@ -0,0 +1,38 @@
+# Generated by Django 5.1.15 on 2026-10-18 12:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("organization", "0005_member_indexes"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="invitation",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("PENDING", "Pending"),
+                    ("ACCEPTED", "Accepted"),
+                    ("EXPIRED", "Expired"),
+                ],
+                db_index=True,
+                default="PENDING",
+                max_length=20,
+                verbose_name="status",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="organization",
+            name="status",
+            field=models.CharField(
+                choices=[("ACTIVE", "Active"), ("SUSPENDED", "Suspended")],
+                db_index=True,
+                default="ACTIVE",
+                max_length=20,
+                verbose_name="status",
+            ),
+        ),
+    ]
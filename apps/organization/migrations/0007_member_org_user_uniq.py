@@ -0,0 +1,40 @@
+# Generated by Django 5.1.15 on 2026-10-18 13:02
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def delete_duplicate_members(apps, schema_editor):
+    """Keep the first membership of a user in an organization."""
+    Member = apps.get_model("organization", "Member")
+    db = schema_editor.connection.alias
+    duplicates = (
+        Member.objects.using(db)
+        .values("organization_id", "user_id")
+        .annotate(count=Count("id"), first_id=Min("id"))
+        .filter(count__gt=1)
+        .order_by()
+    )
+    for duplicate in duplicates.iterator():
+        Member.objects.using(db).filter(
+            organization_id=duplicate["organization_id"],
+            user_id=duplicate["user_id"],
+        ).exclude(id=duplicate["first_id"]).delete()
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("organization", "0006_status_max_length"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_duplicate_members, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="member",
+            constraint=models.UniqueConstraint(
+                fields=("organization", "user"), name="members_org_user_uniq"
+            ),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.1.15 on 2026-10-18 13:04
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("organization", "0007_member_org_user_uniq"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="invitation",
+            index=models.Index(
+                condition=models.Q(("status", "PENDING")),
+                fields=["expired_at"],
+                name="invitations_pending_exp_idx",
+            ),
+        ),
+    ]
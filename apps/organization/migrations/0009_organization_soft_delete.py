@@ -0,0 +1,55 @@
+# Generated by Django 5.1.15 on 2026-10-18 13:08
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("organization", "0008_invitations_pending_exp_idx"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="organization",
+            name="deleted_at",
+            field=models.DateTimeField(
+                blank=True, null=True, verbose_name="deleted at"
+            ),
+        ),
+        migrations.AddField(
+            model_name="organization",
+            name="deleted_by",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to=settings.AUTH_USER_MODEL,
+                verbose_name="deleted by",
+            ),
+        ),
+        migrations.AddField(
+            model_name="organization",
+            name="is_deleted",
+            field=models.BooleanField(default=False, verbose_name="is deleted"),
+        ),
+        migrations.AddIndex(
+            model_name="organization",
+            index=models.Index(
+                condition=models.Q(("is_deleted", False)),
+                fields=["-id"],
+                name="organizations_alive_id_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="organization",
+            index=models.Index(
+                condition=models.Q(("is_deleted", True)),
+                fields=["deleted_at"],
+                name="organizations_deleted_at_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.1.15 on 2026-10-18 13:52
+
+import django.db.models.functions.text
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max
+from django.db.models.functions import Lower
+
+
+def expire_duplicate_invitations(apps, schema_editor):
+    """Keep the last pending invitation of an email to an organization."""
+    Invitation = apps.get_model("organization", "Invitation")
+    db = schema_editor.connection.alias
+    pending = Invitation.objects.using(db).filter(status="PENDING")
+    duplicates = (
+        pending.annotate(lower_email=Lower("email"))
+        .values("organization_id", "lower_email")
+        .annotate(count=Count("id"), last_id=Max("id"))
+        .filter(count__gt=1)
+        .order_by()
+    )
+    for duplicate in duplicates.iterator():
+        pending.filter(
+            organization_id=duplicate["organization_id"],
+            email__iexact=duplicate["lower_email"],
+        ).exclude(id=duplicate["last_id"]).update(status="EXPIRED")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("organization", "0010_invitation_accepted_by"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(expire_duplicate_invitations, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="invitation",
+            constraint=models.UniqueConstraint(
+                models.F("organization"),
+                django.db.models.functions.text.Lower("email"),
+                condition=models.Q(("status", "PENDING")),
+                name="invitations_pending_email_uniq",
+            ),
+        ),
+    ]
@@ -1,19 +1,27 @@
-import secrets
 from uuid import uuid4
 
 from dateutil.relativedelta import relativedelta
 from django.conf import settings
-from django.db import models
+from django.db import models, router
+from django.db.models import DEFERRED
+from django.db.models.functions import Lower
 from django.utils import timezone
-from django.utils.text import slugify
 from django.utils.translation import gettext_lazy as _
 from django_countries.fields import CountryField
 
 from apps.user.models import User
-from core.models import TimeStampedModelMixin
+from core.models import DeletedModelMixin, TimeStampedModelMixin
 
+from .managers import (
+    PENDING_INVITATION_CONSTRAINT,
+    InvitationManager,
+    OrganizationManager,
+    OrganizationQuerySet,
+)
+from .slugs import save_with_unique_slug
 
-class Organization(TimeStampedModelMixin):
+
+class Organization(TimeStampedModelMixin, DeletedModelMixin):
     class OrganizationStatus(models.TextChoices):
         ACTIVE = "ACTIVE", "Active"
         SUSPENDED = "SUSPENDED", "Suspended"
@@ -42,6 +50,7 @@ class Organization(TimeStampedModelMixin):
     )
     status = models.CharField(
         _("status"),
+        max_length=20,
         choices=OrganizationStatus.choices,
         default=OrganizationStatus.ACTIVE,
         db_index=True,
@@ -51,38 +60,76 @@ class Organization(TimeStampedModelMixin):
         db_index=True,
     )
 
+    objects = OrganizationManager()
+    all_objects = OrganizationQuerySet.as_manager()
+
     class Meta:
         db_table = "organizations"
         verbose_name = _("organization")
         verbose_name_plural = _("organizations")
         ordering = ("-id",)
+        indexes = [
+            models.Index(
+                fields=["-id"],
+                condition=models.Q(is_deleted=False),
+                name="organizations_alive_id_idx",
+            ),
+            models.Index(
+                fields=["deleted_at"],
+                condition=models.Q(is_deleted=True),
+                name="organizations_deleted_at_idx",
+            ),
+        ]
 
     def __str__(self) -> str:
         return f"{self.slug!s}"
 
-    def save(self, *args, **kwargs):
-        # FIXME: Not the cleanest implementation (refactor later)
-        if not self.pk:
-            slug = slugify(
-                self.name,
-                allow_unicode=True,
-            )
-            org = Organization.objects.filter(slug=slug).first()
-            if org:
-                self.slug = slugify(
-                    self.name + " " + secrets.token_hex(2),
-                    allow_unicode=True,
-                )
-            else:
-                self.slug = slug
-
-        org = Organization.objects.filter(pk=self.pk).first()
-        if (org) and (org.name != self.name):
-            self.slug = slugify(
-                self.name + " " + secrets.token_hex(2),
-                allow_unicode=True,
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Track the loaded name so renames are detected without a re-fetch
+        instance._loaded_name = instance.__dict__.get("name", DEFERRED)
+        instance._loaded_slug = instance.__dict__.get("slug", DEFERRED)
+        instance._loaded_owner_id = instance.__dict__.get("owner_id", DEFERRED)
+        return instance
+
+    def _name_changed(self) -> bool:
+        loaded_name = getattr(self, "_loaded_name", DEFERRED)
+        if loaded_name is DEFERRED:
+            if "name" not in self.__dict__:
+                return False
+            loaded_name = (
+                Organization._base_manager.filter(pk=self.pk)
+                .values_list("name", flat=True)
+                .first()
             )
-        return super().save(*args, **kwargs)
+        return loaded_name != self.name
+
+    def save(self, *args, **kwargs):
+        result = self._save_with_slug(*args, **kwargs)
+        # The next save detects ownership transfers from this owner
+        self._loaded_owner_id = self.owner_id
+        return result
+
+    def _save_with_slug(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "name" not in update_fields:
+            return super().save(*args, **kwargs)
+
+        if not self._state.adding and not self._name_changed():
+            return super().save(*args, **kwargs)
+
+        if update_fields is not None:
+            kwargs["update_fields"] = {*update_fields, "slug"}
+        using = kwargs.get("using") or router.db_for_write(Organization, instance=self)
+        result = save_with_unique_slug(
+            self,
+            lambda: super(Organization, self).save(*args, **kwargs),
+            using=using,
+        )
+        self._loaded_name = self.name
+        self._loaded_slug = self.slug
+        return result
 
 
 class Member(TimeStampedModelMixin):
@@ -115,6 +162,23 @@ class Member(TimeStampedModelMixin):
         db_table = "members"
         verbose_name = _("member")
         verbose_name_plural = _("members")
+        ordering = ["-id"]
+        indexes = [
+            models.Index(
+                fields=["organization", "-id"],
+                name="members_org_id_idx",
+            ),
+            models.Index(
+                fields=["organization", "is_active", "role", "-id"],
+                name="members_org_active_role_idx",
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["organization", "user"],
+                name="members_org_user_uniq",
+            ),
+        ]
 
     def __str__(self) -> str:
         return f"{self.org}: {self.user}"
@@ -150,6 +214,7 @@ class Invitation(models.Model):
     )
     status = models.CharField(
         _("status"),
+        max_length=20,
         choices=InvitationStatus.choices,
         default=InvitationStatus.PENDING,
         db_index=True,
@@ -164,23 +229,56 @@ class Invitation(models.Model):
         _("expired at"),
         editable=False,
     )
+    accepted_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        verbose_name=_("accepted by"),
+        related_name="+",
+        null=True,
+        blank=True,
+        editable=False,
+    )
     created_at = models.DateTimeField(_("created at"), auto_now_add=True)
 
+    objects = InvitationManager()
+
     class Meta:
         db_table = "invitations"
         verbose_name = "invitation"
         verbose_name_plural = "invitations"
         ordering = ["-id"]
+        indexes = [
+            # Only pending invitations expire, see ``expire_invitations``
+            models.Index(
+                fields=["expired_at"],
+                condition=models.Q(status="PENDING"),
+                name="invitations_pending_exp_idx",
+            ),
+        ]
+        constraints = [
+            # An email has one pending invitation to an organization at most,
+            # see ``InvitationQuerySet.bulk_invite``
+            models.UniqueConstraint(
+                "organization",
+                Lower("email"),
+                condition=models.Q(status="PENDING"),
+                name=PENDING_INVITATION_CONSTRAINT,
+            ),
+        ]
 
     def __str__(self) -> str:
         return f"{self.token!s}"
 
     def save(self, *args, **kwargs):
         if not self.pk:
-            expiry_duration = settings.INVITATION_EXPIRY_MINUTES
-            self.expired_at = timezone.now() + relativedelta(minutes=expiry_duration)
+            self.expired_at = self.get_expiry_date()
         return super().save(*args, **kwargs)
 
+    @staticmethod
+    def get_expiry_date():
+        expiry_duration = settings.INVITATION_EXPIRY_MINUTES
+        return timezone.now() + relativedelta(minutes=expiry_duration)
+
     @property
     def valid(self) -> bool:
         return timezone.now() <= self.expired_at
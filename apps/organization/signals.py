@@ -0,0 +1,51 @@
+from django.db.models import DEFERRED
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.organization.memberships import (
+    invalidate_memberships,
+    invalidate_organization_slugs,
+)
+from apps.organization.models import Invitation, Member, Organization
+from apps.user.models import User
+from core.cache import invalidate_cached_responses
+from core.counts import invalidate_counts
+
+
+@receiver([post_save, post_delete], sender=Organization)
+@receiver([post_save, post_delete], sender=Member)
+@receiver([post_save, post_delete], sender=Invitation)
+def invalidate_organization_counts(sender, **kwargs):
+    invalidate_counts(sender)
+
+
+@receiver([post_save, post_delete], sender=Organization)
+def invalidate_organization_responses(sender, instance: Organization, **kwargs):
+    # The slug the organization was loaded with is invalidated too on renames
+    slugs = {instance.slug, getattr(instance, "_loaded_slug", DEFERRED)}
+    slugs.discard(DEFERRED)
+    invalidate_cached_responses("organizations", *slugs)
+
+
+@receiver([post_save, post_delete], sender=Organization)
+def invalidate_organization_memberships(sender, instance: Organization, **kwargs):
+    # The previous owner loses the owner role on ownership transfers
+    owner_ids = {instance.owner_id, getattr(instance, "_loaded_owner_id", DEFERRED)}
+    owner_ids.discard(DEFERRED)
+    invalidate_memberships(*owner_ids)
+    slugs = {instance.slug, getattr(instance, "_loaded_slug", DEFERRED)}
+    slugs.discard(DEFERRED)
+    invalidate_organization_slugs(*slugs)
+
+
+@receiver([post_save, post_delete], sender=Member)
+def invalidate_member_memberships(sender, instance: Member, **kwargs):
+    invalidate_memberships(instance.user_id)
+
+
+@receiver(post_save, sender=User)
+def soft_delete_owned_organizations(sender, instance: User, update_fields, **kwargs):
+    if not instance.is_deleted or "is_deleted" not in (update_fields or ()):
+        return
+    for organization in Organization.objects.filter(owner_id=instance.pk):
+        organization.soft_delete(deleted_by_id=instance.deleted_by_id)
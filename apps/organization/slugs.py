@@ -0,0 +1,65 @@
+"""
+This module contains the organization slug allocation helpers.
+
+Slugs are allocated optimistically: the row is written with the plain slug of
+the name and, only if the unique constraint rejects it, retried with a random
+suffix. This avoids a ``SELECT`` before every write and cannot race with
+concurrent writers since the database enforces the uniqueness.
+"""
+
+import secrets
+from collections.abc import Callable
+from typing import TypeVar
+
+from django.db import IntegrityError, connections, transaction
+from django.utils.text import slugify
+
+from core.db import is_constraint_violation
+
+__all__ = [
+    "MAX_SLUG_ATTEMPTS",
+    "build_slug",
+    "is_slug_conflict",
+    "save_with_unique_slug",
+]
+
+T = TypeVar("T")
+
+# The number of times a write is retried with a new suffixed slug
+MAX_SLUG_ATTEMPTS = 5
+
+# The unique constraint of ``Organization.slug``, named by PostgreSQL after
+# its table and column, and the column SQLite names instead
+SLUG_CONSTRAINT = "organizations_slug_key"
+SLUG_COLUMNS = "organizations.slug"
+
+
+def build_slug(name: str, suffixed: bool = False) -> str:
+    if suffixed:
+        name = f"{name} {secrets.token_hex(2)}"
+    return slugify(name, allow_unicode=True)
+
+
+def is_slug_conflict(exc: IntegrityError) -> bool:
+    """Whether the error was raised by the unique constraint on ``slug``."""
+    return is_constraint_violation(exc, SLUG_CONSTRAINT, columns=SLUG_COLUMNS)
+
+
+def save_with_unique_slug(instance, write: Callable[[], T], using: str) -> T:
+    """
+    Call ``write`` until it succeeds with a unique ``instance.slug``.
+
+    Attempts are wrapped in a savepoint only when running inside a transaction,
+    so a create in autocommit mode is a single ``INSERT``.
+    """
+    in_transaction = connections[using].in_atomic_block
+    for attempt in range(1, MAX_SLUG_ATTEMPTS + 1):
+        instance.slug = build_slug(instance.name, suffixed=attempt > 1)
+        try:
+            if in_transaction:
+                with transaction.atomic(using=using):
+                    return write()
+            return write()
+        except IntegrityError as exc:
+            if attempt == MAX_SLUG_ATTEMPTS or not is_slug_conflict(exc):
+                raise
@@ -0,0 +1,81 @@
+from django.conf import settings
+from django.core.mail import EmailMessage
+
+from apps.organization.models import Invitation, Organization
+from core.celery import app
+from core.locks import task_lock
+from core.mail import EmailTask
+
+__all__ = [
+    "send_invitation_emails",
+    "enqueue_invitation_emails",
+    "expire_invitations",
+    "purge_deleted_organizations",
+]
+
+EXPIRE_INVITATIONS_LOCK = "lock:expire_invitations"
+PURGE_DELETED_ORGANIZATIONS_LOCK = "lock:purge_deleted_organizations"
+
+
+def get_invitation_url(invitation: Invitation) -> str:
+    return (
+        f"{settings.FRONTEND_URL}/invitations/accept"
+        f"?organization_slug={invitation.organization.slug}&token={invitation.token}"
+    )
+
+
+@app.task(base=EmailTask, bind=True)
+def send_invitation_emails(self: EmailTask, invitation_ids: list[int]) -> None:
+    """Send the emails of a chunk of pending invitations over one connection."""
+    invitations = Invitation.objects.filter(
+        pk__in=invitation_ids,
+        status=Invitation.InvitationStatus.PENDING,
+    ).select_related("organization", "invited_by")
+    messages = {
+        invitation.id: EmailMessage(
+            subject=f"You have been invited to join {invitation.organization.name}",
+            body=(
+                f"{invitation.invited_by.first_name} invited you to join "
+                f"{invitation.organization.name}, use this link to accept the "
+                f"invitation: {get_invitation_url(invitation)}"
+            ),
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            to=[invitation.email],
+        )
+        for invitation in invitations
+    }
+    deferred, unsent = self.send_messages(messages)
+    if deferred:
+        self.defer(deferred)
+    if unsent:
+        self.retry_unsent(unsent)
+
+
+def enqueue_invitation_emails(invitation_ids: list[int]) -> None:
+    """Fan the invitation emails out to chunked celery tasks."""
+    chunk_size = settings.INVITATION_EMAIL_CHUNK_SIZE
+    for start in range(0, len(invitation_ids), chunk_size):
+        send_invitation_emails.delay(invitation_ids[start : start + chunk_size])
+
+
+@app.task(ignore_result=True)
+def expire_invitations() -> int:
+    """
+    Expire the stale pending invitations, scheduled by beat.
+
+    A run is skipped while another one holds the lock, e.g. when several beat
+    nodes schedule it.
+    """
+    with task_lock(EXPIRE_INVITATIONS_LOCK) as acquired:
+        if not acquired:
+            return 0
+        return Invitation.objects.expire_stale(settings.INVITATION_EXPIRY_CHUNK_SIZE)
+
+
+@app.task(ignore_result=True)
+def purge_deleted_organizations() -> int:
+    """Purge the soft deleted organizations, scheduled by beat."""
+    with task_lock(PURGE_DELETED_ORGANIZATIONS_LOCK) as acquired:
+        if not acquired:
+            return 0
+        return Organization.all_objects.purge()
@@ -5,3 +5,6 @@ class UserConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.user"
     label = "user"
+
+    def ready(self):
+        from apps.user import signals  # noqa: F401
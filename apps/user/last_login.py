@@ -0,0 +1,99 @@
+"""
+This module contains the buffering of the users' last login dates.
+
+Logins through the API record the date in a Redis hash instead of updating
+the user row, and ``flush_last_logins`` writes the buffered dates in bulk.
+Caches other than Redis don't support hashes, in which case the user row is
+updated right away.
+"""
+
+from datetime import datetime
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Case, DateTimeField, Value, When
+from django.utils import timezone
+from django_redis import get_redis_connection
+
+from core.auth_backends import get_user_cache_key
+from core.cache import invalidate_cached_responses
+
+from .models import User
+
+__all__ = [
+    "arecord_login",
+    "flush_last_logins",
+    "record_login",
+]
+
+BUFFER_KEY = "auth:last_login"
+# The buffer being flushed, left over if a flush crashed midway
+FLUSHING_KEY = "auth:last_login:flushing"
+
+
+def _get_redis():
+    try:
+        return get_redis_connection("default")
+    except NotImplementedError:
+        return None
+
+
+def record_login(user: User) -> None:
+    """Record that ``user`` logged in now."""
+    now = timezone.now()
+    redis = _get_redis()
+    if redis is None:
+        User.objects.filter(pk=user.pk).update(last_login=now)
+    else:
+        redis.hset(BUFFER_KEY, str(user.pk), now.isoformat())
+    user.last_login = now
+
+
+async def arecord_login(user: User) -> None:
+    """
+    See ``record_login()``, updating the user row with the async ORM or the
+    buffer in the thread for synchronous code.
+    """
+    now = timezone.now()
+    redis = _get_redis()
+    if redis is None:
+        await User.objects.filter(pk=user.pk).aupdate(last_login=now)
+    else:
+        await sync_to_async(redis.hset)(BUFFER_KEY, str(user.pk), now.isoformat())
+    user.last_login = now
+
+
+def _update_last_logins(last_logins: dict[int, datetime]) -> None:
+    User.objects.filter(pk__in=last_logins).update(
+        last_login=Case(
+            *(When(pk=pk, then=Value(date)) for pk, date in last_logins.items()),
+            output_field=DateTimeField(),
+        )
+    )
+    cache.delete_many([get_user_cache_key(pk) for pk in last_logins])
+    invalidate_cached_responses("users", *last_logins)
+
+
+def flush_last_logins() -> int:
+    """Write the buffered last login dates and return how many were written."""
+    redis = _get_redis()
+    if redis is None:
+        return 0
+
+    # Renaming the buffer lets logins be recorded in a new one meanwhile
+    if not redis.exists(FLUSHING_KEY):
+        if not redis.exists(BUFFER_KEY):
+            return 0
+        redis.rename(BUFFER_KEY, FLUSHING_KEY)
+
+    buffered = redis.hgetall(FLUSHING_KEY)
+    last_logins = [
+        (int(pk), datetime.fromisoformat(date.decode()))
+        for pk, date in buffered.items()
+    ]
+    chunk_size = settings.LAST_LOGIN_FLUSH_CHUNK_SIZE
+    for i in range(0, len(last_logins), chunk_size):
+        _update_last_logins(dict(last_logins[i : i + chunk_size]))
+    redis.delete(FLUSHING_KEY)
+    return len(last_logins)
@@ -2,11 +2,13 @@ from typing import TYPE_CHECKING
 
 from django.contrib.auth.models import BaseUserManager
 
+from core.models import SoftDeleteManager
+
 if TYPE_CHECKING:  # NOQA
     from .models import User
 
 
-class UserManager(BaseUserManager):
+class UserManager(SoftDeleteManager, BaseUserManager):
     def create_user(self, email, password, **extra_fields):
         if not email:
             raise ValueError("email must be provided")
@@ -0,0 +1,58 @@
+# Generated by Django 5.1.15 on 2026-10-18 12:30
+
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+from django.db.models import Value
+from django.db.models.functions import Concat, Upper
+
+# Trigram indexes backing the case-insensitive ``icontains`` lookups of the
+# user filters, the indexed expressions must match the filtered ones.
+SEARCH_INDEXES = [
+    GinIndex(
+        OpClass(
+            Upper(Concat("first_name", Value(" "), "last_name")),
+            name="gin_trgm_ops",
+        ),
+        name="users_name_trgm_idx",
+    ),
+    GinIndex(
+        OpClass(Upper("email"), name="gin_trgm_ops"),
+        name="users_email_trgm_idx",
+    ),
+    GinIndex(
+        OpClass(Upper("username"), name="gin_trgm_ops"),
+        name="users_username_trgm_idx",
+    ),
+    GinIndex(
+        OpClass(Upper("phone_number"), name="gin_trgm_ops"),
+        name="users_phone_number_trgm_idx",
+    ),
+]
+
+
+def create_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    User = apps.get_model("user", "User")
+    for index in SEARCH_INDEXES:
+        schema_editor.add_index(User, index)
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    User = apps.get_model("user", "User")
+    for index in SEARCH_INDEXES:
+        schema_editor.remove_index(User, index)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("user", "0002_alter_user_options"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
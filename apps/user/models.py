@@ -1,13 +1,18 @@
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin
 from django.contrib.auth.validators import UnicodeUsernameValidator
 from django.db import models
+from django.db.models import DEFERRED
 from django.utils.translation import gettext_lazy as _
 from phonenumber_field.modelfields import PhoneNumberField
 
+from core.hashers import acheck_password, amake_password
+from core.jwt import USER_CLAIMS
+from core.models import DeletedModelMixin, SoftDeleteQuerySet
+
 from .managers import UserManager
 
 
-class User(AbstractBaseUser, PermissionsMixin):
+class User(AbstractBaseUser, PermissionsMixin, DeletedModelMixin):
     first_name = models.CharField(_("first name"), max_length=150)
     last_name = models.CharField(_("last name"), max_length=150)
     username = models.CharField(
@@ -43,6 +48,7 @@ class User(AbstractBaseUser, PermissionsMixin):
     updated_at = models.DateTimeField(_("updated at"), auto_now=True)
 
     objects = UserManager()
+    all_objects = SoftDeleteQuerySet.as_manager()
 
     EMAIL_FIELD = "email"
     USERNAME_FIELD = "email"
@@ -53,6 +59,66 @@ class User(AbstractBaseUser, PermissionsMixin):
         verbose_name = _("user")
         verbose_name_plural = _("users")
         ordering = ("-id",)
+        indexes = [
+            models.Index(
+                fields=["-id"],
+                condition=models.Q(is_deleted=False),
+                name="users_alive_id_idx",
+            ),
+            models.Index(
+                fields=["deleted_at"],
+                condition=models.Q(is_deleted=True),
+                name="users_deleted_at_idx",
+            ),
+        ]
 
     def __str__(self) -> str:
         return f"{self.email}"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Track the loaded claims so changes are detected without a re-fetch
+        instance._loaded_claims = {}
+        instance._track_claims(USER_CLAIMS)
+        return instance
+
+    def _track_claims(self, fields) -> None:
+        for claim in USER_CLAIMS:
+            if claim in fields:
+                self._loaded_claims[claim] = self.__dict__.get(claim, DEFERRED)
+
+    def claims_changed(self, update_fields=None) -> bool:
+        """
+        Return whether a field embedded in the tokens, see
+        ``core.jwt.USER_CLAIMS``, changed since the user was loaded or saved.
+        """
+        loaded_claims = getattr(self, "_loaded_claims", {})
+        for claim in USER_CLAIMS:
+            if update_fields is not None and claim not in update_fields:
+                continue
+            if claim not in self.__dict__:
+                continue
+            loaded = loaded_claims.get(claim, DEFERRED)
+            if loaded is DEFERRED or loaded != self.__dict__[claim]:
+                return True
+        return False
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # The next save detects the changes from the saved claims
+        if not hasattr(self, "_loaded_claims"):
+            self._loaded_claims = {}
+        update_fields = kwargs.get("update_fields")
+        self._track_claims(USER_CLAIMS if update_fields is None else update_fields)
+
+    async def acheck_password(self, raw_password):
+        """See ``check_password()``, hashing in the password hashing threads."""
+
+        async def setter(raw_password):
+            self.password = await amake_password(raw_password)
+            # Password hash upgrades shouldn't be considered password changes.
+            self._password = None
+            await self.asave(update_fields=["password"])
+
+        return await acheck_password(raw_password, self.password, setter)
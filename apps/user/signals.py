@@ -0,0 +1,41 @@
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.user.models import User
+from core.auth_backends import get_user_cache_key
+from core.cache import invalidate_cached_responses
+from core.counts import invalidate_counts
+from core.jwt import revoke_user_tokens
+
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_user_counts(sender, **kwargs):
+    invalidate_counts(sender)
+
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_cached_user(sender, instance: User, **kwargs):
+    cache.delete(get_user_cache_key(instance.pk))
+
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_user_responses(sender, instance: User, **kwargs):
+    invalidate_cached_responses("users", instance.pk)
+
+
+@receiver(post_save, sender=User)
+def revoke_stale_user_tokens(
+    sender, instance: User, created: bool, update_fields, **kwargs
+):
+    # Requests are authenticated from the token claims without loading the
+    # user, so the tokens of deactivated and soft deleted users, and the
+    # tokens embedding claims that changed, are revoked instead
+    if created:
+        return
+    if (
+        not instance.is_active
+        or instance.is_deleted
+        or instance.claims_changed(update_fields)
+    ):
+        revoke_user_tokens(instance.pk)
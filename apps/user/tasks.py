@@ -0,0 +1,49 @@
+from django.conf import settings
+from django.core.mail import EmailMessage
+
+from core.celery import app
+from core.locks import task_lock
+from core.mail import EmailTask
+
+from .last_login import flush_last_logins as _flush_last_logins
+from .models import User
+
+__all__ = [
+    "flush_last_logins",
+    "purge_deleted_users",
+    "send_password_reset_email",
+]
+
+PURGE_DELETED_USERS_LOCK = "lock:purge_deleted_users"
+
+
+@app.task(base=EmailTask, bind=True)
+def send_password_reset_email(self: EmailTask, email: str, reset_url: str) -> None:
+    message = EmailMessage(
+        subject="Password Reset Request",
+        body=f"Use this link to reset your password: {reset_url}",
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[email],
+    )
+    deferred, unsent = self.send_messages({email: message})
+    if deferred:
+        self.defer(email, reset_url)
+    elif unsent:
+        self.retry_unsent(email, reset_url)
+
+
+@app.task(ignore_result=True)
+def flush_last_logins() -> None:
+    _flush_last_logins()
+
+
+@app.task(ignore_result=True)
+def purge_deleted_users() -> int:
+    """
+    Purge the soft deleted users, scheduled by beat. The users owning deleted
+    organizations are purged once their organizations are.
+    """
+    with task_lock(PURGE_DELETED_USERS_LOCK) as acquired:
+        if not acquired:
+            return 0
+        return User.all_objects.purge()
@@ -0,0 +1,216 @@
+"""
+This module contains the authentication backends of the project.
+"""
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_backends, get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+from django.http import Http404
+from django.utils.functional import cached_property
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+from phonenumber_field.phonenumber import to_python as to_phone_number
+from rest_framework.request import Request
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.tokens import Token
+
+from core.hashers import amake_password
+from core.jwt import USER_CLAIMS, check_not_revoked
+
+__all__ = [
+    "ClaimsUser",
+    "ClaimsJWTAuthentication",
+    "MultiIdentifierBackend",
+    "aauthenticate",
+    "aget_request_user",
+    "get_user_cache_key",
+    "get_request_user",
+]
+
+
+def get_user_cache_key(user_id) -> str:
+    return f"auth:user:{user_id}"
+
+
+def load_user(user_id):
+    """
+    Load a user row, through the cache when ``JWT_USER_CACHE_TIMEOUT`` is set.
+
+    Cached users are invalidated when they are saved or deleted.
+    """
+    User = get_user_model()
+    timeout = settings.JWT_USER_CACHE_TIMEOUT
+    if not timeout:
+        return User.objects.filter(pk=user_id).first()
+
+    key = get_user_cache_key(user_id)
+    user = cache.get(key)
+    if user is None:
+        user = User.objects.filter(pk=user_id).first()
+        if user is not None:
+            cache.set(key, user, timeout=timeout)
+    return user
+
+
+async def aload_user(user_id):
+    """See ``load_user()``, with the async ORM and cache."""
+    User = get_user_model()
+    timeout = settings.JWT_USER_CACHE_TIMEOUT
+    if not timeout:
+        return await User.objects.filter(pk=user_id).afirst()
+
+    key = get_user_cache_key(user_id)
+    user = await cache.aget(key)
+    if user is None:
+        user = await User.objects.filter(pk=user_id).afirst()
+        if user is not None:
+            await cache.aset(key, user, timeout=timeout)
+    return user
+
+
+class ClaimsUser(TokenUser):
+    """
+    A stateless user built from the claims embedded by ``core.jwt.get_tokens``.
+
+    The user row is only loaded when ``instance`` is accessed, at most once
+    per request.
+    """
+
+    @cached_property
+    def instance(self):
+        return load_user(self.pk)
+
+    async def ainstance(self):
+        """See ``instance``, loading the user row with the async ORM."""
+        if "instance" not in self.__dict__:
+            self.__dict__["instance"] = await aload_user(self.pk)
+        return self.instance
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that doesn't query the users table.
+
+    Tokens issued before a revocation of the tokens of their user are
+    rejected, see ``core.jwt.revoke_user_tokens``. Tokens issued before the
+    user claims were embedded fall back to the default user lookup.
+    """
+
+    def get_user(self, validated_token: Token):
+        try:
+            check_not_revoked(validated_token)
+        except TokenError as e:
+            raise InvalidToken(e.args[0]) from e
+        if not all(claim in validated_token for claim in USER_CLAIMS):
+            return super().get_user(validated_token)
+        return ClaimsUser(validated_token)
+
+
+class MultiIdentifierBackend(ModelBackend):
+    """
+    Authenticate users by their email, phone number or username.
+
+    The kind of the ``login`` term is told from its format, so the user is
+    looked up with a single query on the unique index of one column: terms
+    containing an ``@`` are emails, valid international phone numbers are
+    normalized to E.164 and the other terms are usernames. The password is
+    hashed when no user is found too, so the response time doesn't tell
+    whether the user exists.
+    """
+
+    def get_lookup(self, login: str) -> dict[str, str]:
+        User = get_user_model()
+        login = login.strip()
+        if "@" in login:
+            return {"email": User.objects.normalize_email(login)}
+        phone_number = to_phone_number(login)
+        if phone_number and phone_number.is_valid():
+            return {"phone_number": phone_number.as_e164}
+        return {"username": login}
+
+    def authenticate(self, request, login=None, password=None, **kwargs):
+        if login is None:
+            return super().authenticate(request, password=password, **kwargs)
+        if password is None:
+            return None
+
+        User = get_user_model()
+        try:
+            user = User._default_manager.get(**self.get_lookup(login))
+        except User.DoesNotExist:
+            # Run the password hasher once to reduce the timing difference
+            # between an existing and a nonexistent user (#20760).
+            User().set_password(password)
+        else:
+            if user.check_password(password) and self.user_can_authenticate(user):
+                return user
+        return None
+
+    async def aauthenticate(self, request, login=None, password=None, **kwargs):
+        """See ``authenticate()``, hashing in the password hashing threads."""
+        if login is None:
+            return await sync_to_async(self.authenticate)(
+                request, password=password, **kwargs
+            )
+        if password is None:
+            return None
+
+        User = get_user_model()
+        try:
+            user = await User._default_manager.aget(**self.get_lookup(login))
+        except User.DoesNotExist:
+            await amake_password(password)
+        else:
+            if await user.acheck_password(password) and self.user_can_authenticate(
+                user
+            ):
+                return user
+        return None
+
+
+async def aauthenticate(request=None, **credentials):
+    """
+    See ``authenticate()``, awaiting the ``aauthenticate`` method of the
+    backends which have one, where ``django.contrib.auth.aauthenticate`` runs
+    every backend in a thread.
+    """
+    for backend in get_backends():
+        if hasattr(backend, "aauthenticate"):
+            user = await backend.aauthenticate(request, **credentials)
+        else:
+            user = await sync_to_async(backend.authenticate)(request, **credentials)
+        if user is not None:
+            user.backend = f"{backend.__module__}.{type(backend).__qualname__}"
+            return user
+    return None
+
+
+class ClaimsJWTScheme(SimpleJWTScheme):
+    target_class = "core.auth_backends.ClaimsJWTAuthentication"
+
+
+def get_request_user(request: Request):
+    """
+    Return the user row of the authenticated request user.
+
+    Raise ``Http404`` when the user no longer exists.
+    """
+    user = request.user
+    if isinstance(user, ClaimsUser):
+        user = user.instance
+    if user is None:
+        raise Http404("User not found")
+    return user
+
+
+async def aget_request_user(request: Request):
+    """See ``get_request_user()``, loading the user row with the async ORM."""
+    user = request.user
+    if isinstance(user, ClaimsUser):
+        user = await user.ainstance()
+    if user is None:
+        raise Http404("User not found")
+    return user
@@ -0,0 +1,146 @@
+"""
+This module contains the response cache of the API detail views.
+
+Responses are cached per namespace and identifier (e.g. the user id or the
+organization slug) along with the version of the serializer that rendered
+them, and served with an ``ETag`` so clients revalidating with
+``If-None-Match`` get a ``304 Not Modified`` without a body.
+"""
+
+import hashlib
+import json
+from collections.abc import Awaitable, Callable
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+__all__ = [
+    "CachedResponseMixin",
+    "get_serializer_version",
+    "invalidate_cached_responses",
+]
+
+CACHE_KEY_PREFIX = "response"
+
+
+def get_cache_key(namespace: str, identifier) -> str:
+    return f"{CACHE_KEY_PREFIX}:{namespace}:{identifier}"
+
+
+def get_serializer_version(serializer_class) -> str:
+    """A version that changes whenever the serializer fields change."""
+    fields = sorted(serializer_class().fields)
+    digest = hashlib.md5(
+        ":".join([serializer_class.__qualname__, *fields]).encode(),
+        usedforsecurity=False,
+    )
+    return digest.hexdigest()
+
+
+def get_etag(data) -> str:
+    payload = json.dumps(data, sort_keys=True, default=str).encode()
+    return f'"{hashlib.md5(payload, usedforsecurity=False).hexdigest()}"'
+
+
+def etag_matches(etag: str, if_none_match: str) -> bool:
+    etags = parse_etags(if_none_match)
+    return "*" in etags or any(tag.removeprefix("W/") == etag for tag in etags)
+
+
+def invalidate_cached_responses(namespace: str, *identifiers) -> None:
+    cache.delete_many(
+        [get_cache_key(namespace, identifier) for identifier in identifiers]
+    )
+
+
+class CachedResponseMixin:
+    """
+    Cache the successful ``GET`` responses of a detail view.
+
+    Views set ``response_cache_namespace`` and wrap their handler with
+    ``cached_response``. The cached responses must be invalidated with
+    ``invalidate_cached_responses`` whenever the underlying object changes.
+    """
+
+    response_cache_namespace: str = None
+
+    def get_response_cache_identifier(self):
+        return self.kwargs[self.lookup_url_kwarg or self.lookup_field]
+
+    def get_response_cache_version(self) -> str:
+        return get_serializer_version(self.get_serializer_class())
+
+    def get_response_cache_key(self) -> str:
+        return get_cache_key(
+            self.response_cache_namespace, self.get_response_cache_identifier()
+        )
+
+    def unpack_cached_response(
+        self, key: str, cached
+    ) -> tuple[str, str, str | None, object | None]:
+        version = self.get_response_cache_version()
+        if cached is not None and cached[0] == version:
+            _, etag, data = cached
+            return key, version, etag, data
+        return key, version, None, None
+
+    def get_cached_response(self) -> tuple[str, str, str | None, object | None]:
+        """Return the cache key, version, ETag and data of the cached response."""
+        key = self.get_response_cache_key()
+        return self.unpack_cached_response(key, cache.get(key))
+
+    async def aget_cached_response(self) -> tuple[str, str, str | None, object | None]:
+        """See ``get_cached_response``, reading the cache asynchronously."""
+        key = self.get_response_cache_key()
+        return self.unpack_cached_response(key, await cache.aget(key))
+
+    def cache_response(self, key: str, version: str, data) -> str:
+        etag = get_etag(data)
+        cache.set(key, (version, etag, data), timeout=settings.RESPONSE_CACHE_TIMEOUT)
+        return etag
+
+    async def acache_response(self, key: str, version: str, data) -> str:
+        """See ``cache_response``, writing the cache asynchronously."""
+        etag = get_etag(data)
+        await cache.aset(
+            key, (version, etag, data), timeout=settings.RESPONSE_CACHE_TIMEOUT
+        )
+        return etag
+
+    def respond_from_cache(self, request: Request, etag: str, data) -> Response:
+        if_none_match = request.headers.get("If-None-Match")
+        if if_none_match and etag_matches(etag, if_none_match):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response(data)
+        response["ETag"] = etag
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    def cached_response(self, request: Request, build: Callable[[], Response]):
+        key, version, etag, data = self.get_cached_response()
+        if etag is None:
+            response = build()
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            data = response.data
+            etag = self.cache_response(key, version, data)
+        return self.respond_from_cache(request, etag, data)
+
+    async def acached_response(
+        self, request: Request, build: Callable[[], Awaitable[Response]]
+    ):
+        """See ``cached_response``, awaiting ``build`` and the cache."""
+        key, version, etag, data = await self.aget_cached_response()
+        if etag is None:
+            response = await build()
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            data = response.data
+            etag = await self.acache_response(key, version, data)
+        return self.respond_from_cache(request, etag, data)
@@ -1,6 +1,7 @@
 import os
 
 from celery import Celery
+from celery.signals import worker_process_init
 from kombu import Exchange
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
@@ -10,11 +11,36 @@ app = Celery("app")
 app.config_from_object("django.conf:settings", namespace="CELERY")
 
 
-app.conf.beat_schedule = {}
+app.conf.beat_schedule = {
+    "flush-last-logins": {
+        "task": "apps.user.tasks.flush_last_logins",
+        "schedule": 60.0,
+    },
+    "expire-invitations": {
+        "task": "apps.organization.tasks.expire_invitations",
+        "schedule": 5 * 60.0,
+    },
+    "purge-deleted-organizations": {
+        "task": "apps.organization.tasks.purge_deleted_organizations",
+        "schedule": 10 * 60.0,
+    },
+    "purge-deleted-users": {
+        "task": "apps.user.tasks.purge_deleted_users",
+        "schedule": 10 * 60.0,
+    },
+}
 
 default_exchange = Exchange("default", type="direct")
 
 
+@worker_process_init.connect
+def reset_connection_pools(**kwargs):
+    # The parent process (e.g. an embedded beat) may have opened the pools
+    from core.db import reset_connection_pools
+
+    reset_connection_pools()
+
+
 # Using a string here means the worker don't have to serialize
 # the configuration object to child processes.
 # - namespace='CELERY' means all celery-related configuration keys
@@ -0,0 +1,125 @@
+"""
+This module contains the count strategies used by the paginators.
+
+Exact ``COUNT(*)`` queries are cached per model and normalized filter set, and
+querysets the PostgreSQL planner expects to be large are reported with the
+planner estimate instead of being counted.
+"""
+
+import hashlib
+from dataclasses import dataclass
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.db.models import Model, QuerySet
+
+__all__ = [
+    "CountResult",
+    "get_count",
+    "estimate_count",
+    "invalidate_counts",
+]
+
+CACHE_KEY_PREFIX = "pagination:count"
+
+
+@dataclass(frozen=True)
+class CountResult:
+    value: int
+    exact: bool
+
+
+def _generation_key(model: type[Model]) -> str:
+    return f"{CACHE_KEY_PREFIX}:{model._meta.label_lower}:generation"
+
+
+def _count_key(queryset: QuerySet) -> str:
+    sql, params = queryset.order_by().query.sql_with_params()
+    digest = hashlib.md5(f"{sql}:{params!r}".encode(), usedforsecurity=False)
+    return f"{CACHE_KEY_PREFIX}:{queryset.model._meta.label_lower}:{digest.hexdigest()}"
+
+
+def _is_plain(queryset: QuerySet) -> bool:
+    """Whether the queryset counts every row of its table."""
+    query = queryset.query
+    return not (
+        query.where
+        or query.distinct
+        or query.group_by
+        or query.combinator
+        or query.is_sliced
+    )
+
+
+def estimate_count(queryset: QuerySet) -> int | None:
+    """
+    Return the PostgreSQL planner row estimate of the queryset.
+
+    Unfiltered querysets read ``pg_class.reltuples`` and filtered ones read the
+    ``Plan Rows`` of an ``EXPLAIN``. ``None`` is returned on other database
+    vendors or when the table statistics were never collected.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+
+    with connection.cursor() as cursor:
+        if _is_plain(queryset):
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [connection.ops.quote_name(queryset.model._meta.db_table)],
+            )
+            row = cursor.fetchone()
+            estimate = row[0] if row else None
+        else:
+            sql, params = queryset.order_by().query.sql_with_params()
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            plan = cursor.fetchone()[0]
+            estimate = plan[0]["Plan"]["Plan Rows"]
+
+    # reltuples is -1 (or 0 on older versions) until the table is analyzed
+    if not estimate or estimate < 0:
+        return None
+    return int(estimate)
+
+
+def get_count(queryset: QuerySet) -> CountResult:
+    """
+    Count the queryset using the cheapest strategy that is accurate enough.
+
+    1. A cached exact count of the same filter set, if the model has not been
+       written to since it was cached.
+    2. The planner estimate when it is above
+       ``PAGINATION_COUNT_ESTIMATE_THRESHOLD``.
+    3. An exact ``COUNT(*)`` which is then cached.
+    """
+    generation_key = _generation_key(queryset.model)
+    count_key = _count_key(queryset)
+    cached = cache.get_many([generation_key, count_key])
+    generation = cached.get(generation_key)
+    if count_key in cached:
+        cached_generation, value = cached[count_key]
+        if cached_generation == generation:
+            return CountResult(value=value, exact=True)
+
+    estimate = estimate_count(queryset)
+    if (
+        estimate is not None
+        and estimate >= settings.PAGINATION_COUNT_ESTIMATE_THRESHOLD
+    ):
+        return CountResult(value=estimate, exact=False)
+
+    value = queryset.count()
+    cache.set(
+        count_key,
+        (generation, value),
+        timeout=settings.PAGINATION_COUNT_CACHE_TIMEOUT,
+    )
+    return CountResult(value=value, exact=True)
+
+
+def invalidate_counts(model: type[Model]) -> None:
+    """Invalidate every cached count of the model."""
+    cache.set(_generation_key(model), uuid4().hex, timeout=None)
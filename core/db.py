@@ -0,0 +1,83 @@
+"""
+This module contains the helpers of the PostgreSQL connection pools, and of
+the constraint violations.
+
+With ``DB_POOL`` enabled every process keeps a psycopg pool of at most
+``DB_POOL_MAX_SIZE`` connections per database instead of a persistent
+connection per thread, see the database settings. Pooled connections are
+checked before being handed out, and the pools report their usage through
+``get_pool_stats``.
+"""
+
+from django.db import IntegrityError, connections
+
+__all__ = [
+    "check_databases",
+    "get_pool_stats",
+    "is_constraint_violation",
+    "reset_connection_pools",
+]
+
+# Pools inherited from a parent process, see ``reset_connection_pools``
+_inherited_pools = []
+
+
+def get_pool_stats() -> dict[str, dict[str, int]]:
+    """
+    Return the statistics of the connection pool of each database, e.g. its
+    size, available connections and waiting requests, see
+    https://www.psycopg.org/psycopg3/docs/advanced/pool.html#pool-stats
+    """
+    stats = {}
+    for alias in connections:
+        pool = getattr(connections[alias], "pool", None)
+        if pool is not None:
+            stats[alias] = pool.get_stats()
+    return stats
+
+
+def check_databases() -> dict[str, bool]:
+    """Return whether each database answers a trivial query."""
+    results = {}
+    for alias in connections:
+        try:
+            with connections[alias].cursor() as cursor:
+                cursor.execute("SELECT 1")
+            results[alias] = True
+        except Exception:  # NOQA
+            results[alias] = False
+    return results
+
+
+def reset_connection_pools() -> None:
+    """
+    Make a forked process open its own connection pools.
+
+    The pools and connections of the parent process are left untouched:
+    closing them, or letting them be garbage collected, would terminate the
+    connections the parent process still uses.
+    """
+    for alias in connections:
+        connection = connections[alias]
+        pools = getattr(type(connection), "_connection_pools", None)
+        if pools and alias in pools:
+            _inherited_pools.append(pools.pop(alias))
+
+
+def is_constraint_violation(
+    exc: IntegrityError, constraint: str, columns: str | None = None
+) -> bool:
+    """
+    Return whether the error was raised by the unique constraint named
+    ``constraint``.
+
+    PostgreSQL reports the name of the violated constraint. SQLite only
+    reports it in the error message, which names the index backing the
+    constraint, or the ``columns`` of a constraint declared with
+    ``unique=True``, e.g. ``"table.column"``.
+    """
+    diag = getattr(exc.__cause__, "diag", None)
+    if diag is not None:
+        return diag.constraint_name == constraint
+    failed = f"index '{constraint}'" if columns is None else columns
+    return str(exc) == f"UNIQUE constraint failed: {failed}"
@@ -0,0 +1,200 @@
+"""
+This module contains the chunked cascade deletion of large object graphs.
+
+Deleting a row with ``Model.delete()`` collects every row cascading from it
+in memory and deletes them in one transaction. ``iter_delete`` instead walks
+the ``on_delete`` rules of the models once into a plan of steps, dependents
+first, and runs each step as batches of
+
+    DELETE FROM <table> WHERE <pk> IN (SELECT <pk> ... LIMIT <batch size>)
+
+(or ``UPDATE ... SET <fk> = NULL`` for ``SET_NULL`` foreign keys) until no
+row is left, each batch in its own transaction. No primary key is loaded in
+Python, so the memory used doesn't depend on how many rows are deleted.
+
+The batches send no signals, callers invalidate what the signals would have.
+The step reached is kept in the cache so that a deletion interrupted by a
+crash resumes where it stopped, and every batch is idempotent anyway.
+"""
+
+import logging
+import time
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+
+from django.core.cache import cache
+from django.db import connections, models, router
+from django.db.models.deletion import get_candidate_relations_to_delete
+
+from core.counts import invalidate_counts
+
+__all__ = [
+    "DeletionProgress",
+    "DeletionStep",
+    "delete_in_batches",
+    "get_deletion_plan",
+    "iter_delete",
+]
+
+logger = logging.getLogger(__name__)
+
+CACHE_KEY_PREFIX = "deletion"
+# How long the progress of an interrupted deletion is kept, in seconds
+PROGRESS_TIMEOUT = 7 * 24 * 60 * 60
+
+
+@dataclass(frozen=True)
+class DeletionStep:
+    """
+    The rows of ``model`` related to the deleted row through the ``path``
+    lookup, deleted, or whose ``null_field`` is set to ``NULL``.
+    """
+
+    model: type[models.Model]
+    path: str
+    null_field: models.ForeignKey | None = None
+
+
+@dataclass(frozen=True)
+class DeletionProgress:
+    step: int
+    steps: int
+    model: str
+    # The rows deleted (or updated) by the batch, the step and the deletion
+    batch_rows: int
+    step_rows: int
+    total_rows: int
+
+
+def _add_steps(
+    steps: list[DeletionStep],
+    model: type[models.Model],
+    prefix: str,
+    ancestors: tuple[type[models.Model], ...],
+) -> None:
+    # The relations the Collector follows, including the hidden ones such as
+    # the foreign keys of many to many through tables
+    for relation in get_candidate_relations_to_delete(model._meta):
+        related_model = relation.related_model
+        path = f"{relation.field.name}__{prefix}" if prefix else relation.field.name
+        on_delete = relation.on_delete
+        if on_delete is models.DO_NOTHING:
+            continue
+        if on_delete is models.SET_NULL:
+            steps.append(DeletionStep(related_model, path, null_field=relation.field))
+        elif on_delete is models.CASCADE:
+            if related_model in ancestors:
+                raise ValueError(f"The deletion of {related_model} cascades to itself")
+            _add_steps(steps, related_model, path, (*ancestors, related_model))
+            steps.append(DeletionStep(related_model, path))
+        else:
+            raise ValueError(
+                f"{relation.field} uses {on_delete.__name__} which isn't supported"
+            )
+
+
+def get_deletion_plan(model: type[models.Model]) -> list[DeletionStep]:
+    """
+    Return the steps deleting the rows related to a row of ``model``, the
+    dependents of a row before the row itself.
+    """
+    steps = []
+    _add_steps(steps, model, "", (model,))
+    return steps
+
+
+def _batch_sql(
+    step: DeletionStep, pk, batch_size: int, using: str
+) -> tuple[str, tuple]:
+    connection = connections[using]
+    qn = connection.ops.quote_name
+    meta = step.model._meta
+    subquery = (
+        step.model._base_manager.using(using)
+        .filter(**{step.path: pk})
+        .order_by()
+        .values("pk")[:batch_size]
+    )
+    sub_sql, params = subquery.query.get_compiler(using).as_sql()
+    table, pk_column = qn(meta.db_table), qn(meta.pk.column)
+    if step.null_field is None:
+        sql = f"DELETE FROM {table} WHERE {pk_column} IN ({sub_sql})"
+    else:
+        column = qn(step.null_field.column)
+        sql = f"UPDATE {table} SET {column} = NULL WHERE {pk_column} IN ({sub_sql})"
+    return sql, params
+
+
+def _progress_key(obj: models.Model) -> str:
+    return f"{CACHE_KEY_PREFIX}:{obj._meta.label_lower}:{obj.pk}"
+
+
+def iter_delete(obj: models.Model, batch_size: int) -> Iterator[DeletionProgress]:
+    """
+    Delete ``obj`` and the rows cascading from it in batches of
+    ``batch_size`` rows, yielding the progress after each batch.
+
+    ``obj`` itself is deleted with ``delete()`` once its dependents are, so
+    its signals are sent.
+    """
+    using = router.db_for_write(type(obj), instance=obj)
+    steps = get_deletion_plan(type(obj))
+    key = _progress_key(obj)
+    start, total_rows = cache.get(key, (0, 0))
+    if start:
+        logger.info("Resuming the deletion of %s at step %s", key, start)
+
+    for index in range(start, len(steps)):
+        step = steps[index]
+        sql, params = _batch_sql(step, obj.pk, batch_size, using)
+        step_rows = 0
+        while True:
+            with connections[using].cursor() as cursor:
+                cursor.execute(sql, params)
+                batch_rows = cursor.rowcount
+            step_rows += batch_rows
+            total_rows += batch_rows
+            if batch_rows:
+                invalidate_counts(step.model)
+            # The next step only starts once this one is finished
+            cache.set(
+                key,
+                (index + (batch_rows < batch_size), total_rows),
+                timeout=PROGRESS_TIMEOUT,
+            )
+            yield DeletionProgress(
+                step=index,
+                steps=len(steps),
+                model=step.model._meta.label,
+                batch_rows=batch_rows,
+                step_rows=step_rows,
+                total_rows=total_rows,
+            )
+            if batch_rows < batch_size:
+                break
+
+    obj.delete(using=using)
+    cache.delete(key)
+
+
+def delete_in_batches(
+    obj: models.Model,
+    batch_size: int,
+    pause: float = 0,
+    on_progress: Callable[[DeletionProgress], None] | None = None,
+) -> int:
+    """
+    Delete ``obj`` and the rows cascading from it with ``iter_delete``,
+    sleeping ``pause`` seconds between the batches to leave room for the
+    other writers and the replicas. Return the number of rows deleted or
+    updated besides ``obj``.
+    """
+    total_rows = 0
+    for progress in iter_delete(obj, batch_size):
+        total_rows = progress.total_rows
+        if on_progress is not None:
+            on_progress(progress)
+        if pause and progress.batch_rows == batch_size:
+            time.sleep(pause)
+    logger.info("Deleted %s and %s related rows", obj._meta.label, total_rows)
+    return total_rows
@@ -0,0 +1,90 @@
+"""
+This module contains the password hashers and the asynchronous password checks.
+
+The hashers read their cost from the settings, so it can be tuned per
+deployment, and passwords hashed with another hasher or cost are rehashed
+when their user logs in. The asynchronous checks hash in a dedicated thread
+pool of ``PASSWORD_HASHING_THREADS`` threads so a login never blocks the
+event loop of an ASGI worker.
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from django.conf import settings
+from django.contrib.auth import hashers
+
+__all__ = [
+    "Argon2PasswordHasher",
+    "ScryptPasswordHasher",
+    "acheck_password",
+    "amake_password",
+]
+
+_executor: ThreadPoolExecutor | None = None
+
+
+class ScryptPasswordHasher(hashers.ScryptPasswordHasher):
+    @property
+    def work_factor(self) -> int:
+        return settings.PASSWORD_SCRYPT_WORK_FACTOR
+
+    @property
+    def block_size(self) -> int:
+        return settings.PASSWORD_SCRYPT_BLOCK_SIZE
+
+    @property
+    def parallelism(self) -> int:
+        return settings.PASSWORD_SCRYPT_PARALLELISM
+
+
+class Argon2PasswordHasher(hashers.Argon2PasswordHasher):
+    @property
+    def time_cost(self) -> int:
+        return settings.PASSWORD_ARGON2_TIME_COST
+
+    @property
+    def memory_cost(self) -> int:
+        return settings.PASSWORD_ARGON2_MEMORY_COST
+
+    @property
+    def parallelism(self) -> int:
+        return settings.PASSWORD_ARGON2_PARALLELISM
+
+
+def get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.PASSWORD_HASHING_THREADS,
+            thread_name_prefix="password-hashing",
+        )
+    return _executor
+
+
+async def _run_in_executor(func, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), partial(func, *args, **kwargs))
+
+
+async def amake_password(password: str | None) -> str:
+    """See ``make_password()``, hashing in the password hashing thread pool."""
+    return await _run_in_executor(hashers.make_password, password)
+
+
+async def acheck_password(
+    password: str | None, encoded: str, setter=None, preferred: str = "default"
+) -> bool:
+    """
+    See ``check_password()``, verifying in the password hashing thread pool.
+
+    ``setter`` is an async callable rehashing the password when it was hashed
+    with another hasher or cost than the ``preferred`` one.
+    """
+    is_correct, must_update = await _run_in_executor(
+        hashers.verify_password, password, encoded, preferred=preferred
+    )
+    if setter and is_correct and must_update:
+        await setter(password)
+    return is_correct
@@ -0,0 +1,13 @@
+from django.http import HttpRequest, JsonResponse
+
+from core.db import check_databases, get_pool_stats
+
+
+def health(request: HttpRequest) -> JsonResponse:
+    """Report whether the databases are reachable and their pool statistics."""
+    databases = check_databases()
+    info = {
+        "databases": databases,
+        "connection_pools": get_pool_stats(),
+    }
+    return JsonResponse(info, status=200 if all(databases.values()) else 503)
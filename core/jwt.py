@@ -1,17 +1,127 @@
+"""
+This module contains the issuing, rotation and revocation of the JWT tokens.
+
+Every refresh token issued is registered in the cache (Redis) under its
+``jti`` until it expires. Refreshing consumes the token and issues a new
+pair, so a refresh token can only be used once: presenting a consumed token
+again means it leaked, and every token of its user is revoked. Tokens embed
+the token generation of their user, revoking the tokens of a user starts a
+new generation so every token issued before is rejected, both by the
+authentication of the requests and when refreshing or verifying. Verifying a
+token only reads the cache, never the database. Refreshing reloads the user,
+through the cache, so inactive users can't refresh and the new tokens embed
+the current claims of the user.
+"""
+
 from typing import TYPE_CHECKING
+from uuid import uuid4
 
-from rest_framework_simplejwt.tokens import RefreshToken
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken, Token, UntypedToken
 
 if TYPE_CHECKING:
     from apps.user.models import User
 
 __all__ = [
+    "USER_CLAIMS",
+    "check_not_revoked",
     "get_tokens",
+    "revoke_user_tokens",
+    "rotate_tokens",
+    "verify_token",
 ]
 
+CACHE_KEY_PREFIX = "jwt"
+GENERATION_CLAIM = "gen"
+
+# User fields embedded in the tokens so requests can be authenticated without
+# loading the user row, see ``core.auth_backends.ClaimsJWTAuthentication``
+USER_CLAIMS = (
+    "email",
+    "username",
+    "first_name",
+    "last_name",
+    "is_staff",
+    "is_superuser",
+)
+
+
+def _refresh_key(jti: str) -> str:
+    return f"{CACHE_KEY_PREFIX}:refresh:{jti}"
+
+
+def _generation_key(user_id) -> str:
+    return f"{CACHE_KEY_PREFIX}:generation:{user_id}"
+
+
+def _refresh_timeout() -> int:
+    return int(settings.SIMPLE_JWT["REFRESH_TOKEN_LIFETIME"].total_seconds())
+
+
+def _register(refresh: RefreshToken) -> dict[str, str]:
+    cache.set(
+        _refresh_key(refresh[api_settings.JTI_CLAIM]),
+        refresh[api_settings.USER_ID_CLAIM],
+        timeout=_refresh_timeout(),
+    )
+    return {"access": str(refresh.access_token), "refresh": str(refresh)}
+
 
 def get_tokens(user: "User") -> dict[str, str]:
     refresh = RefreshToken.for_user(user)
-    access = refresh.access_token
+    for claim in USER_CLAIMS:
+        refresh[claim] = getattr(user, claim)
+    refresh[GENERATION_CLAIM] = cache.get(_generation_key(user.pk))
+    return _register(refresh)
+
+
+def check_not_revoked(token: Token) -> None:
+    """Raise ``TokenError`` when the token was issued before a revocation."""
+    generation = cache.get(_generation_key(token.get(api_settings.USER_ID_CLAIM)))
+    if token.get(GENERATION_CLAIM) != generation:
+        raise TokenError("Token is revoked")
+
+
+def revoke_user_tokens(user_id) -> None:
+    """Revoke every token issued to the user until now."""
+    cache.set(_generation_key(user_id), uuid4().hex, timeout=None)
+
+
+def rotate_tokens(raw_refresh: str) -> dict[str, str]:
+    """
+    Consume the refresh token and return a new access and refresh pair.
+
+    Refreshing with a token that was already consumed revokes every token of
+    its user. The new tokens are issued from the current user row, refreshing
+    fails when the user no longer passes ``USER_AUTHENTICATION_RULE``, e.g.
+    when it was deactivated.
+    """
+    # Imported here since the authentication backends import this module
+    from core.auth_backends import load_user
+
+    refresh = RefreshToken(raw_refresh)
+    check_not_revoked(refresh)
+    user_id = refresh[api_settings.USER_ID_CLAIM]
+    if not cache.delete(_refresh_key(refresh[api_settings.JTI_CLAIM])):
+        revoke_user_tokens(user_id)
+        raise TokenError("Token was already used")
+
+    user = load_user(user_id)
+    if not api_settings.USER_AUTHENTICATION_RULE(user):
+        raise TokenError("User is inactive or deleted")
+    return get_tokens(user)
+
 
-    return {"access": str(access), "refresh": str(refresh)}
+def verify_token(raw_token: str) -> Token:
+    """
+    Verify the signature, expiry and revocation of an access or refresh token.
+    """
+    token = UntypedToken(raw_token)
+    check_not_revoked(token)
+    if token.get(api_settings.TOKEN_TYPE_CLAIM) == RefreshToken.token_type:
+        if _refresh_key(token[api_settings.JTI_CLAIM]) not in cache:
+            raise TokenError("Token is invalid or expired")
+    return token
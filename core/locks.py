@@ -0,0 +1,71 @@
+"""
+This module contains the cache locks of the periodic tasks.
+
+Several beat nodes may schedule the same task, a lock skips the runs that
+would overlap with a run in progress. A lock holds a unique token and is only
+released by its holder: a run outliving the lock expiry doesn't release the
+lock another run acquired meanwhile.
+
+With Redis, the token is compared and the lock deleted by a Lua script in a
+single atomic round trip. Other caches compare and delete in two steps.
+"""
+
+from contextlib import contextmanager
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
+from django_redis import get_redis_connection
+
+__all__ = [
+    "task_lock",
+]
+
+# KEYS[1]: the lock, ARGV[1]: the token of its holder
+RELEASE_SCRIPT = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("DEL", KEYS[1])
+end
+return 0
+"""
+
+
+def _get_redis():
+    try:
+        return get_redis_connection("default")
+    except NotImplementedError:
+        return None
+
+
+def _acquire(redis, key: str, token: str, timeout: int) -> bool:
+    if redis is None:
+        return cache.add(key, token, timeout=timeout)
+    return bool(redis.set(key, token, nx=True, ex=timeout))
+
+
+def _release(redis, key: str, token: str) -> None:
+    if redis is None:
+        if cache.get(key) == token:
+            cache.delete(key)
+    else:
+        # Runs with EVALSHA, the script is only sent again if Redis lost it
+        redis.register_script(RELEASE_SCRIPT)(keys=[key], args=[token])
+
+
+@contextmanager
+def task_lock(key: str):
+    """
+    Yield whether the lock of ``key`` was acquired, and release it on exit
+    unless it expired and was acquired again meanwhile.
+
+    The lock expires with the task time limit in case the worker holding it
+    dies.
+    """
+    redis = _get_redis()
+    token = uuid4().hex
+    acquired = _acquire(redis, key, token, settings.CELERY_TASK_TIME_LIMIT)
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            _release(redis, key, token)
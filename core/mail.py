@@ -0,0 +1,103 @@
+"""
+This module contains the transactional email pipeline shared by the celery email tasks.
+
+Email tasks subclass ``EmailTask`` which sends a batch of messages over a
+single connection, defers the messages of recipient domains that exceeded
+``EMAIL_RATE_LIMIT_PER_DOMAIN`` messages in the current window and retries
+the messages that failed on SMTP and network errors with an exponential
+backoff. Only the messages that weren't sent are retried, so a batch failing
+midway doesn't send its first messages twice.
+"""
+
+import time
+from collections.abc import Hashable
+from smtplib import SMTPException
+
+from celery.utils.time import get_exponential_backoff_interval
+from django.conf import settings
+from django.core.cache import cache
+from django.core.mail import EmailMessage, get_connection
+
+from core.celery import app
+
+__all__ = [
+    "EmailTask",
+    "acquire_domain_slot",
+    "get_domain",
+]
+
+CACHE_KEY_PREFIX = "mail:rate"
+
+
+def get_domain(address: str) -> str:
+    return address.rpartition("@")[2].lower()
+
+
+def acquire_domain_slot(domain: str) -> bool:
+    """Count a message towards the domain's rate limit window."""
+    window = settings.EMAIL_RATE_LIMIT_WINDOW
+    key = f"{CACHE_KEY_PREFIX}:{domain}:{int(time.time() // window)}"
+    cache.add(key, 0, timeout=window)
+    return cache.incr(key) <= settings.EMAIL_RATE_LIMIT_PER_DOMAIN
+
+
+def seconds_until_next_window() -> int:
+    window = settings.EMAIL_RATE_LIMIT_WINDOW
+    return window - int(time.time() % window)
+
+
+class EmailTask(app.Task):
+    ignore_result = True
+    retry_backoff = True
+    retry_backoff_max = 10 * 60
+    retry_jitter = True
+    max_retries = 5
+
+    def send_messages(
+        self, messages: dict[Hashable, EmailMessage]
+    ) -> tuple[list[Hashable], list[Hashable]]:
+        """
+        Send the messages over a single connection.
+
+        Return the keys of the messages that were deferred because their
+        recipient domain is rate limited, and the keys of the messages that
+        weren't sent because of an SMTP or network error. Eagerly executed
+        tasks are not rate limited since they cannot be deferred.
+        """
+        allowed, deferred = {}, []
+        for key, message in messages.items():
+            domains = {get_domain(address) for address in message.recipients()}
+            if self.request.is_eager or all(
+                acquire_domain_slot(domain) for domain in domains
+            ):
+                allowed[key] = message
+            else:
+                deferred.append(key)
+
+        sent = set()
+        if allowed:
+            try:
+                with get_connection() as connection:
+                    for key, message in allowed.items():
+                        connection.send_messages([message])
+                        sent.add(key)
+            except (SMTPException, OSError):
+                pass
+        return deferred, [key for key in allowed if key not in sent]
+
+    def defer(self, *args, **kwargs) -> None:
+        """Run the task again once the current rate limit window is over."""
+        self.apply_async(args, kwargs, countdown=seconds_until_next_window())
+
+    def retry_unsent(self, *args, **kwargs) -> None:
+        """
+        Retry the task with the given arguments, those of the unsent messages,
+        after an exponential backoff.
+        """
+        countdown = get_exponential_backoff_interval(
+            factor=1,
+            retries=self.request.retries,
+            maximum=self.retry_backoff_max,
+            full_jitter=self.retry_jitter,
+        )
+        raise self.retry(args=args, kwargs=kwargs, countdown=countdown)
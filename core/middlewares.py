@@ -0,0 +1,56 @@
+"""
+This module contains the middlewares of the project.
+"""
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils.decorators import sync_and_async_middleware
+from rest_framework.permissions import SAFE_METHODS
+
+from core.routers import apin_to_primary, pin_to_primary
+
+__all__ = [
+    "primary_pin_middleware",
+]
+
+
+def _get_writer_id(request, response):
+    """Return the id of the user who wrote with the request, if any."""
+    if request.method in SAFE_METHODS or response.status_code >= 400:
+        return None
+    # Set by the DRF authentication of the view, or the session authentication
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        return user.pk
+    return None
+
+
+@sync_and_async_middleware
+def primary_pin_middleware(get_response):
+    """
+    Pin the users who write to the primary database for a while, so the
+    views reading from the replicas show them their own writes.
+    """
+    if not settings.DATABASE_REPLICAS:
+        raise MiddlewareNotUsed
+
+    if iscoroutinefunction(get_response):
+
+        async def middleware(request):
+            response = await get_response(request)
+            user_id = _get_writer_id(request, response)
+            if user_id is not None:
+                await apin_to_primary(user_id)
+            return response
+
+    else:
+
+        def middleware(request):
+            response = get_response(request)
+            user_id = _get_writer_id(request, response)
+            if user_id is not None:
+                pin_to_primary(user_id)
+            return response
+
+    return middleware
@@ -2,9 +2,15 @@
 This module contains shared model mixins for extending Django models with reusable functionality.
 """
 
-from django.db import models
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import models, transaction
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
+from core.deletion import delete_in_batches
+
 
 class TimeStampedModelMixin(models.Model):
     created_at = models.DateTimeField(
@@ -20,11 +26,46 @@ class TimeStampedModelMixin(models.Model):
         abstract = True
 
 
+class SoftDeleteQuerySet(models.QuerySet):
+    def deleted(self):
+        return self.filter(is_deleted=True)
+
+    def purge(self) -> int:
+        """
+        Purge the rows soft deleted more than ``SOFT_DELETE_RETENTION_HOURS``
+        ago, oldest first, and return how many were, see
+        ``DeletedModelMixin.purge``.
+        """
+        before = timezone.now() - timedelta(hours=settings.SOFT_DELETE_RETENTION_HOURS)
+        batch_size = settings.SOFT_DELETE_PURGE_BATCH_SIZE
+        purged = 0
+        rows = self.deleted().filter(deleted_at__lt=before).order_by("deleted_at")
+        for obj in rows.iterator(chunk_size=batch_size):
+            purged += obj.purge(batch_size)
+        return purged
+
+
+class SoftDeleteManager(models.Manager.from_queryset(SoftDeleteQuerySet)):
+    """The rows that aren't soft deleted."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(is_deleted=False)
+
+
 class DeletedModelMixin(models.Model):
+    """
+    Soft delete the rows: ``soft_delete`` marks a row deleted with a single
+    ``UPDATE``, hiding it from the ``objects`` manager, and a periodic task
+    purges it with the rows cascading from it later on.
+
+    Models declare partial indexes on their hot lookups ``WHERE NOT
+    is_deleted`` and on ``deleted_at WHERE is_deleted`` for the purge, and
+    keep ``all_objects`` to reach the deleted rows.
+    """
+
     is_deleted = models.BooleanField(
         _("is deleted"),
         default=False,
-        db_index=True,
     )
     deleted_at = models.DateTimeField(
         _("deleted at"),
@@ -36,9 +77,39 @@ class DeletedModelMixin(models.Model):
         verbose_name=_("deleted by"),
         blank=True,
         null=True,
-        on_delete=models.CASCADE,
+        on_delete=models.SET_NULL,
         related_name="+",
     )
 
     class Meta:
         abstract = True
+
+    def soft_delete(self, deleted_by_id=None) -> None:
+        self.is_deleted = True
+        self.deleted_at = timezone.now()
+        self.deleted_by_id = deleted_by_id
+        # Along with the rows the signals soft delete, e.g. owned organizations
+        with transaction.atomic():
+            self.save(update_fields=["is_deleted", "deleted_at", "deleted_by"])
+
+    def purge(self, batch_size: int) -> int:
+        """
+        Delete the row and the rows cascading from it in batches of
+        ``batch_size``, see ``core.deletion``.
+
+        Rows cascading from soft deleted rows, e.g. a deleted user owning
+        deleted organizations, wait for those to be purged first. Return 1 if
+        the row was purged, 0 otherwise.
+        """
+        for relation in self._meta.related_objects:
+            related_model = relation.related_model
+            if (
+                relation.on_delete is models.CASCADE
+                and issubclass(related_model, DeletedModelMixin)
+                and related_model._base_manager.filter(
+                    **{relation.field.name: self}
+                ).exists()
+            ):
+                return 0
+        delete_in_batches(self, batch_size, pause=settings.SOFT_DELETE_PURGE_PAUSE)
+        return 1
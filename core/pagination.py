@@ -1,25 +1,158 @@
+from django.core.paginator import EmptyPage, Paginator
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
 from rest_framework.pagination import CursorPagination, PageNumberPagination
 from rest_framework.response import Response
 
+from core.counts import CountResult, get_count
+
 __all__ = [
+    "CountingPaginator",
     "PagePaginator",
     "CursorPaginator",
 ]
 
 
+class CountingPaginator(Paginator):
+    """
+    Django paginator that counts querysets through ``core.counts.get_count``.
+
+    When the count is a planner estimate, page numbers are not capped by it
+    so the last pages stay reachable even if the estimate is too low.
+    """
+
+    @cached_property
+    def count_result(self) -> CountResult:
+        if isinstance(self.object_list, QuerySet):
+            return get_count(self.object_list)
+        return CountResult(value=super().count, exact=True)
+
+    @cached_property
+    def count(self):
+        return self.count_result.value
+
+    @property
+    def count_exact(self) -> bool:
+        return self.count_result.exact
+
+    def validate_number(self, number):
+        try:
+            return super().validate_number(number)
+        except EmptyPage:
+            if self.count_exact or int(number) < 1:
+                raise
+            return int(number)
+
+    def page(self, number):
+        if self.count_exact:
+            return super().page(number)
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        top = bottom + self.per_page
+        return self._get_page(self.object_list[bottom:top], number, self)
+
+
+class CursorPaginator(CursorPagination):
+    """
+    Keyset (seek) pagination over the ``-id`` ordering.
+
+    Every page is fetched with ``WHERE id < <cursor> ORDER BY id DESC LIMIT n``,
+    so deep pages cost the same as the first one and no ``COUNT(*)`` is issued.
+    """
+
+    page_size = 10
+    max_page_size = 100
+    page_size_query_param = "page_size"
+    cursor_query_param = "cursor"
+    ordering = "-id"
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "page_size": len(data),
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["page_size", "results"],
+            "properties": {
+                "page_size": {
+                    "type": "integer",
+                    "example": self.page_size,
+                },
+                "next": {
+                    "type": "string",
+                    "nullable": True,
+                    "format": "uri",
+                    "example": "http://api.example.org/accounts/?{cursor_query_param}=cD00ODY%3D".format(
+                        cursor_query_param=self.cursor_query_param
+                    ),
+                },
+                "previous": {
+                    "type": "string",
+                    "nullable": True,
+                    "format": "uri",
+                    "example": "http://api.example.org/accounts/?{cursor_query_param}=cj0xJnA9NDg3".format(
+                        cursor_query_param=self.cursor_query_param
+                    ),
+                },
+                "results": schema,
+            },
+        }
+
+
 class PagePaginator(PageNumberPagination):
+    """
+    Page number pagination that can switch to keyset pagination per request.
+
+    Passing ``?paginate=cursor`` delegates to ``cursor_paginator_class`` which
+    keeps the same response envelope minus ``count``, ``page_number`` and
+    ``total_pages``.
+    """
+
     page_size = 10
     max_page_size = 100
     page_size_query_param = "page_size"
     page_query_param = "page_number"
+    django_paginator_class = CountingPaginator
+    pagination_mode_query_param = "paginate"
+    cursor_pagination_mode = "cursor"
+    cursor_paginator_class = CursorPaginator
+
+    cursor_paginator = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.is_cursor_mode(request):
+            self.cursor_paginator = self.get_cursor_paginator()
+            return self.cursor_paginator.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def is_cursor_mode(self, request) -> bool:
+        mode = request.query_params.get(self.pagination_mode_query_param)
+        return mode == self.cursor_pagination_mode
+
+    def get_cursor_paginator(self) -> CursorPaginator:
+        paginator = self.cursor_paginator_class()
+        paginator.page_size = self.page_size
+        paginator.max_page_size = self.max_page_size
+        paginator.page_size_query_param = self.page_size_query_param
+        return paginator
 
     def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
         return Response(
             {
                 "count": self.page.paginator.count,
                 "page_size": len(data),
                 "page_number": self.page.number,
                 "total_pages": self.page.paginator.num_pages,
+                "estimated": not self.page.paginator.count_exact,
                 "next": self.get_next_link(),
                 "previous": self.get_previous_link(),
                 "results": data,
@@ -29,11 +162,12 @@ class PagePaginator(PageNumberPagination):
     def get_paginated_response_schema(self, schema):
         return {
             "type": "object",
-            "required": ["count", "page_size", "page_number", "total_pages", "results"],
+            "required": ["page_size", "results"],
             "properties": {
                 "count": {
                     "type": "integer",
                     "example": 123,
+                    "description": "Omitted when `paginate=cursor`.",
                 },
                 "page_size": {
                     "type": "integer",
@@ -42,10 +176,20 @@ class PagePaginator(PageNumberPagination):
                 "page_number": {
                     "type": "integer",
                     "example": 1,
+                    "description": "Omitted when `paginate=cursor`.",
                 },
                 "total_pages": {
                     "type": "integer",
                     "example": 5,
+                    "description": "Omitted when `paginate=cursor`.",
+                },
+                "estimated": {
+                    "type": "boolean",
+                    "example": False,
+                    "description": (
+                        "Whether `count` and `total_pages` are planner estimates "
+                        "rather than exact values. Omitted when `paginate=cursor`."
+                    ),
                 },
                 "next": {
                     "type": "string",
@@ -67,8 +211,30 @@ class PagePaginator(PageNumberPagination):
             },
         }
 
-
-class CursorPaginator(CursorPagination):
-    page_size = 10
-    cursor_query_param = "cursor"
-    ordering = "-id"
+    def get_schema_operation_parameters(self, view):
+        parameters = super().get_schema_operation_parameters(view)
+        cursor_paginator = self.get_cursor_paginator()
+        parameters.extend(
+            [
+                {
+                    "name": self.pagination_mode_query_param,
+                    "required": False,
+                    "in": "query",
+                    "description": "Pagination mode, `cursor` switches to keyset pagination.",
+                    "schema": {
+                        "type": "string",
+                        "enum": ["page", self.cursor_pagination_mode],
+                    },
+                },
+                {
+                    "name": cursor_paginator.cursor_query_param,
+                    "required": False,
+                    "in": "query",
+                    "description": str(cursor_paginator.cursor_query_description),
+                    "schema": {
+                        "type": "string",
+                    },
+                },
+            ]
+        )
+        return parameters
@@ -0,0 +1,161 @@
+"""
+This module contains the query plans the list views build from their serializers.
+
+The fields of a serializer tree declare everything a list view has to load:
+nested serializers of forward relations are joined with ``select_related``,
+nested serializers of to-many relations are loaded with a ``Prefetch`` that
+follows the same plan, and only the columns the fields read are selected.
+Sources that are not model fields (properties, methods) load every column of
+their model since the columns they read are unknown.
+"""
+
+from dataclasses import dataclass, field
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Model, Prefetch, QuerySet
+from rest_framework import serializers
+
+__all__ = [
+    "PrefetchPlan",
+    "PrefetchPlanMixin",
+    "apply_prefetch_plan",
+    "get_prefetch_plan",
+]
+
+
+@dataclass
+class PrefetchPlan:
+    select_related: list[str] = field(default_factory=list)
+    prefetch_related: list[Prefetch | str] = field(default_factory=list)
+    only: set[str] = field(default_factory=set)
+
+
+def _all_columns(model: type[Model], prefix: str) -> set[str]:
+    return {f"{prefix}{f.name}" for f in model._meta.concrete_fields}
+
+
+def _add_source(
+    plan: PrefetchPlan,
+    model: type[Model],
+    prefix: str,
+    source: list[str],
+    serializer: serializers.Field | None,
+) -> None:
+    """
+    Add the lookups and columns needed to read ``source`` from ``model``.
+
+    ``serializer`` is the nested serializer rendering the source, if any.
+    """
+    name, rest = source[0], source[1:]
+    try:
+        model_field = model._meta.get_field(name)
+    except FieldDoesNotExist:
+        plan.only |= _all_columns(model, prefix)
+        return
+
+    if not model_field.is_relation:
+        plan.only.add(f"{prefix}{name}")
+        return
+
+    related_model = model_field.related_model
+    lookup = f"{prefix}{name}"
+    if model_field.many_to_many or model_field.one_to_many:
+        queryset = related_model._default_manager.all()
+        if rest or isinstance(serializer, serializers.BaseSerializer):
+            child = get_prefetch_plan(serializer, related_model, rest)
+            if model_field.one_to_many:
+                child.only.add(model_field.field.name)
+            queryset = _apply(queryset, child)
+        plan.prefetch_related.append(Prefetch(lookup, queryset=queryset))
+        return
+
+    if model_field.concrete:
+        plan.only.add(lookup)
+        # Only the foreign key column is needed to render the primary key
+        if not rest and isinstance(serializer, serializers.PrimaryKeyRelatedField):
+            return
+
+    plan.select_related.append(lookup)
+    if rest:
+        _add_source(plan, related_model, f"{lookup}__", rest, serializer)
+    elif isinstance(serializer, serializers.BaseSerializer):
+        _collect(plan, serializer, related_model, f"{lookup}__")
+    else:
+        plan.only |= _all_columns(related_model, f"{lookup}__")
+
+
+def _collect(
+    plan: PrefetchPlan,
+    serializer: serializers.BaseSerializer,
+    model: type[Model],
+    prefix: str,
+) -> None:
+    if isinstance(serializer, serializers.ListSerializer):
+        serializer = serializer.child
+    if not isinstance(serializer, serializers.Serializer):
+        plan.only |= _all_columns(model, prefix)
+        return
+
+    for serializer_field in serializer.fields.values():
+        if serializer_field.write_only:
+            continue
+        if serializer_field.source == "*":
+            if isinstance(serializer_field, serializers.BaseSerializer):
+                _collect(plan, serializer_field, model, prefix)
+            else:
+                plan.only |= _all_columns(model, prefix)
+            continue
+        source = serializer_field.source.split(".")
+        _add_source(plan, model, prefix, source, serializer_field)
+
+
+def get_prefetch_plan(
+    serializer: serializers.Field | None,
+    model: type[Model] | None = None,
+    source: list[str] | None = None,
+) -> PrefetchPlan:
+    """
+    Build the query plan of ``serializer``.
+
+    ``model`` defaults to the model of the serializer and ``source`` is the
+    remainder of a dotted source to read from ``model`` instead of the
+    serializer fields.
+    """
+    if model is None:
+        serializer = getattr(serializer, "child", serializer)
+        model = serializer.Meta.model
+
+    plan = PrefetchPlan()
+    if source:
+        _add_source(plan, model, "", source, serializer)
+    elif isinstance(serializer, serializers.BaseSerializer):
+        _collect(plan, serializer, model, "")
+    else:
+        plan.only |= _all_columns(model, "")
+    return plan
+
+
+def _apply(queryset: QuerySet, plan: PrefetchPlan) -> QuerySet:
+    if plan.select_related:
+        queryset = queryset.select_related(*plan.select_related)
+    if plan.prefetch_related:
+        queryset = queryset.prefetch_related(*plan.prefetch_related)
+    return queryset.only(*plan.only)
+
+
+def apply_prefetch_plan(
+    queryset: QuerySet, serializer: serializers.BaseSerializer
+) -> QuerySet:
+    """Load the relations and columns ``serializer`` reads with ``queryset``."""
+    return _apply(queryset, get_prefetch_plan(serializer, queryset.model))
+
+
+class PrefetchPlanMixin:
+    """
+    Build the related lookups and the selected columns of the view queryset
+    from its serializer, so listing a page runs the same number of queries
+    whatever its size.
+    """
+
+    def get_queryset(self):
+        return apply_prefetch_plan(super().get_queryset(), self.get_serializer())
@@ -0,0 +1,190 @@
+"""
+This module contains the routing of the read queries to the read replicas.
+
+Views opt in with ``ReplicaReadMixin``: their safe requests read from a
+replica of ``DATABASE_REPLICAS``, every other query goes to the primary.
+Users are pinned to the primary for ``REPLICA_PIN_SECONDS`` after they write
+so they read their own writes, see ``core.middlewares``. Replicas lagging
+more than ``REPLICA_MAX_LAG_SECONDS`` behind the primary, or unreachable, are
+skipped until their next lag check.
+"""
+
+import logging
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework.permissions import SAFE_METHODS
+
+__all__ = [
+    "ReplicaReadMixin",
+    "ReplicaRouter",
+    "apin_to_primary",
+    "get_replica_lag",
+    "is_pinned_to_primary",
+    "pin_to_primary",
+    "read_from_replica",
+]
+
+logger = logging.getLogger(__name__)
+
+CACHE_KEY_PREFIX = "db"
+
+
+class _ReadRouting:
+    """
+    The reads of a request, routed to the replica chosen on the first read.
+
+    The replica is chosen where the queries run, since checking its lag is a
+    query which can't run on the event loop of an async view.
+    """
+
+    def __init__(self):
+        self.chosen = False
+        self.alias = None
+
+    def get_alias(self) -> str | None:
+        if not self.chosen:
+            self.alias = choose_replica()
+            self.chosen = True
+        return self.alias
+
+
+_read_routing: ContextVar[_ReadRouting | None] = ContextVar(
+    "read_routing", default=None
+)
+
+# Zero when the replica replayed everything it received, otherwise the age of
+# the last replayed transaction. Zero on a primary.
+POSTGRESQL_LAG_QUERY = """
+SELECT CASE
+    WHEN NOT pg_is_in_recovery()
+        OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE COALESCE(
+        EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0
+    )
+END
+"""
+
+
+def _pin_key(user_id) -> str:
+    return f"{CACHE_KEY_PREFIX}:pin:{user_id}"
+
+
+def _lag_key(alias: str) -> str:
+    return f"{CACHE_KEY_PREFIX}:lag:{alias}"
+
+
+def pin_to_primary(user_id) -> None:
+    """Read from the primary for the user's next requests, after a write."""
+    cache.set(_pin_key(user_id), 1, timeout=settings.REPLICA_PIN_SECONDS)
+
+
+async def apin_to_primary(user_id) -> None:
+    """See ``pin_to_primary()``, without blocking the event loop."""
+    await cache.aset(_pin_key(user_id), 1, timeout=settings.REPLICA_PIN_SECONDS)
+
+
+def is_pinned_to_primary(user_id) -> bool:
+    return _pin_key(user_id) in cache
+
+
+def get_replica_lag(alias: str) -> float:
+    """
+    Return how many seconds the replica is behind the primary, ``inf`` when
+    it is unreachable. The lag is checked every ``REPLICA_LAG_CHECK_INTERVAL``
+    seconds at most.
+    """
+    key = _lag_key(alias)
+    lag = cache.get(key)
+    if lag is not None:
+        return lag
+
+    connection = connections[alias]
+    try:
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute(POSTGRESQL_LAG_QUERY)
+                lag = float(cursor.fetchone()[0])
+        else:
+            lag = 0.0
+    except Exception:  # NOQA
+        logger.warning("Replica %s is unreachable", alias, exc_info=True)
+        lag = float("inf")
+    cache.set(key, lag, timeout=settings.REPLICA_LAG_CHECK_INTERVAL)
+    return lag
+
+
+def choose_replica() -> str | None:
+    """Return a replica that is up to date enough, or None."""
+    replicas = [
+        alias
+        for alias in settings.DATABASE_REPLICAS
+        if get_replica_lag(alias) <= settings.REPLICA_MAX_LAG_SECONDS
+    ]
+    return random.choice(replicas) if replicas else None
+
+
+@contextmanager
+def read_from_replica():
+    """Route the reads of the block to a replica, when one is up to date."""
+    token = _read_routing.set(_ReadRouting())
+    try:
+        yield
+    finally:
+        _read_routing.reset(token)
+
+
+class ReplicaRouter:
+    """
+    Route the reads to the replica chosen for the current request, the
+    writes and the migrations to the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        routing = _read_routing.get()
+        return routing.get_alias() if routing is not None else None
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replicas hold the same rows as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in settings.DATABASE_REPLICAS
+
+
+class ReplicaReadMixin:
+    """
+    Read from a replica in the safe requests of a view, unless the user
+    recently wrote.
+
+    The routing starts once the request is authenticated and ends when the
+    response is finalized. The previous routing is restored by value rather
+    than with a context variable token, since async views authenticate in
+    another context than they finalize in.
+    """
+
+    _routing_started = False
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method not in SAFE_METHODS or not settings.DATABASE_REPLICAS:
+            return
+        user = request.user
+        if user.is_authenticated and is_pinned_to_primary(user.pk):
+            return
+        self._previous_routing = _read_routing.get()
+        self._routing_started = True
+        _read_routing.set(_ReadRouting())
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        if self._routing_started:
+            _read_routing.set(self._previous_routing)
+            self._routing_started = False
+        return super().finalize_response(request, response, *args, **kwargs)
@@ -3,10 +3,12 @@ Django settings for core project.
 
 """
 
+import os
 from datetime import timedelta
 from pathlib import Path
 
 import dj_database_url
+from django.core.exceptions import ImproperlyConfigured
 from environ import Env
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -46,6 +48,7 @@ INSTALLED_APPS = [
     # local apps
     "apps.user.apps.UserConfig",
     "apps.organization.apps.OrganizationConfig",
+    "apps.benchmark.apps.BenchmarkConfig",
 ]
 
 MIDDLEWARE = [
@@ -56,6 +59,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "core.middlewares.primary_pin_middleware",
 ]
 
 ROOT_URLCONF = "core.urls"
@@ -91,14 +95,71 @@ DB_URL = (
 if not DEBUG:
     DB_URL = env("DB_URL", cast=str)
 
+# Connection pooling (PostgreSQL only, requires the pool extra)
+# Each process keeps a pool of connections instead of a persistent connection
+# per thread, sized so the web and Celery worker processes together stay
+# within DB_MAX_CONNECTIONS
+DB_POOL = env("DB_POOL", cast=bool, default=False)
+# The Gunicorn worker processes, also read by gunicorn.conf.py
+WEB_CONCURRENCY = env("WEB_CONCURRENCY", cast=int, default=os.cpu_count() * 2 + 1)
+# The Celery worker processes
+CELERY_WORKER_CONCURRENCY = env(
+    "CELERY_WORKER_CONCURRENCY", cast=int, default=os.cpu_count()
+)
+# The connections of the database the processes share, leave room for
+# superuser, maintenance and migration connections
+DB_MAX_CONNECTIONS = env("DB_MAX_CONNECTIONS", cast=int, default=90)
+DB_POOL_MAX_SIZE = env(
+    "DB_POOL_MAX_SIZE",
+    cast=int,
+    default=max(2, DB_MAX_CONNECTIONS // (WEB_CONCURRENCY + CELERY_WORKER_CONCURRENCY)),
+)
+DB_POOL_MIN_SIZE = env("DB_POOL_MIN_SIZE", cast=int, default=min(2, DB_POOL_MAX_SIZE))
+# How long a request waits for a connection before failing, in seconds
+DB_POOL_TIMEOUT = env("DB_POOL_TIMEOUT", cast=float, default=10)
+
 DATABASES = {
     "default": dj_database_url.parse(
         DB_URL,
-        conn_max_age=600,
+        # Pooled connections are returned to the pool instead
+        conn_max_age=0 if DB_POOL else 600,
+        # Pooled connections are checked when taken from the pool
         conn_health_checks=True,
     ),
 }
 
+# Read replicas, the safe requests of the views reading from the replicas
+# (core.routers.ReplicaReadMixin) are routed to one of them
+DB_REPLICA_URLS = env.list("DB_REPLICA_URLS", default=[])
+for index, url in enumerate(DB_REPLICA_URLS):
+    DATABASES[f"replica_{index}"] = dj_database_url.parse(
+        url,
+        conn_max_age=0 if DB_POOL else 600,
+        conn_health_checks=True,
+    )
+    DATABASES[f"replica_{index}"]["TEST"] = {"MIRROR": "default"}
+DATABASE_REPLICAS = [f"replica_{index}" for index in range(len(DB_REPLICA_URLS))]
+DATABASE_ROUTERS = ["core.routers.ReplicaRouter"]
+# How long users read from the primary after they write, in seconds
+REPLICA_PIN_SECONDS = env("REPLICA_PIN_SECONDS", cast=int, default=10)
+# Replicas lagging more than this behind the primary are skipped, in seconds
+REPLICA_MAX_LAG_SECONDS = env("REPLICA_MAX_LAG_SECONDS", cast=float, default=5)
+# How often the lag of each replica is checked, in seconds
+REPLICA_LAG_CHECK_INTERVAL = env("REPLICA_LAG_CHECK_INTERVAL", cast=int, default=5)
+
+if DB_POOL:
+    for alias in DATABASES:
+        DATABASES[alias].setdefault("OPTIONS", {})["pool"] = {
+            "min_size": DB_POOL_MIN_SIZE,
+            "max_size": DB_POOL_MAX_SIZE,
+            "timeout": DB_POOL_TIMEOUT,
+            # Connections idle for 5 minutes beyond min_size are closed, and
+            # every connection is replaced after an hour
+            "max_idle": 5 * 60,
+            "max_lifetime": 60 * 60,
+            "name": alias,
+        }
+
 ADMINS = [
     ("Atef Hesham", "atefhesham45@gmail.com"),
 ]
@@ -118,18 +179,97 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Password hashing
+# The hasher of new passwords, one of "scrypt", "argon2" (requires the argon2
+# extra) or "pbkdf2". Passwords hashed with another hasher or cost are rehashed
+# with the preferred one when their user logs in.
+PASSWORD_HASHER = env("PASSWORD_HASHER", cast=str, default="scrypt")
+_PASSWORD_HASHERS = {
+    "scrypt": "core.hashers.ScryptPasswordHasher",
+    "argon2": "core.hashers.Argon2PasswordHasher",
+    "pbkdf2": "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+}
+if PASSWORD_HASHER not in _PASSWORD_HASHERS:
+    raise ImproperlyConfigured(
+        f"PASSWORD_HASHER must be one of {', '.join(_PASSWORD_HASHERS)}, "
+        f"not {PASSWORD_HASHER!r}."
+    )
+PASSWORD_HASHERS = [
+    _PASSWORD_HASHERS.pop(PASSWORD_HASHER),
+    *_PASSWORD_HASHERS.values(),
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+]
+# The scrypt cost, N (work factor), r (block size) and p (parallelism)
+PASSWORD_SCRYPT_WORK_FACTOR = env(
+    "PASSWORD_SCRYPT_WORK_FACTOR", cast=int, default=2**14
+)
+PASSWORD_SCRYPT_BLOCK_SIZE = env("PASSWORD_SCRYPT_BLOCK_SIZE", cast=int, default=8)
+PASSWORD_SCRYPT_PARALLELISM = env("PASSWORD_SCRYPT_PARALLELISM", cast=int, default=1)
+# The argon2 cost, the memory cost is in KiB
+PASSWORD_ARGON2_TIME_COST = env("PASSWORD_ARGON2_TIME_COST", cast=int, default=2)
+PASSWORD_ARGON2_MEMORY_COST = env(
+    "PASSWORD_ARGON2_MEMORY_COST",
+    cast=int,
+    default=19 * 1024,
+)
+PASSWORD_ARGON2_PARALLELISM = env("PASSWORD_ARGON2_PARALLELISM", cast=int, default=1)
+# The number of threads hashing passwords for the async views
+PASSWORD_HASHING_THREADS = env(
+    "PASSWORD_HASHING_THREADS",
+    cast=int,
+    default=os.cpu_count() or 1,
+)
+
 # DRF settings
 REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.DjangoModelPermissionsOrAnonReadOnly"
     ],
-    "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
-    ),
+    "DEFAULT_AUTHENTICATION_CLASSES": ("core.auth_backends.ClaimsJWTAuthentication",),
     "DEFAULT_FILTER_BACKENDS": ["django_filters.rest_framework.DjangoFilterBackend"],
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    "DEFAULT_THROTTLE_CLASSES": (
+        "core.throttling.ScopedIPThrottle",
+        "core.throttling.LoginIdentifierThrottle",
+    ),
+    # Rates of the views' throttle scopes as "<requests>/<s|m|h|d>", see
+    # core.throttling. "<scope>" rates apply per client IP and
+    # "<scope>_identifier" rates per login identifier
+    "DEFAULT_THROTTLE_RATES": {
+        "login": env("THROTTLE_RATE_LOGIN", cast=str, default="30/m"),
+        "login_identifier": env(
+            "THROTTLE_RATE_LOGIN_IDENTIFIER", cast=str, default="10/m"
+        ),
+        "register": env("THROTTLE_RATE_REGISTER", cast=str, default="20/h"),
+        "password_reset": env("THROTTLE_RATE_PASSWORD_RESET", cast=str, default="10/h"),
+        "password_reset_identifier": env(
+            "THROTTLE_RATE_PASSWORD_RESET_IDENTIFIER", cast=str, default="3/h"
+        ),
+    },
+    # The number of proxies in front of the API, to find the client IP in the
+    # X-Forwarded-For header
+    "NUM_PROXIES": env("NUM_PROXIES", cast=int, default=None),
 }
 
+# Route the hot API endpoints to their async views, disable to compare with
+# the sync views, see the Benchmarks section of the README
+ASYNC_API_VIEWS = env("ASYNC_API_VIEWS", cast=bool, default=True)
+
+# Pagination counts
+# Paginated querysets estimated by the PostgreSQL planner to have at least this
+# many rows report the estimate instead of running an exact COUNT(*)
+PAGINATION_COUNT_ESTIMATE_THRESHOLD = env(
+    "PAGINATION_COUNT_ESTIMATE_THRESHOLD",
+    cast=int,
+    default=100_000,
+)
+# How long exact counts are cached in seconds
+PAGINATION_COUNT_CACHE_TIMEOUT = env(
+    "PAGINATION_COUNT_CACHE_TIMEOUT",
+    cast=int,
+    default=60,
+)
+
 ACCESS_TOKEN_EXPIRY_MINUTES = env("ACCESS_TOKEN_EXPIRY_MINUTES", cast=int)
 REFRESH_TOKEN_EXPIRY_DAYS = env("REFRESH_TOKEN_EXPIRY_DAYS", cast=int)
 
@@ -138,6 +278,14 @@ SIMPLE_JWT = {
     "REFRESH_TOKEN_LIFETIME": timedelta(days=REFRESH_TOKEN_EXPIRY_DAYS),
 }
 
+# The number of buffered last login dates written per query, the buffer is
+# flushed every minute by the ``flush_last_logins`` celery beat task
+LAST_LOGIN_FLUSH_CHUNK_SIZE = env("LAST_LOGIN_FLUSH_CHUNK_SIZE", cast=int, default=1000)
+
+# How long the authenticated users loaded from the database are cached in
+# seconds, 0 disables the cache
+JWT_USER_CACHE_TIMEOUT = env("JWT_USER_CACHE_TIMEOUT", cast=int, default=30)
+
 SPECTACULAR_SETTINGS = {
     "TITLE": "Django Starterkit API",
     "DESCRIPTION": "Django Starterkit API schema and documentation.",
@@ -190,6 +338,7 @@ MEDIA_ROOT = BASE_DIR.joinpath("uploads/")
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 AUTH_USER_MODEL = "user.User"
+AUTHENTICATION_BACKENDS = ["core.auth_backends.MultiIdentifierBackend"]
 
 # Frontend url
 FRONTEND_URL = env("FRONTEND_BASE_URL", cast=str, default="localhost:3000")
@@ -208,6 +357,45 @@ INVITATION_EXPIRY_MINUTES = env(
     default=(1 * 60 * 24),
 )
 
+# The maximum number of invitations accepted by a single bulk invite request
+INVITATION_BULK_MAX_SIZE = env(
+    "INVITATION_BULK_MAX_SIZE",
+    cast=int,
+    default=5000,
+)
+
+# The number of invitation emails sent by a single celery task
+INVITATION_EMAIL_CHUNK_SIZE = env(
+    "INVITATION_EMAIL_CHUNK_SIZE",
+    cast=int,
+    default=100,
+)
+
+# The number of stale invitations expired by a single update
+INVITATION_EXPIRY_CHUNK_SIZE = env(
+    "INVITATION_EXPIRY_CHUNK_SIZE",
+    cast=int,
+    default=1000,
+)
+
+# How long soft deleted users and organizations are kept before being purged
+SOFT_DELETE_RETENTION_HOURS = env(
+    "SOFT_DELETE_RETENTION_HOURS",
+    cast=int,
+    default=24,
+)
+
+# The number of rows cascading from a purged row deleted per transaction
+SOFT_DELETE_PURGE_BATCH_SIZE = env(
+    "SOFT_DELETE_PURGE_BATCH_SIZE",
+    cast=int,
+    default=1000,
+)
+
+# The pause between two of these batches in seconds, leaving room for the
+# other writers and the replicas
+SOFT_DELETE_PURGE_PAUSE = env("SOFT_DELETE_PURGE_PAUSE", cast=float, default=0.1)
+
 # Redis
 REDIS_URL = env("REDIS_URL", cast="str", default="redis://redis:6379")
 
@@ -222,6 +410,12 @@ CACHES = {
     }
 }
 
+# How long the API detail responses are cached in seconds
+RESPONSE_CACHE_TIMEOUT = env("RESPONSE_CACHE_TIMEOUT", cast=int, default=5 * 60)
+# How long the organization memberships of a user are cached in seconds, they
+# are invalidated on writes so this only bounds the staleness of bulk writes
+MEMBERSHIP_CACHE_TIMEOUT = env("MEMBERSHIP_CACHE_TIMEOUT", cast=int, default=5 * 60)
+
 # Celery
 CELERY_BROKER_URL = REDIS_URL
 CELERY_RESULT_BACKEND = REDIS_URL
@@ -231,15 +425,27 @@ CELERY_RESULT_SERIALIZER = "json"
 CELERY_TIMEZONE = TIME_ZONE
 CELERY_TASK_TRACK_STARTED = True
 CELERY_TASK_TIME_LIMIT = 30 * 60
+# Run tasks in process, useful to test the email pipeline locally
+CELERY_TASK_ALWAYS_EAGER = env("CELERY_TASK_ALWAYS_EAGER", cast=bool, default=False)
 
 CELERY_BEAT_SCHEDULER = "django_celery_beat.schedulers.DatabaseScheduler"
 
 # Emails
-if DEBUG:
-    EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
+# The backend can be overridden, e.g. with the locmem backend for local testing
+EMAIL_BACKEND = env(
+    "EMAIL_BACKEND",
+    cast=str,
+    default=(
+        "django.core.mail.backends.console.EmailBackend"
+        if DEBUG
+        else "django.core.mail.backends.smtp.EmailBackend"
+    ),
+)
+# The maximum number of emails sent to a recipient domain per window (seconds)
+EMAIL_RATE_LIMIT_PER_DOMAIN = env("EMAIL_RATE_LIMIT_PER_DOMAIN", cast=int, default=60)
+EMAIL_RATE_LIMIT_WINDOW = env("EMAIL_RATE_LIMIT_WINDOW", cast=int, default=60)
 
 if not DEBUG:
-    EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
     EMAIL_HOST = env("EMAIL_HOST", cast=str)
     EMAIL_PORT = env("EMAIL_PORT", cast=int)
     EMAIL_HOST_PASSWORD = env("EMAIL_HOST_PASSWORD", cast=str)
@@ -0,0 +1,166 @@
+"""
+This module contains the sliding window rate limiting of the API views.
+
+Views opt in with a ``throttle_scope`` whose rates are configured in the
+``DEFAULT_THROTTLE_RATES`` DRF setting: the ``<scope>`` rate limits the
+requests per client IP and the optional ``<scope>_identifier`` rate limits the
+requests per login identifier (e.g. an email address), whatever their IP.
+Identifiers are normalized like ``MultiIdentifierBackend`` looks users up, so
+variants of the same email or phone number share their limit.
+
+With Redis, each limit is a sorted set of request timestamps checked and
+updated by a Lua script in a single atomic round trip. Other caches fall
+back to a fixed window counter. The throttles run before the view handler,
+so rejected requests never reach password hashing or the database.
+"""
+
+import time
+from uuid import uuid4
+
+from django.core.cache import cache
+from django_redis import get_redis_connection
+from rest_framework.exceptions import ParseError, UnsupportedMediaType
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+from core.auth_backends import MultiIdentifierBackend
+
+__all__ = [
+    "LoginIdentifierThrottle",
+    "ScopedIPThrottle",
+    "SlidingWindowThrottle",
+    "hit",
+    "parse_rate",
+]
+
+CACHE_KEY_PREFIX = "throttle"
+
+# The seconds of the periods of a rate, by their first letter
+RATE_PERIODS = {"s": 1, "m": 60, "h": 60 * 60, "d": 24 * 60 * 60}
+
+# KEYS[1]: the sorted set of the window's request timestamps
+# ARGV: now (ms), window (ms), limit, a unique member for this request
+SLIDING_WINDOW_SCRIPT = """
+local key = KEYS[1]
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local limit = tonumber(ARGV[3])
+redis.call("ZREMRANGEBYSCORE", key, "-inf", now - window)
+if redis.call("ZCARD", key) < limit then
+    redis.call("ZADD", key, now, ARGV[4])
+    redis.call("PEXPIRE", key, window)
+    return 0
+end
+local oldest = redis.call("ZRANGE", key, 0, 0, "WITHSCORES")
+return tonumber(oldest[2]) + window - now
+"""
+
+
+def _get_script():
+    try:
+        redis = get_redis_connection("default")
+    except NotImplementedError:
+        return None
+    # Runs with EVALSHA, the script is only sent again if Redis lost it
+    return redis.register_script(SLIDING_WINDOW_SCRIPT)
+
+
+def parse_rate(rate: str) -> tuple[int, int]:
+    """
+    Return the number of requests and the window in seconds of a rate such as
+    ``"10/m"``, the period being a second, minute, hour or day.
+    """
+    num, period = rate.split("/")
+    return int(num), RATE_PERIODS[period[0]]
+
+
+def _fixed_window_hit(key: str, limit: int, window: int) -> float:
+    now = time.time()
+    window_key = f"{key}:{int(now // window)}"
+    cache.add(window_key, 0, timeout=window)
+    if cache.incr(window_key) <= limit:
+        return 0
+    return window - now % window
+
+
+def hit(key: str, limit: int, window: int) -> float:
+    """
+    Count a request towards the ``limit`` requests per ``window`` seconds of
+    ``key``, and return how many seconds to wait before retrying, or ``0`` if
+    the request is allowed.
+    """
+    key = f"{CACHE_KEY_PREFIX}:{key}"
+    script = _get_script()
+    if script is None:
+        return _fixed_window_hit(key, limit, window)
+    wait = script(
+        keys=[key],
+        args=[int(time.time() * 1000), window * 1000, limit, uuid4().hex],
+    )
+    return int(wait) / 1000
+
+
+class SlidingWindowThrottle(BaseThrottle):
+    """
+    Throttle the views with a ``throttle_scope`` whose rate is configured,
+    see ``get_rate_name`` and ``get_key``.
+    """
+
+    def get_rate_name(self, scope: str) -> str:
+        return scope
+
+    def get_key(self, request, view) -> str | None:
+        raise NotImplementedError
+
+    def allow_request(self, request, view) -> bool:
+        self.wait_time = None
+        scope = getattr(view, "throttle_scope", None)
+        rate = api_settings.DEFAULT_THROTTLE_RATES.get(self.get_rate_name(scope))
+        if scope is None or rate is None:
+            return True
+
+        key = self.get_key(request, view)
+        if key is None:
+            return True
+        limit, window = parse_rate(rate)
+        self.wait_time = hit(f"{self.get_rate_name(scope)}:{key}", limit, window)
+        return not self.wait_time
+
+    def wait(self) -> float | None:
+        return self.wait_time
+
+
+class ScopedIPThrottle(SlidingWindowThrottle):
+    """Limit the requests per client IP with the ``<scope>`` rate."""
+
+    def get_key(self, request, view) -> str | None:
+        return self.get_ident(request)
+
+
+class LoginIdentifierThrottle(SlidingWindowThrottle):
+    """
+    Limit the requests per login identifier with the ``<scope>_identifier``
+    rate, the identifier is the ``login`` or ``email`` field of the request.
+
+    The identifier is normalized to the column and value the user is looked up
+    by, case insensitively, see ``MultiIdentifierBackend.get_lookup``.
+    """
+
+    identifier_fields = ("login", "email")
+    backend = MultiIdentifierBackend()
+
+    def get_rate_name(self, scope: str) -> str:
+        return f"{scope}_identifier"
+
+    def get_key(self, request, view) -> str | None:
+        try:
+            data = request.data
+        except (ParseError, UnsupportedMediaType):
+            # Parse errors are reported by the view
+            return None
+        for field in self.identifier_fields:
+            value = data.get(field) if hasattr(data, "get") else None
+            if isinstance(value, str) and value.strip():
+                ((column, identifier),) = self.backend.get_lookup(value).items()
+                return f"{column}:{identifier.lower()}"
+        return None
@@ -7,10 +7,12 @@ from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import include, path
 
+from .health_view import health
 from .root_view import root
 
 urlpatterns = [
     path("", root, name="root"),
+    path("health", health, name="health"),
     path("admin/", admin.site.urls),
     path("api/v1/", include("apps.api.v1.urls"), name="api-v1"),
 ]
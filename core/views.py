@@ -0,0 +1,78 @@
+"""
+This module contains the base classes of the asynchronous API views.
+
+DRF views are synchronous, so under ASGI Django runs each of them in its
+single thread for synchronous code. The views below dispatch requests on the
+event loop instead: authentication, permissions and throttling run in a
+single hop to the thread for synchronous code, since they may query the
+database (e.g. tokens without user claims) or a blocking cache, and handlers
+are coroutines awaiting the async ORM and cache.
+"""
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import PermissionDenied
+from django.http import Http404
+from rest_framework.exceptions import APIException
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+__all__ = [
+    "AsyncAPIView",
+    "AsyncListModelMixin",
+]
+
+
+class AsyncAPIView(APIView):
+    """
+    An ``APIView`` whose handlers are coroutines.
+
+    Async variants of views subclass both this class and the synchronous view,
+    in that order, and override every handler.
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(
+                    self, request.method.lower(), self.http_method_not_allowed
+                )
+            else:
+                handler = self.http_method_not_allowed
+            response = handler(request, *args, **kwargs)
+            # OPTIONS requests are handled synchronously by DRF
+            if hasattr(response, "__await__"):
+                response = await response
+        except (APIException, Http404, PermissionDenied) as exc:
+            # The exceptions the exception handler turns into responses, the
+            # others propagate like handle_exception would raise them again
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+
+class AsyncListModelMixin:
+    """
+    List a queryset like ``ListModelMixin``.
+
+    Counting and fetching a page go through the synchronous paginators in a
+    single hop to the database thread, the page is serialized on the event
+    loop since every related object it renders is prefetched.
+    """
+
+    async def alist(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = await sync_to_async(self.paginate_queryset)(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+
+        serializer = self.get_serializer([obj async for obj in queryset], many=True)
+        return Response(serializer.data)
@@ -1,4 +1,5 @@
 import multiprocessing
+import os
 
 # Bind to 0.0.0.0:8000
 bind = "0.0.0.0:8000"
@@ -9,8 +10,8 @@ reload = False
 # Reload status
 # reload = False
 
-# Number of worker processes
-workers = multiprocessing.cpu_count() * 2 + 1
+# Number of worker processes, also used to size the database connection pools
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
 
 # Maximum number of simultaneous clients
 worker_connections = 1000
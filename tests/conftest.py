@@ -1,83 +1,109 @@
+import time
+from contextlib import contextmanager
+
 import pytest
-from django.test import Client
-from django.contrib.auth.models import User
-from myapp.models import (
-    MyModel,
-)  # Replace 'myapp' and 'MyModel' with actual app and model names
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
 
+from core.jwt import get_tokens
+from tests.factories import UserFactory
 
-@pytest.fixture
-def api_client():
+
+@pytest.fixture(scope="session")
+def django_db_setup(django_db_setup, django_db_blocker):
     """
-    Fixture returns a Django test client instance.
+    Create the PostgreSQL extensions installed by the skipped migrations.
     """
-    return Client()
+    with django_db_blocker.unblock():
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
 
 
-@pytest.fixture
-def create_user(db):
+@pytest.fixture(scope="session", autouse=True)
+def warm_up():
     """
-    Fixture to create a Django user instance.
+    Send a first request so the imports and URL resolving it triggers don't
+    count towards the latency budget of the first test.
     """
+    APIClient().get("/api/v1/users/me")
 
-    def _create_user(
-        username="testuser",
-        password="testpassword",
-        email="testuser@example.com",
-        **kwargs,
-    ):
-        user = User.objects.create_user(
-            username=username, password=password, email=email, **kwargs
-        )
-        return user
 
-    return _create_user
+@pytest.fixture(autouse=True)
+def enable_db_access_for_all_tests(db):
+    """
+    Automatically enable database access for all tests.
+    """
+    pass
 
 
-@pytest.fixture
-def authenticated_client(api_client, create_user):
+@pytest.fixture(autouse=True)
+def clear_cache():
     """
-    Fixture to provide a Django test client logged in as a created user.
+    Start every test with an empty cache so cached counts, users and
+    responses don't leak between tests.
     """
-    user = create_user()
-    api_client.login(username=user.username, password="testpassword")
-    return api_client
+    cache.clear()
+    yield
+    cache.clear()
 
 
 @pytest.fixture
-def sample_model_instance(db):
+def api_client():
     """
-    Fixture to create a sample model instance.
+    Fixture returns a DRF test client instance.
     """
+    return APIClient()
 
-    def _create_instance(**kwargs):
-        instance = MyModel.objects.create(**kwargs)
-        return instance
 
-    return _create_instance
+@pytest.fixture
+def user():
+    return UserFactory()
 
 
-@pytest.fixture(autouse=True)
-def enable_db_access_for_all_tests(db):
+@pytest.fixture
+def authenticated_client(user):
     """
-    Automatically enable database access for all tests.
+    Fixture to provide a DRF test client authenticated with the access token
+    of ``user``.
     """
-    pass
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {get_tokens(user)['access']}")
+    return client
 
 
-@pytest.fixture(scope="session")
-def django_db_setup():
+@pytest.fixture
+def assert_max_queries():
     """
-    Custom Django database setup fixture.
-    Modify settings if needed.
+    Fixture returns a context manager failing the test when its block runs
+    more than ``num`` queries, or takes more than ``max_ms`` milliseconds
+    (scaled by ``TEST_LATENCY_BUDGET_FACTOR``).
+
+        with assert_max_queries(3, max_ms=100):
+            client.get(url)
     """
-    from django.conf import settings
-
-    settings.DATABASES["default"] = {
-        "ENGINE": "django.db.backends.postgresql",
-        "NAME": "test_db",
-        "USER": "test_user",
-        "PASSWORD": "test_password",
-        "HOST": "localhost",
-        "PORT": "5432",
-    }
+
+    @contextmanager
+    def _assert_max_queries(num: int, max_ms: float | None = None):
+        with CaptureQueriesContext(connection) as context:
+            start = time.perf_counter()
+            yield context
+            elapsed = (time.perf_counter() - start) * 1000
+
+        executed = len(context.captured_queries)
+        if executed > num:
+            queries = "\n".join(
+                f"{i}. {query['sql']}"
+                for i, query in enumerate(context.captured_queries, start=1)
+            )
+            pytest.fail(f"{executed} queries executed, {num} expected\n{queries}")
+
+        if max_ms is not None:
+            budget = max_ms * settings.TEST_LATENCY_BUDGET_FACTOR
+            if elapsed > budget:
+                pytest.fail(f"took {elapsed:.1f}ms, {budget:.1f}ms expected")
+
+    return _assert_max_queries
@@ -0,0 +1,53 @@
+import factory
+from factory.django import DjangoModelFactory
+
+from apps.organization.models import Invitation, Member, Organization
+from apps.user.models import User
+
+__all__ = [
+    "UserFactory",
+    "OrganizationFactory",
+    "MemberFactory",
+    "InvitationFactory",
+]
+
+DEFAULT_PASSWORD = "tests-password"
+
+
+class UserFactory(DjangoModelFactory):
+    first_name = factory.Faker("first_name")
+    last_name = factory.Faker("last_name")
+    email = factory.Sequence(lambda n: f"user{n}@example.com")
+    username = factory.LazyAttribute(lambda user: user.email)
+    phone_number = factory.Sequence(lambda n: f"+2010{n:08d}")
+    password = factory.django.Password(DEFAULT_PASSWORD)
+
+    class Meta:
+        model = User
+
+
+class OrganizationFactory(DjangoModelFactory):
+    name = factory.Sequence(lambda n: f"Organization {n}")
+    owner = factory.SubFactory(UserFactory)
+    avatar = factory.django.ImageField(filename="avatar.png")
+    country = "EG"
+
+    class Meta:
+        model = Organization
+
+
+class MemberFactory(DjangoModelFactory):
+    organization = factory.SubFactory(OrganizationFactory)
+    user = factory.SubFactory(UserFactory)
+
+    class Meta:
+        model = Member
+
+
+class InvitationFactory(DjangoModelFactory):
+    email = factory.Sequence(lambda n: f"invitee{n}@example.com")
+    organization = factory.SubFactory(OrganizationFactory)
+    invited_by = factory.SubFactory(UserFactory)
+
+    class Meta:
+        model = Invitation
@@ -0,0 +1,73 @@
+"""
+Django settings for the test suite.
+
+The suite runs against an in-memory SQLite database by default, set
+``TEST_DB_URL`` to run it against a local PostgreSQL database instead.
+"""
+
+import os
+
+import dj_database_url
+
+for key, value in {
+    "DEBUG": "0",
+    "SECRET_KEY": "tests-secret-key-tests-secret-key-tests-secret-key",
+    "ALLOWED_HOSTS": "*",
+    "ACCESS_TOKEN_EXPIRY_MINUTES": "60",
+    "REFRESH_TOKEN_EXPIRY_DAYS": "30",
+    "DB_SCHEMA": "sqlite",
+    "DB_USER": "",
+    "DB_PASSWORD": "",
+    "DB_HOST": "",
+    "DB_PORT": "0",
+    "DB_NAME": "",
+    "DB_URL": "sqlite://:memory:",
+    "EMAIL_HOST": "localhost",
+    "EMAIL_PORT": "1025",
+    "EMAIL_HOST_PASSWORD": "",
+    "EMAIL_HOST_USER": "",
+    "DEFAULT_FROM_EMAIL": "noreply@example.com",
+    "SERVER_EMAIL": "noreply@example.com",
+}.items():
+    os.environ.setdefault(key, value)
+
+from core.settings import *  # NOQA
+
+DATABASES = {
+    "default": dj_database_url.parse(
+        os.environ.get("TEST_DB_URL", "sqlite://:memory:")
+    ),
+}
+# A replica of the default database, only routed to by the tests listing it in
+# DATABASE_REPLICAS
+DATABASES["replica"] = {**DATABASES["default"], "TEST": {"MIRROR": "default"}}
+DATABASE_REPLICAS = []
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    }
+}
+
+PASSWORD_HASHERS = [
+    "django.contrib.auth.hashers.MD5PasswordHasher",
+]
+
+EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
+
+STORAGES = {
+    "default": {
+        "BACKEND": "django.core.files.storage.InMemoryStorage",
+    },
+    "staticfiles": {
+        "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage",
+    },
+}
+
+SOFT_DELETE_PURGE_PAUSE = 0
+
+CELERY_TASK_ALWAYS_EAGER = True
+CELERY_TASK_EAGER_PROPAGATES = True
+
+# Latency budgets are multiplied by this factor, e.g. on slow CI runners
+TEST_LATENCY_BUDGET_FACTOR = float(os.environ.get("TEST_LATENCY_BUDGET_FACTOR", 1))
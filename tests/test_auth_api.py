@@ -0,0 +1,365 @@
+from unittest import mock
+
+import pytest
+from django.contrib.auth.hashers import get_hasher
+from django.contrib.auth.tokens import PasswordResetTokenGenerator
+from django.contrib.sessions.models import Session
+from django.core import mail
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.user import last_login
+from apps.user.last_login import (
+    BUFFER_KEY,
+    FLUSHING_KEY,
+    flush_last_logins,
+    record_login,
+)
+from apps.user.models import User
+from core.auth_backends import get_user_cache_key
+from core.jwt import get_tokens
+from tests.factories import DEFAULT_PASSWORD, UserFactory
+from tests.utils import FakeRedis
+
+TOKENS_URL = "/api/v1/auth/tokens"
+
+
+def test_obtain_tokens(api_client, user, assert_max_queries):
+    # The last login is only buffered when the cache is Redis
+    with assert_max_queries(2, max_ms=200):
+        response = api_client.post(
+            TOKENS_URL,
+            {"login": user.email, "password": DEFAULT_PASSWORD},
+            format="json",
+        )
+    assert response.status_code == 200
+    assert {"access", "refresh"} <= response.json().keys()
+    assert not Session.objects.exists()
+    user.refresh_from_db()
+    assert user.last_login is not None
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    redis = FakeRedis()
+    monkeypatch.setattr(last_login, "_get_redis", lambda: redis)
+    return redis
+
+
+def test_obtain_tokens_buffers_last_login(api_client, user, redis, assert_max_queries):
+    with assert_max_queries(1, max_ms=200):
+        response = api_client.post(
+            TOKENS_URL,
+            {"login": user.email, "password": DEFAULT_PASSWORD},
+            format="json",
+        )
+    assert response.status_code == 200
+    assert str(user.pk).encode() in redis.hgetall(BUFFER_KEY)
+    user.refresh_from_db()
+    assert user.last_login is None
+
+
+def test_flush_last_logins(user, redis, assert_max_queries):
+    other = UserFactory()
+    record_login(user)
+    record_login(other)
+
+    # A single update for the chunk
+    with assert_max_queries(1):
+        assert flush_last_logins() == 2
+    assert dict(User.objects.values_list("pk", "last_login")) == {
+        user.pk: user.last_login,
+        other.pk: other.last_login,
+    }
+    assert not redis.exists(BUFFER_KEY, FLUSHING_KEY)
+    assert flush_last_logins() == 0
+
+    # A flush that crashed midway left its buffer, which is flushed before
+    # the logins recorded since
+    record_login(user)
+    redis.rename(BUFFER_KEY, FLUSHING_KEY)
+    record_login(other)
+    assert flush_last_logins() == 1
+    assert User.objects.get(pk=user.pk).last_login == user.last_login
+    assert User.objects.get(pk=other.pk).last_login != other.last_login
+    assert flush_last_logins() == 1
+    assert User.objects.get(pk=other.pk).last_login == other.last_login
+    assert not redis.exists(BUFFER_KEY, FLUSHING_KEY)
+
+
+@pytest.mark.parametrize(
+    "login, column",
+    [
+        ("email", "email"),
+        ("phone_number", "phone_number"),
+        ("username", "username"),
+    ],
+)
+def test_obtain_tokens_by_identifier(api_client, login, column):
+    user = UserFactory(username="jane")
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client.post(
+            TOKENS_URL,
+            {"login": str(getattr(user, login)), "password": DEFAULT_PASSWORD},
+            format="json",
+        )
+    assert response.status_code == 200, response.content
+
+    # A single lookup on the unique index of the column
+    lookup = queries.captured_queries[0]["sql"]
+    assert f'"users"."{column}" = ' in lookup
+    assert " OR " not in lookup
+
+
+def test_obtain_tokens_unknown_user_hashes_password(api_client):
+    hasher = get_hasher()
+    with mock.patch.object(type(hasher), "encode", wraps=hasher.encode) as encode:
+        response = api_client.post(
+            TOKENS_URL,
+            {"login": "+201099999999", "password": "a-password"},
+            format="json",
+        )
+    assert response.status_code == 401
+    encode.assert_called_once()
+
+
+def test_obtain_tokens_invalid_credentials(api_client, user, assert_max_queries):
+    with assert_max_queries(1, max_ms=200):
+        response = api_client.post(
+            TOKENS_URL,
+            {"login": user.email, "password": "wrong-password"},
+            format="json",
+        )
+    assert response.status_code == 401
+
+
+@pytest.fixture
+def throttle_rates(settings):
+    def set_rates(**rates):
+        settings.REST_FRAMEWORK = {
+            **settings.REST_FRAMEWORK,
+            "DEFAULT_THROTTLE_RATES": rates,
+        }
+
+    return set_rates
+
+
+def test_obtain_tokens_throttled_per_identifier(
+    api_client, user, assert_max_queries, throttle_rates
+):
+    throttle_rates(login="100/m", login_identifier="2/m")
+    data = {"login": user.email, "password": "wrong-password"}
+    for i in range(2):
+        response = api_client.post(
+            TOKENS_URL, data, format="json", REMOTE_ADDR=f"10.0.0.{i}"
+        )
+        assert response.status_code == 401
+
+    # Rejected before the user is looked up and the password hashed
+    with assert_max_queries(0):
+        response = api_client.post(
+            TOKENS_URL,
+            {**data, "login": user.email.upper()},
+            format="json",
+            REMOTE_ADDR="10.0.0.9",
+        )
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) > 0
+
+    data["login"] = "someone-else@example.com"
+    response = api_client.post(TOKENS_URL, data, format="json")
+    assert response.status_code == 401
+
+
+def test_obtain_tokens_throttled_per_normalized_phone_number(
+    api_client, user, throttle_rates
+):
+    throttle_rates(login="100/m", login_identifier="2/m")
+    logins = [
+        user.phone_number.as_e164,
+        user.phone_number.as_international,
+        user.phone_number.as_rfc3966.removeprefix("tel:"),
+    ]
+    statuses = [
+        api_client.post(
+            TOKENS_URL,
+            {"login": login, "password": "wrong-password"},
+            format="json",
+            REMOTE_ADDR=f"10.0.0.{i}",
+        ).status_code
+        for i, login in enumerate(logins)
+    ]
+    assert statuses == [401, 401, 429]
+
+
+def test_obtain_tokens_throttled_per_ip(api_client, throttle_rates):
+    throttle_rates(login="2/m")
+    for i in range(3):
+        response = api_client.post(
+            TOKENS_URL,
+            {"login": f"user{i}@example.com", "password": "wrong-password"},
+            format="json",
+        )
+    assert response.status_code == 429
+
+    response = api_client.post(
+        TOKENS_URL,
+        {"login": "user@example.com", "password": "wrong-password"},
+        format="json",
+        REMOTE_ADDR="10.0.0.1",
+    )
+    assert response.status_code == 401
+
+
+def test_register_user(api_client, assert_max_queries):
+    with assert_max_queries(3, max_ms=200):
+        response = api_client.post(
+            f"{TOKENS_URL}/register",
+            {
+                "first_name": "Jane",
+                "last_name": "Doe",
+                "email": "jane@example.com",
+                "phone_number": "+201099999999",
+                "password": "a-strong-password",
+                "confirm_password": "a-strong-password",
+            },
+            format="json",
+        )
+    assert response.status_code == 201, response.content
+    assert {"access", "refresh"} <= response.json().keys()
+
+
+@pytest.mark.parametrize("field", ["email", "username", "phone_number"])
+def test_register_user_taken_by_deleted_user(api_client, field):
+    deleted = UserFactory(username="jane@example.com")
+    deleted.soft_delete()
+    data = {
+        "first_name": "Jane",
+        "last_name": "Doe",
+        "email": "other@example.com",
+        "phone_number": "+201099999999",
+        "password": "a-strong-password",
+        "confirm_password": "a-strong-password",
+    }
+    # The username of a registered user is its email
+    if field == "phone_number":
+        data["phone_number"] = deleted.phone_number.as_e164
+    else:
+        data["email"] = getattr(deleted, field)
+    response = api_client.post(f"{TOKENS_URL}/register", data, format="json")
+    assert response.status_code == 400, response.content
+    assert response.json().keys() == {
+        "phone_number" if field == "phone_number" else "email"
+    }
+
+
+def test_refresh_token(api_client, user, assert_max_queries):
+    refresh = get_tokens(user)["refresh"]
+    # The user is loaded through the cache, which is cold
+    with assert_max_queries(1, max_ms=50):
+        response = api_client.post(
+            f"{TOKENS_URL}/refresh", {"refresh": refresh}, format="json"
+        )
+    assert response.status_code == 200
+    assert {"access", "refresh"} <= response.json().keys()
+    assert response.json()["refresh"] != refresh
+
+
+def test_refresh_token_reissues_claims(api_client, user):
+    refresh = get_tokens(user)["refresh"]
+    User.objects.filter(pk=user.pk).update(is_staff=True)
+    cache.delete(get_user_cache_key(user.pk))
+
+    response = api_client.post(
+        f"{TOKENS_URL}/refresh", {"refresh": refresh}, format="json"
+    )
+    assert response.status_code == 200
+    assert AccessToken(response.json()["access"])["is_staff"] is True
+
+
+def test_refresh_token_inactive_user(api_client, user):
+    refresh = get_tokens(user)["refresh"]
+    User.objects.filter(pk=user.pk).update(is_active=False)
+    cache.delete(get_user_cache_key(user.pk))
+
+    response = api_client.post(
+        f"{TOKENS_URL}/refresh", {"refresh": refresh}, format="json"
+    )
+    assert response.status_code == 401
+
+
+def test_refresh_token_reuse_revokes_tokens(api_client, user):
+    refresh = get_tokens(user)["refresh"]
+    rotated = api_client.post(
+        f"{TOKENS_URL}/refresh", {"refresh": refresh}, format="json"
+    ).json()
+
+    response = api_client.post(
+        f"{TOKENS_URL}/refresh", {"refresh": refresh}, format="json"
+    )
+    assert response.status_code == 401
+
+    for token in rotated.values():
+        response = api_client.post(
+            f"{TOKENS_URL}/verify", {"token": token}, format="json"
+        )
+        assert response.status_code == 401
+
+
+@pytest.mark.parametrize("token_type", ["access", "refresh"])
+def test_verify_token(api_client, user, assert_max_queries, token_type):
+    token = get_tokens(user)[token_type]
+    with assert_max_queries(0, max_ms=50):
+        response = api_client.post(
+            f"{TOKENS_URL}/verify", {"token": token}, format="json"
+        )
+    assert response.status_code == 200
+
+
+def test_verify_consumed_refresh_token(api_client, user):
+    refresh = get_tokens(user)["refresh"]
+    api_client.post(f"{TOKENS_URL}/refresh", {"refresh": refresh}, format="json")
+
+    response = api_client.post(
+        f"{TOKENS_URL}/verify", {"token": refresh}, format="json"
+    )
+    assert response.status_code == 401
+
+
+@pytest.mark.parametrize("registered", [True, False])
+def test_request_password_reset(api_client, user, assert_max_queries, registered):
+    email = user.email if registered else "unknown@example.com"
+    with assert_max_queries(1, max_ms=500):
+        response = api_client.post(
+            "/api/v1/auth/request-password-reset/", {"email": email}, format="json"
+        )
+    assert response.status_code == 200
+    assert len(mail.outbox) == int(registered)
+
+
+def test_reset_password(api_client, user, assert_max_queries):
+    tokens = get_tokens(user)
+    uid = urlsafe_base64_encode(force_bytes(user.pk))
+    token = PasswordResetTokenGenerator().make_token(user)
+    with assert_max_queries(2, max_ms=200):
+        response = api_client.post(
+            f"/api/v1/auth/reset-password/{uid}/{token}/",
+            {"password": "a-new-password", "confirm_password": "a-new-password"},
+            format="json",
+        )
+    assert response.status_code == 200, response.content
+    user.refresh_from_db()
+    assert user.check_password("a-new-password")
+
+    response = api_client.post(
+        f"{TOKENS_URL}/refresh", {"refresh": tokens["refresh"]}, format="json"
+    )
+    assert response.status_code == 401
+
+    # The access tokens issued before are revoked too
+    api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+    assert api_client.get("/api/v1/users/me").status_code == 401
@@ -0,0 +1,86 @@
+import json
+from random import Random
+
+import pytest
+from django.core.management import call_command
+
+from apps.benchmark.runner import run_benchmark
+from apps.benchmark.scenarios import DEFAULT_MIX, SCENARIOS
+from apps.benchmark.seed import (
+    seed_invitations,
+    seed_members,
+    seed_organizations,
+    seed_users,
+)
+from apps.organization.models import Invitation, Member, Organization
+from apps.user.models import User
+
+
+@pytest.fixture
+def dataset():
+    seed_users(20, chunk_size=7)
+    seed_organizations(4, chunk_size=7)
+    seed_members(30, chunk_size=7)
+    seed_invitations(10, chunk_size=7)
+
+
+def test_seed(dataset):
+    assert User.objects.count() == 20
+    assert Organization.objects.count() == 4
+    assert Member.objects.count() == 30
+    assert Invitation.objects.count() == 10
+
+    # Seeding again grows the dataset
+    seed_users(5, chunk_size=7)
+    assert User.objects.count() == 25
+
+
+# The views run in another thread, which must see the seeded rows
+@pytest.mark.django_db(transaction=True)
+def test_run_benchmark(dataset):
+    scenarios = [SCENARIOS[name](weight) for name, weight in DEFAULT_MIX.items()]
+    result = run_benchmark(scenarios, requests=40, concurrency=4, warmup=0)
+
+    assert result.total["requests"] == 40
+    assert result.total["errors"] == 0
+    assert result.scenarios["member_list"]["queries"]["max"] >= 1
+
+
+def test_organization_list_pages(dataset, api_client):
+    seed_organizations(300, chunk_size=100)
+    scenario = SCENARIOS["organization_list"]()
+    scenario.prepare()
+    requests = [scenario.build(Random(seed)) for seed in range(50)]
+
+    assert max(scenario.pages.values()) > 1
+    assert any("page_number=2" in request.path for request in requests)
+    for request in requests:
+        response = api_client.get(request.path, headers=request.headers)
+        assert response.status_code == 200, response.content
+
+
+@pytest.mark.django_db(transaction=True)
+def test_run_benchmark_command(dataset, tmp_path):
+    output = tmp_path / "results.json"
+    call_command(
+        "run_benchmark",
+        "--requests=10",
+        "--warmup=0",
+        "--scenario=current_user",
+        f"--output={output}",
+    )
+
+    results = json.loads(output.read_text())
+    assert results["total"]["requests"] == 10
+    assert set(results["total"]["latency_ms"]) == {"mean", "p50", "p95", "p99", "max"}
+
+
+@pytest.mark.django_db(transaction=True)
+def test_run_benchmark_logins(dataset):
+    scenarios = [SCENARIOS["token_obtain"](), SCENARIOS["token_obtain_phone"]()]
+    result = run_benchmark(scenarios, requests=20, concurrency=2, warmup=0)
+
+    assert result.total["errors"] == 0
+    # The user lookup, plus the last login update as the cache isn't Redis
+    for name in ("token_obtain", "token_obtain_phone"):
+        assert result.scenarios[name]["queries"]["max"] == 2
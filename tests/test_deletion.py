@@ -0,0 +1,83 @@
+from itertools import islice
+
+from apps.organization.models import Invitation, Member, Organization
+from apps.user.models import User
+from core.deletion import delete_in_batches, get_deletion_plan, iter_delete
+from tests.factories import (
+    InvitationFactory,
+    MemberFactory,
+    OrganizationFactory,
+    UserFactory,
+)
+
+
+def test_deletion_plan():
+    plan = [(step.model, step.path) for step in get_deletion_plan(Organization)]
+    assert plan == [(Member, "organization"), (Invitation, "organization")]
+
+    plan = [
+        (step.model, step.path, step.null_field is not None)
+        for step in get_deletion_plan(User)
+    ]
+    # The dependents of the organizations owned by the user are deleted first
+    owned = plan.index((Organization, "owner", False))
+    assert plan.index((Member, "organization__owner", False)) < owned
+    assert plan.index((Invitation, "organization__owner", False)) < owned
+    assert (Member, "user", False) in plan
+    assert (Organization, "deleted_by", True) in plan
+
+
+def test_delete_in_batches(assert_max_queries):
+    organization = OrganizationFactory()
+    MemberFactory.create_batch(5, organization=organization)
+    InvitationFactory.create_batch(3, organization=organization)
+    kept = MemberFactory()
+
+    progress = []
+    # A query per batch and the delete of the organization itself
+    with assert_max_queries(3 + 2 + 4):
+        total_rows = delete_in_batches(organization, 2, on_progress=progress.append)
+
+    assert total_rows == 8
+    assert [(p.model, p.batch_rows) for p in progress] == [
+        ("organization.Member", 2),
+        ("organization.Member", 2),
+        ("organization.Member", 1),
+        ("organization.Invitation", 2),
+        ("organization.Invitation", 1),
+    ]
+    assert not Organization.all_objects.filter(pk=organization.pk).exists()
+    assert list(Member.objects.all()) == [kept]
+    assert not Invitation.objects.exists()
+
+
+def test_resume_deletion():
+    organization = OrganizationFactory()
+    MemberFactory.create_batch(2, organization=organization)
+    InvitationFactory.create_batch(4, organization=organization)
+
+    # Interrupted after the members and half of the invitations
+    list(islice(iter_delete(organization, 2), 3))
+    assert Invitation.objects.count() == 2
+
+    progress = list(iter_delete(organization, 2))
+    assert {p.model for p in progress} == {"organization.Invitation"}
+    assert progress[-1].total_rows == 6
+    assert not Organization.all_objects.filter(pk=organization.pk).exists()
+
+
+def test_delete_user_in_batches():
+    user = UserFactory()
+    organization = OrganizationFactory(owner=user)
+    MemberFactory.create_batch(3, organization=organization)
+    MemberFactory(user=user)
+    InvitationFactory(invited_by=user)
+    deleted = OrganizationFactory()
+    deleted.soft_delete(deleted_by_id=user.pk)
+
+    delete_in_batches(user, 2)
+
+    assert not User.all_objects.filter(pk=user.pk).exists()
+    assert not Organization.all_objects.filter(pk=organization.pk).exists()
+    assert not Member.objects.filter(organization_id=organization.pk).exists()
+    assert Organization.all_objects.get(pk=deleted.pk).deleted_by_id is None
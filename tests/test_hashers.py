@@ -0,0 +1,56 @@
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth.hashers import identify_hasher, make_password
+from django.test import override_settings
+
+from tests.factories import DEFAULT_PASSWORD, UserFactory
+
+
+def create_user(hasher: str = "default"):
+    user = UserFactory()
+    user.password = make_password(DEFAULT_PASSWORD, hasher=hasher)
+    user.save(update_fields=["password"])
+    return user
+
+
+@pytest.fixture(autouse=True)
+def scrypt_hasher():
+    with override_settings(
+        PASSWORD_HASHERS=[
+            "core.hashers.ScryptPasswordHasher",
+            "django.contrib.auth.hashers.MD5PasswordHasher",
+        ],
+        PASSWORD_SCRYPT_WORK_FACTOR=2**10,
+    ):
+        yield
+
+
+def test_rehash_on_login(api_client):
+    user = create_user(hasher="md5")
+    response = api_client.post(
+        "/api/v1/auth/tokens",
+        {"login": user.email, "password": DEFAULT_PASSWORD},
+        format="json",
+    )
+    assert response.status_code == 200
+
+    user.refresh_from_db()
+    assert identify_hasher(user.password).algorithm == "scrypt"
+
+
+def test_rehash_on_cost_change():
+    user = create_user()
+    with override_settings(PASSWORD_SCRYPT_WORK_FACTOR=2**11):
+        assert user.check_password(DEFAULT_PASSWORD)
+
+    user.refresh_from_db()
+    assert user.password.startswith(f"scrypt${2**11}$")
+
+
+def test_async_check_password():
+    user = create_user(hasher="md5")
+    assert not async_to_sync(user.acheck_password)("wrong-password")
+    assert async_to_sync(user.acheck_password)(DEFAULT_PASSWORD)
+
+    user.refresh_from_db()
+    assert identify_hasher(user.password).algorithm == "scrypt"
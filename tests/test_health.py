@@ -0,0 +1,34 @@
+from unittest import mock
+
+import pytest
+from django.db import connections
+
+from core.db import reset_connection_pools
+
+pytestmark = pytest.mark.django_db(databases=["default", "replica"])
+
+
+def test_health(api_client):
+    response = api_client.get("/health")
+    assert response.status_code == 200
+    assert response.json()["databases"] == {"default": True, "replica": True}
+
+
+def test_health_database_unreachable(api_client):
+    with mock.patch.object(
+        connections["default"], "cursor", side_effect=Exception("unreachable")
+    ):
+        response = api_client.get("/health")
+    assert response.status_code == 503
+    assert response.json()["databases"] == {"default": False, "replica": True}
+
+
+def test_reset_connection_pools():
+    pool = mock.Mock()
+    pools = {"default": pool}
+    with mock.patch.object(
+        type(connections["default"]), "_connection_pools", pools, create=True
+    ):
+        reset_connection_pools()
+    assert pools == {}
+    pool.close.assert_not_called()
@@ -0,0 +1,561 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from smtplib import SMTPServerDisconnected
+from uuid import uuid4
+
+import pytest
+from celery.exceptions import Retry
+from django.core import mail
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.mail.backends.locmem import EmailBackend
+from django.db import IntegrityError, connection, connections, transaction
+from django.utils import timezone
+from factory.django import ImageField
+
+from apps.organization.managers import BulkInviteStatus, InvitationQuerySet
+from apps.organization.memberships import get_memberships
+from apps.organization.models import Invitation, Member, Organization
+from apps.organization.slugs import is_slug_conflict
+from apps.organization.tasks import (
+    EXPIRE_INVITATIONS_LOCK,
+    expire_invitations,
+    purge_deleted_organizations,
+    send_invitation_emails,
+)
+from core.locks import task_lock
+from tests.factories import (
+    InvitationFactory,
+    MemberFactory,
+    OrganizationFactory,
+    UserFactory,
+)
+from tests.utils import assert_constant_queries, paginated_queries
+
+ORGANIZATIONS_URL = "/api/v1/organizations/"
+
+
+@pytest.fixture
+def organization(user):
+    organization = OrganizationFactory(owner=user)
+    MemberFactory(organization=organization, user=user, role=Member.MemberRole.OWNER)
+    # The query budgets below exclude the authorization, cached on first use
+    get_memberships(user.pk)
+    return organization
+
+
+def test_list_organizations(authenticated_client, assert_max_queries):
+    OrganizationFactory.create_batch(5)
+    with assert_max_queries(paginated_queries(2), max_ms=100):
+        response = authenticated_client.get(ORGANIZATIONS_URL)
+    assert response.status_code == 200
+    assert response.json()["count"] == 5
+
+    assert_constant_queries(
+        authenticated_client,
+        ORGANIZATIONS_URL,
+        lambda: OrganizationFactory.create_batch(5),
+    )
+
+
+def test_create_organization(authenticated_client, user, assert_max_queries):
+    avatar = ImageField()._make_data({"filename": "avatar.png"})
+    with assert_max_queries(4, max_ms=200):
+        response = authenticated_client.post(
+            ORGANIZATIONS_URL,
+            {
+                "name": "Acme",
+                "owner": user.pk,
+                "country": "EG",
+                "avatar": SimpleUploadedFile("avatar.png", avatar),
+            },
+            format="multipart",
+        )
+    assert response.status_code == 201, response.content
+    assert response.json()["slug"] == "acme"
+
+
+def test_slug_conflicts(organization):
+    # The slug taken by an organization is suffixed
+    duplicate = OrganizationFactory(name=organization.name)
+    assert duplicate.slug.startswith(f"{organization.slug}-")
+
+    with pytest.raises(IntegrityError) as exc, transaction.atomic():
+        Organization.objects.filter(pk=duplicate.pk).update(slug=organization.slug)
+    assert is_slug_conflict(exc.value)
+
+    # The violations of other unique constraints are not
+    member = MemberFactory(organization=organization)
+    with pytest.raises(IntegrityError) as exc, transaction.atomic():
+        Member.objects.create(organization=organization, user=member.user)
+    assert not is_slug_conflict(exc.value)
+
+
+def test_retrieve_organization(authenticated_client, organization, assert_max_queries):
+    url = f"{ORGANIZATIONS_URL}{organization.slug}"
+    with assert_max_queries(1, max_ms=100):
+        response = authenticated_client.get(url)
+    assert response.status_code == 200
+
+    with assert_max_queries(0, max_ms=50):
+        response = authenticated_client.get(url)
+    assert response.status_code == 200
+
+
+def test_update_organization(authenticated_client, organization, assert_max_queries):
+    with assert_max_queries(4, max_ms=100):
+        response = authenticated_client.patch(
+            f"{ORGANIZATIONS_URL}{organization.slug}",
+            {"name": "Renamed"},
+            format="json",
+        )
+    assert response.status_code == 200, response.content
+    assert response.json()["slug"] == "renamed"
+
+
+def test_delete_organization(authenticated_client, organization, assert_max_queries):
+    MemberFactory.create_batch(3, organization=organization)
+    InvitationFactory.create_batch(3, organization=organization)
+    url = f"{ORGANIZATIONS_URL}{organization.slug}"
+    with assert_max_queries(4, max_ms=200):
+        response = authenticated_client.delete(url)
+    assert response.status_code == 204
+    assert authenticated_client.get(url).status_code == 404
+    assert authenticated_client.get(f"{url}/members").status_code == 404
+    assert Member.objects.filter(organization=organization).count() == 4
+
+
+def test_purge_deleted_organizations(organization, settings):
+    settings.SOFT_DELETE_RETENTION_HOURS = 0
+    settings.SOFT_DELETE_PURGE_BATCH_SIZE = 2
+    MemberFactory.create_batch(3, organization=organization)
+    InvitationFactory.create_batch(3, organization=organization)
+    kept = OrganizationFactory()
+    MemberFactory(organization=kept)
+    organization.soft_delete()
+
+    assert purge_deleted_organizations() == 1
+    assert not Organization.all_objects.filter(pk=organization.pk).exists()
+    assert not Member.objects.filter(organization_id=organization.pk).exists()
+    assert not Invitation.objects.filter(organization_id=organization.pk).exists()
+    assert Member.objects.filter(organization=kept).exists()
+
+
+def test_list_members(authenticated_client, organization, assert_max_queries):
+    MemberFactory.create_batch(5, organization=organization)
+    MemberFactory.create_batch(2)
+    url = f"{ORGANIZATIONS_URL}{organization.slug}/members"
+    with assert_max_queries(paginated_queries(3), max_ms=100):
+        response = authenticated_client.get(url)
+    assert response.status_code == 200
+    assert response.json()["count"] == 6
+
+    assert_constant_queries(
+        authenticated_client,
+        url,
+        lambda: MemberFactory.create_batch(5, organization=organization),
+    )
+    assert_constant_queries(
+        authenticated_client,
+        f"{url}?search=example&paginate=cursor",
+        lambda: MemberFactory.create_batch(5, organization=organization),
+    )
+
+
+def test_retrieve_member(authenticated_client, organization, assert_max_queries):
+    member = MemberFactory(organization=organization)
+    with assert_max_queries(1, max_ms=100):
+        response = authenticated_client.get(
+            f"{ORGANIZATIONS_URL}{organization.slug}/members/{member.pk}"
+        )
+    assert response.status_code == 200
+
+
+def test_update_member(authenticated_client, organization, assert_max_queries):
+    member = MemberFactory(organization=organization)
+    with assert_max_queries(2, max_ms=100):
+        response = authenticated_client.patch(
+            f"{ORGANIZATIONS_URL}{organization.slug}/members/{member.pk}",
+            {"role": Member.MemberRole.ADMIN},
+            format="json",
+        )
+    assert response.status_code == 200, response.content
+    assert response.json()["role"] == Member.MemberRole.ADMIN
+
+
+@pytest.mark.parametrize(
+    "current, role",
+    [
+        (Member.MemberRole.ADMIN, Member.MemberRole.OWNER),
+        (Member.MemberRole.OWNER, Member.MemberRole.MEMBER),
+    ],
+)
+def test_update_member_owner_role(authenticated_client, organization, current, role):
+    member = MemberFactory(organization=organization, role=current)
+    response = authenticated_client.patch(
+        f"{ORGANIZATIONS_URL}{organization.slug}/members/{member.pk}",
+        {"role": role},
+        format="json",
+    )
+    assert response.status_code == 400
+    member.refresh_from_db()
+    assert member.role == current
+
+
+def test_member_with_owner_role_cannot_delete_organization(authenticated_client, user):
+    organization = OrganizationFactory()
+    MemberFactory(organization=organization, user=user, role=Member.MemberRole.OWNER)
+    url = f"{ORGANIZATIONS_URL}{organization.slug}"
+    assert authenticated_client.patch(url, {}, format="json").status_code == 200
+    assert authenticated_client.delete(url).status_code == 403
+
+
+def test_admin_cannot_take_over_organization(authenticated_client, user):
+    organization = OrganizationFactory()
+    MemberFactory(organization=organization, user=user, role=Member.MemberRole.ADMIN)
+    url = f"{ORGANIZATIONS_URL}{organization.slug}"
+    response = authenticated_client.patch(url, {"owner": user.pk}, format="json")
+    assert response.status_code == 200, response.content
+    assert response.json()["owner"] == organization.owner_id
+    organization.refresh_from_db()
+    assert organization.owner_id != user.pk
+    assert authenticated_client.delete(url).status_code == 403
+
+
+def test_delete_member(authenticated_client, organization, assert_max_queries):
+    member = MemberFactory(organization=organization)
+    with assert_max_queries(2, max_ms=100):
+        response = authenticated_client.delete(
+            f"{ORGANIZATIONS_URL}{organization.slug}/members/{member.pk}"
+        )
+    assert response.status_code == 204
+
+
+def test_list_invitations(authenticated_client, organization, assert_max_queries):
+    InvitationFactory.create_batch(5, organization=organization)
+    url = f"{ORGANIZATIONS_URL}{organization.slug}/invitations"
+    with assert_max_queries(paginated_queries(3), max_ms=100):
+        response = authenticated_client.get(url)
+    assert response.status_code == 200
+    assert response.json()["count"] == 5
+
+    assert_constant_queries(
+        authenticated_client,
+        url,
+        lambda: InvitationFactory.create_batch(5, organization=organization),
+    )
+
+
+def test_invite_member(authenticated_client, organization, assert_max_queries):
+    # The check of the members and pending invitations, and the insert in a
+    # savepoint as the test runs in a transaction
+    with assert_max_queries(4, max_ms=200):
+        response = authenticated_client.post(
+            f"{ORGANIZATIONS_URL}{organization.slug}/invitations/invite",
+            {"email": "invitee@example.com", "role": Member.MemberRole.MEMBER},
+            format="json",
+        )
+    assert response.status_code == 201, response.content
+    assert Invitation.objects.filter(email="invitee@example.com").exists()
+
+
+def test_invite_member_taken(authenticated_client, organization):
+    url = f"{ORGANIZATIONS_URL}{organization.slug}/invitations/invite"
+    member = MemberFactory(organization=organization)
+    pending = InvitationFactory(organization=organization)
+    for email in (member.user.email, pending.email.upper()):
+        response = authenticated_client.post(url, {"email": email}, format="json")
+        assert response.status_code == 400, response.content
+        assert response.json().keys() == {"email"}
+
+    # A stale pending invitation is expired and replaced
+    Invitation.objects.filter(pk=pending.pk).update(
+        expired_at=timezone.now() - timedelta(minutes=1)
+    )
+    response = authenticated_client.post(url, {"email": pending.email}, format="json")
+    assert response.status_code == 201, response.content
+    pending.refresh_from_db()
+    assert pending.status == Invitation.InvitationStatus.EXPIRED
+    assert Invitation.objects.filter(
+        email=pending.email, status=Invitation.InvitationStatus.PENDING
+    ).exists()
+
+
+def test_bulk_invite_concurrent_invitation(monkeypatch, user, organization):
+    invitation = InvitationFactory(organization=organization)
+    get_taken_emails = InvitationQuerySet._get_taken_emails
+    calls = []
+
+    # The invitation is inserted by a concurrent invite after the check
+    def racing_get_taken_emails(queryset, *args):
+        calls.append(args)
+        if len(calls) == 1:
+            return set(), set(), set()
+        return get_taken_emails(queryset, *args)
+
+    monkeypatch.setattr(
+        InvitationQuerySet, "_get_taken_emails", racing_get_taken_emails
+    )
+    [result] = Invitation.objects.bulk_invite(
+        organization.pk, user, [{"email": invitation.email}], Member.MemberRole.MEMBER
+    )
+    assert len(calls) == 2
+    assert result["status"] == BulkInviteStatus.PENDING
+    assert result["id"] is None
+    assert Invitation.objects.filter(organization=organization).count() == 1
+
+
+def test_bulk_invite_members(authenticated_client, organization, assert_max_queries):
+    member = MemberFactory(organization=organization)
+    rows = [{"email": f"invitee{i}@example.com"} for i in range(50)]
+    rows.append({"email": member.user.email})
+    with assert_max_queries(4, max_ms=500):
+        response = authenticated_client.post(
+            f"{ORGANIZATIONS_URL}{organization.slug}/invitations/bulk",
+            {"invitations": rows},
+            format="json",
+        )
+    assert response.status_code == 201, response.content
+    assert Invitation.objects.filter(organization=organization).count() == 50
+
+
+def test_invitation_emails_retry_unsent(monkeypatch, organization):
+    invitations = InvitationFactory.create_batch(3, organization=organization)
+    failing = [invitations[1].email]
+    send_messages = EmailBackend.send_messages
+
+    def flaky_send_messages(backend, messages):
+        if messages[0].to[0] in failing:
+            failing.pop()
+            raise SMTPServerDisconnected
+        return send_messages(backend, messages)
+
+    monkeypatch.setattr(EmailBackend, "send_messages", flaky_send_messages)
+    with pytest.raises(Retry) as retry:
+        send_invitation_emails.delay([invitation.pk for invitation in invitations])
+    retry.value.sig.apply()
+
+    # The message sent before the error isn't sent again by the retry
+    assert sorted(message.to[0] for message in mail.outbox) == sorted(
+        invitation.email for invitation in invitations
+    )
+
+
+def accept_url(invitation: Invitation, slug: str | None = None) -> str:
+    slug = slug or invitation.organization.slug
+    return f"{ORGANIZATIONS_URL}{slug}/invitations/{invitation.token}/accept"
+
+
+def test_accept_invitation(authenticated_client, user, assert_max_queries):
+    organization = OrganizationFactory()
+    get_memberships(user.pk)
+    invitation = InvitationFactory(
+        organization=organization,
+        email=user.email.upper(),
+        role=Member.MemberRole.ADMIN,
+    )
+    url = accept_url(invitation)
+    # The slug, then the claim, the upsert and the membership in a savepoint
+    with assert_max_queries(6, max_ms=100):
+        response = authenticated_client.post(url)
+    assert response.status_code == 200, response.content
+    member = Member.objects.get(organization=organization, user=user)
+    assert response.json()["id"] == member.pk
+    assert response.json()["role"] == Member.MemberRole.ADMIN
+    invitation.refresh_from_db()
+    assert invitation.status == Invitation.InvitationStatus.ACCEPTED
+    assert invitation.accepted_by_id == user.pk
+
+    # Retries return the same membership
+    with assert_max_queries(4, max_ms=100):
+        response = authenticated_client.post(url)
+    assert response.status_code == 200
+    assert response.json()["id"] == member.pk
+    assert Member.objects.filter(organization=organization).count() == 1
+
+
+@pytest.mark.parametrize(
+    "current, invited, role",
+    [
+        (Member.MemberRole.ADMIN, Member.MemberRole.MEMBER, Member.MemberRole.ADMIN),
+        (Member.MemberRole.MEMBER, Member.MemberRole.ADMIN, Member.MemberRole.ADMIN),
+        (Member.MemberRole.MEMBER, Member.MemberRole.OWNER, Member.MemberRole.ADMIN),
+    ],
+)
+def test_accept_invitation_roles(authenticated_client, user, current, invited, role):
+    member = MemberFactory(user=user, role=current, is_active=False)
+    invitation = InvitationFactory(
+        organization=member.organization, email=user.email, role=invited
+    )
+    response = authenticated_client.post(accept_url(invitation))
+    assert response.status_code == 200, response.content
+    member.refresh_from_db()
+    assert member.role == role
+    assert member.is_active
+
+
+def test_accept_invitation_errors(authenticated_client, user, organization):
+    expired = InvitationFactory(organization=organization, email=user.email)
+    Invitation.objects.filter(pk=expired.pk).update(expired_at=timezone.now())
+    response = authenticated_client.post(accept_url(expired))
+    assert response.status_code == 406
+
+    # Invitations of other emails and organizations aren't disclosed
+    other_email = InvitationFactory(organization=organization)
+    response = authenticated_client.post(accept_url(other_email))
+    assert response.status_code == 404
+
+    other_organization = InvitationFactory(email=user.email)
+    response = authenticated_client.post(
+        accept_url(other_organization, organization.slug)
+    )
+    assert response.status_code == 404
+
+    # Another user with the token accepting an invitation already accepted,
+    # once the stale invitation is expired: an email has one pending
+    # invitation at most
+    Invitation.objects.expire_stale(chunk_size=10)
+    accepted = InvitationFactory(organization=organization, email=user.email)
+    other = UserFactory(email=accepted.email.upper())
+    assert Invitation.objects.accept(
+        accepted.token, organization.pk, other.pk, other.email
+    )
+    response = authenticated_client.post(accept_url(accepted))
+    assert response.status_code == 406
+    assert not Member.objects.filter(
+        organization=organization, user=user, role=accepted.role
+    ).exists()
+
+    response = authenticated_client.post(
+        f"{ORGANIZATIONS_URL}{organization.slug}/invitations/{uuid4()}/accept"
+    )
+    assert response.status_code == 404
+
+
+def test_invite_owner_role(authenticated_client, organization):
+    response = authenticated_client.post(
+        f"{ORGANIZATIONS_URL}{organization.slug}/invitations/invite",
+        {"email": "invitee@example.com", "role": Member.MemberRole.OWNER},
+        format="json",
+    )
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.parametrize("same_user", [True, False])
+def test_concurrent_accepts(same_user):
+    if connection.vendor != "postgresql":
+        pytest.skip("SQLite serializes the writes of concurrent connections")
+    users = UserFactory.create_batch(8)
+    invitation = InvitationFactory(email=users[0].email)
+    if same_user:
+        users = [users[0]] * len(users)
+    barrier = threading.Barrier(len(users))
+
+    def accept(user):
+        try:
+            barrier.wait()
+            return Invitation.objects.accept(
+                invitation.token, invitation.organization_id, user.pk, user.email
+            )
+        finally:
+            connections.close_all()
+
+    with ThreadPoolExecutor(max_workers=len(users)) as executor:
+        members = list(executor.map(accept, users))
+
+    accepted = [member for member in members if member is not None]
+    assert len(accepted) == (len(users) if same_user else 1)
+    assert len({member.pk for member in accepted}) == 1
+    assert Member.objects.filter(organization=invitation.organization).count() == 1
+
+
+@pytest.mark.parametrize(
+    "role, method, path, status_code",
+    [
+        (None, "get", "", 404),
+        (None, "get", "/members", 404),
+        (Member.MemberRole.MEMBER, "get", "", 200),
+        (Member.MemberRole.MEMBER, "patch", "", 403),
+        (Member.MemberRole.MEMBER, "get", "/members", 200),
+        (Member.MemberRole.MEMBER, "get", "/invitations", 403),
+        (Member.MemberRole.ADMIN, "patch", "", 200),
+        (Member.MemberRole.ADMIN, "delete", "", 403),
+        (Member.MemberRole.ADMIN, "get", "/invitations", 200),
+    ],
+)
+def test_organization_permissions(
+    authenticated_client, user, role, method, path, status_code
+):
+    organization = OrganizationFactory()
+    if role is not None:
+        MemberFactory(organization=organization, user=user, role=role)
+    response = getattr(authenticated_client, method)(
+        f"{ORGANIZATIONS_URL}{organization.slug}{path}", {}, format="json"
+    )
+    assert response.status_code == status_code
+
+
+def test_owner_is_authorized_without_member(authenticated_client, user):
+    organization = OrganizationFactory(owner=user)
+    response = authenticated_client.delete(f"{ORGANIZATIONS_URL}{organization.slug}")
+    assert response.status_code == 204
+
+
+def test_authorization_is_cached(
+    authenticated_client, user, organization, assert_max_queries
+):
+    url = f"{ORGANIZATIONS_URL}{organization.slug}"
+    authenticated_client.get(url)
+    with assert_max_queries(0):
+        response = authenticated_client.get(url)
+    assert response.status_code == 200
+
+    member = Member.objects.get(organization=organization, user=user)
+    member.is_active = False
+    member.save()
+    assert authenticated_client.get(url).status_code == 200  # Still the owner
+
+    organization.owner = UserFactory()
+    organization.save()
+    assert authenticated_client.get(url).status_code == 404
+
+    member.is_active = True
+    member.save()
+    assert authenticated_client.get(url).status_code == 200
+
+
+def test_task_lock():
+    with task_lock("lock") as acquired:
+        assert acquired
+        with task_lock("lock") as acquired_again:
+            assert not acquired_again
+        assert "lock" in cache
+    assert "lock" not in cache
+
+    # The lock expired during the run and another run acquired it meanwhile
+    with task_lock("lock") as acquired:
+        assert acquired
+        cache.set("lock", "token")
+    assert cache.get("lock") == "token"
+
+
+def test_expire_invitations(organization, assert_max_queries, settings):
+    settings.INVITATION_EXPIRY_CHUNK_SIZE = 2
+    stale = InvitationFactory.create_batch(5, organization=organization)
+    Invitation.objects.filter(pk__in=[invitation.pk for invitation in stale]).update(
+        expired_at=timezone.now() - timedelta(minutes=1)
+    )
+    pending = InvitationFactory(organization=organization)
+
+    cache.add(EXPIRE_INVITATIONS_LOCK, 1)
+    assert expire_invitations() == 0
+    cache.delete(EXPIRE_INVITATIONS_LOCK)
+
+    with assert_max_queries(3):
+        assert expire_invitations() == 5
+    assert set(
+        Invitation.objects.filter(status=Invitation.InvitationStatus.PENDING)
+    ) == {pending}
+    assert expire_invitations() == 0
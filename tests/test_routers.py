@@ -0,0 +1,117 @@
+import threading
+from unittest import mock
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.db import connections
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from core.middlewares import primary_pin_middleware
+from core.routers import ReplicaRouter, get_replica_lag, is_pinned_to_primary
+from tests.factories import UserFactory
+
+USERS_URL = "/api/v1/users/"
+
+# The replica reads through its own connection, which only sees committed rows
+pytestmark = pytest.mark.django_db(databases=["default", "replica"], transaction=True)
+
+
+@pytest.fixture(autouse=True)
+def replicas(settings):
+    settings.DATABASE_REPLICAS = ["replica"]
+
+
+@pytest.fixture
+def capture_queries():
+    with (
+        CaptureQueriesContext(connections["default"]) as primary,
+        CaptureQueriesContext(connections["replica"]) as replica,
+    ):
+        yield primary, replica
+
+
+def test_list_reads_from_replica(authenticated_client, capture_queries):
+    primary, replica = capture_queries
+    response = authenticated_client.get(USERS_URL)
+    assert response.status_code == 200
+    assert replica.captured_queries
+    assert not primary.captured_queries
+
+
+def test_write_pins_user_to_primary(authenticated_client, user, capture_queries):
+    primary, replica = capture_queries
+    # Not a token claim, changing one would revoke the token
+    response = authenticated_client.patch(
+        f"{USERS_URL}{user.email}", {"phone_number": "+201099999999"}, format="json"
+    )
+    assert response.status_code == 200
+    writes = len(primary.captured_queries)
+
+    response = authenticated_client.get(USERS_URL)
+    assert response.status_code == 200
+    assert not replica.captured_queries
+    assert len(primary.captured_queries) > writes
+
+
+def test_async_write_pins_user_off_event_loop(user, monkeypatch):
+    cache_set = cache.set
+    threads = []
+
+    def recording_set(*args, **kwargs):
+        threads.append(threading.current_thread())
+        return cache_set(*args, **kwargs)
+
+    async def get_response(request):
+        return HttpResponse(status=201)
+
+    async def post():
+        request = RequestFactory().post(USERS_URL)
+        request.user = user
+        await primary_pin_middleware(get_response)(request)
+        return threading.current_thread()
+
+    monkeypatch.setattr(cache, "set", recording_set)
+    event_loop_thread = async_to_sync(post)()
+    assert is_pinned_to_primary(user.pk)
+    assert threads
+    assert event_loop_thread not in threads
+
+
+def test_other_users_still_read_from_replica(
+    api_client, authenticated_client, user, capture_queries
+):
+    authenticated_client.patch(
+        f"{USERS_URL}{user.email}", {"first_name": "Jane"}, format="json"
+    )
+    other = UserFactory()
+    api_client.force_authenticate(other)
+    _, replica = capture_queries
+    assert api_client.get(USERS_URL).status_code == 200
+    assert replica.captured_queries
+
+
+def test_lagging_replica_falls_back_to_primary(authenticated_client, capture_queries):
+    primary, replica = capture_queries
+    with mock.patch("core.routers.get_replica_lag", return_value=60.0):
+        response = authenticated_client.get(USERS_URL)
+    assert response.status_code == 200
+    assert not replica.captured_queries
+    assert primary.captured_queries
+
+
+def test_unreachable_replica_lag():
+    replica = connections["replica"]
+    with (
+        mock.patch.object(replica, "vendor", "postgresql"),
+        mock.patch.object(replica, "cursor", side_effect=Exception),
+    ):
+        assert get_replica_lag("replica") == float("inf")
+
+
+def test_router_migrates_primary_only():
+    router = ReplicaRouter()
+    assert router.allow_migrate("default", "user") is True
+    assert router.allow_migrate("replica", "user") is False
@@ -0,0 +1,171 @@
+import pytest
+from rest_framework.test import APIClient
+
+from apps.organization.models import Member, Organization
+from apps.organization.tasks import purge_deleted_organizations
+from apps.user.models import User
+from apps.user.tasks import purge_deleted_users
+from core.jwt import get_tokens
+from tests.factories import (
+    DEFAULT_PASSWORD,
+    MemberFactory,
+    OrganizationFactory,
+    UserFactory,
+)
+from tests.utils import assert_constant_queries, paginated_queries
+
+USERS_URL = "/api/v1/users/"
+
+
+def test_get_current_user(authenticated_client, assert_max_queries):
+    with assert_max_queries(1, max_ms=100):
+        response = authenticated_client.get(f"{USERS_URL}me")
+    assert response.status_code == 200
+
+    with assert_max_queries(0, max_ms=50):
+        response = authenticated_client.get(
+            f"{USERS_URL}me", HTTP_IF_NONE_MATCH=response["ETag"]
+        )
+    assert response.status_code == 304
+
+
+def test_retrieve_user(authenticated_client, assert_max_queries):
+    other = UserFactory()
+    with assert_max_queries(1, max_ms=100):
+        response = authenticated_client.get(f"{USERS_URL}{other.email}")
+    assert response.status_code == 200
+    assert response.json()["email"] == other.email
+
+
+def test_update_user(authenticated_client, user, assert_max_queries):
+    with assert_max_queries(2, max_ms=100):
+        response = authenticated_client.patch(
+            f"{USERS_URL}{user.email}", {"first_name": "Jane"}, format="json"
+        )
+    assert response.status_code == 200, response.content
+    assert response.json()["first_name"] == "Jane"
+
+
+@pytest.mark.parametrize("field", ["email", "username", "phone_number"])
+def test_update_user_taken_by_deleted_user(authenticated_client, user, field):
+    deleted = UserFactory()
+    deleted.soft_delete()
+    value = getattr(deleted, field)
+    response = authenticated_client.patch(
+        f"{USERS_URL}{user.email}", {field: str(value)}, format="json"
+    )
+    assert response.status_code == 400, response.content
+    assert response.json().keys() == {field}
+
+
+def test_deactivate_user_revokes_tokens(authenticated_client, user):
+    assert authenticated_client.get(f"{USERS_URL}me").status_code == 200
+    user.is_active = False
+    user.save()
+    assert authenticated_client.get(f"{USERS_URL}me").status_code == 401
+
+
+def test_demote_user_revokes_tokens():
+    user = UserFactory(is_staff=True)
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {get_tokens(user)['access']}")
+    # Only the changes of the token claims revoke the tokens
+    user.phone_number = "+201099999999"
+    user.save()
+    assert client.get(f"{USERS_URL}me").status_code == 200
+
+    user = User.objects.get(pk=user.pk)
+    user.is_staff = False
+    user.save(update_fields=["is_staff"])
+    assert client.get(f"{USERS_URL}me").status_code == 401
+
+
+def test_delete_user(authenticated_client, assert_max_queries):
+    other = UserFactory()
+    organization = OrganizationFactory(owner=other)
+    MemberFactory.create_batch(3, user=other)
+    with assert_max_queries(8, max_ms=200):
+        response = authenticated_client.delete(f"{USERS_URL}{other.email}")
+    assert response.status_code == 204
+    assert authenticated_client.get(f"{USERS_URL}{other.email}").status_code == 404
+    organization = Organization.all_objects.get(pk=organization.pk)
+    assert organization.is_deleted
+
+    response = authenticated_client.post(
+        "/api/v1/auth/tokens", {"login": other.email, "password": DEFAULT_PASSWORD}
+    )
+    assert response.status_code == 401
+
+
+def test_delete_user_revokes_tokens(authenticated_client):
+    other = UserFactory()
+    tokens = get_tokens(other)
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+    assert client.get(f"{USERS_URL}me").status_code == 200
+
+    response = authenticated_client.delete(f"{USERS_URL}{other.email}")
+    assert response.status_code == 204
+    assert client.get(f"{USERS_URL}me").status_code == 401
+    response = client.post(
+        "/api/v1/auth/tokens/refresh", {"refresh": tokens["refresh"]}, format="json"
+    )
+    assert response.status_code == 401
+
+
+def test_purge_deleted_users(settings):
+    settings.SOFT_DELETE_RETENTION_HOURS = 0
+    user = UserFactory()
+    organization = OrganizationFactory(owner=user)
+    MemberFactory.create_batch(3, user=user)
+    user.soft_delete()
+
+    # The user is purged once the organizations it owned are
+    assert purge_deleted_users() == 0
+    assert purge_deleted_organizations() == 1
+    assert purge_deleted_users() == 1
+    assert not User.all_objects.filter(pk=user.pk).exists()
+    assert not Organization.all_objects.filter(pk=organization.pk).exists()
+    assert not Member.objects.filter(user_id=user.pk).exists()
+
+
+def test_list_users(authenticated_client, assert_max_queries):
+    UserFactory.create_batch(5)
+    with assert_max_queries(paginated_queries(2), max_ms=100):
+        response = authenticated_client.get(USERS_URL)
+    assert response.status_code == 200
+    assert response.json()["count"] == 6
+
+    assert_constant_queries(
+        authenticated_client, USERS_URL, lambda: UserFactory.create_batch(5)
+    )
+    assert_constant_queries(
+        authenticated_client,
+        f"{USERS_URL}?paginate=cursor",
+        lambda: UserFactory.create_batch(5),
+    )
+
+
+def test_search_users(authenticated_client, assert_max_queries):
+    UserFactory(first_name="Grace", last_name="Hopper")
+    UserFactory.create_batch(5)
+    with assert_max_queries(paginated_queries(2), max_ms=100):
+        response = authenticated_client.get(f"{USERS_URL}?search=grace hop")
+    assert response.status_code == 200
+    assert response.json()["count"] == 1
+
+
+def test_change_password(authenticated_client, user, assert_max_queries):
+    with assert_max_queries(2, max_ms=200):
+        response = authenticated_client.patch(
+            f"{USERS_URL}change-password",
+            {
+                "password": DEFAULT_PASSWORD,
+                "new_password": "a-new-password",
+                "confirm_new_password": "a-new-password",
+            },
+            format="json",
+        )
+    assert response.status_code == 200, response.content
+    user.refresh_from_db()
+    assert user.check_password("a-new-password")
@@ -0,0 +1,87 @@
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.api.v1.auth.views import AsyncTokenPairObtainView, TokenPairObtainView
+from apps.api.v1.organization.views import (
+    AsyncListCreateOrganizationView,
+    ListCreateOrganizationView,
+)
+from apps.api.v1.user.views import (
+    AsyncGetCurrentUserView,
+    AsyncUserListView,
+    GetCurrentUserView,
+    UserListView,
+)
+from core.jwt import get_tokens
+from tests.factories import DEFAULT_PASSWORD, OrganizationFactory, UserFactory
+
+
+def call_view(view_class, request):
+    view = view_class.as_view()
+    if view_class.view_is_async:
+        response = async_to_sync(view)(request)
+    else:
+        response = view(request)
+    return response.render()
+
+
+@pytest.fixture
+def factory(user):
+    return APIRequestFactory(HTTP_AUTHORIZATION=f"Bearer {get_tokens(user)['access']}")
+
+
+@pytest.mark.parametrize(
+    "sync_view, async_view, path",
+    [
+        (GetCurrentUserView, AsyncGetCurrentUserView, "/api/v1/users/me"),
+        (UserListView, AsyncUserListView, "/api/v1/users/?page_size=2"),
+        (
+            ListCreateOrganizationView,
+            AsyncListCreateOrganizationView,
+            "/api/v1/organizations/?paginate=cursor",
+        ),
+    ],
+)
+def test_async_views_respond_like_sync_views(factory, sync_view, async_view, path):
+    UserFactory.create_batch(3)
+    OrganizationFactory.create_batch(3)
+
+    responses = []
+    for view in (sync_view, async_view):
+        cache.clear()
+        responses.append(call_view(view, factory.get(path)))
+
+    sync_response, async_response = responses
+    assert async_response.status_code == sync_response.status_code == 200
+    assert async_response.data == sync_response.data
+
+
+@pytest.mark.parametrize(
+    "view, path",
+    [
+        (AsyncGetCurrentUserView, "/api/v1/users/me"),
+        (AsyncUserListView, "/api/v1/users/"),
+        (AsyncListCreateOrganizationView, "/api/v1/organizations/"),
+    ],
+)
+def test_async_views_authenticate_tokens_without_claims(user, view, path):
+    # Tokens issued before the user claims were embedded load the user row
+    token = AccessToken.for_user(user)
+    request = APIRequestFactory().get(path, HTTP_AUTHORIZATION=f"Bearer {token}")
+    assert call_view(view, request).status_code == 200
+
+
+@pytest.mark.parametrize("view", [TokenPairObtainView, AsyncTokenPairObtainView])
+@pytest.mark.parametrize(
+    "password, status_code", [(DEFAULT_PASSWORD, 200), ("x" * 8, 401)]
+)
+def test_obtain_tokens_views(user, view, password, status_code):
+    request = APIRequestFactory().post(
+        "/api/v1/auth/tokens",
+        {"login": user.email, "password": password},
+        format="json",
+    )
+    assert call_view(view, request).status_code == status_code
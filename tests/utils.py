@@ -0,0 +1,69 @@
+from typing import Callable
+
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+__all__ = [
+    "count_queries",
+    "assert_constant_queries",
+    "paginated_queries",
+    "FakeRedis",
+]
+
+
+def paginated_queries(num: int) -> int:
+    """
+    The query budget of a paginated list running ``num`` queries on SQLite,
+    PostgreSQL estimates the count with an extra query first.
+    """
+    return num + (connection.vendor == "postgresql")
+
+
+def count_queries(client, url: str) -> int:
+    """Count the queries of a ``GET`` request, bypassing every cache."""
+    cache.clear()
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200, response.content
+    return len(context.captured_queries)
+
+
+def assert_constant_queries(client, url: str, add_rows: Callable[[], None]) -> int:
+    """
+    Assert that listing ``url`` runs the same number of queries after
+    ``add_rows`` added more rows to the page, and return that number.
+    """
+    expected = count_queries(client, url)
+    add_rows()
+    actual = count_queries(client, url)
+    assert actual == expected, (
+        f"{url} ran {actual} queries after adding rows, expected {expected}"
+    )
+    return actual
+
+
+class FakeRedis:
+    """An in-memory stand-in for the Redis hash commands of the app."""
+
+    def __init__(self):
+        self.data: dict[str, dict[bytes, bytes]] = {}
+
+    def hset(self, key: str, field: str, value: str) -> int:
+        fields = self.data.setdefault(key, {})
+        added = field.encode() not in fields
+        fields[field.encode()] = value.encode()
+        return int(added)
+
+    def hgetall(self, key: str) -> dict[bytes, bytes]:
+        return dict(self.data.get(key, {}))
+
+    def exists(self, *keys: str) -> int:
+        return sum(key in self.data for key in keys)
+
+    def rename(self, src: str, dst: str) -> bool:
+        self.data[dst] = self.data.pop(src)
+        return True
+
+    def delete(self, *keys: str) -> int:
+        return sum(self.data.pop(key, None) is not None for key in keys)